@@ -75,13 +75,32 @@ WSGI_APPLICATION = 'assignment_eval_system.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
+# DB_PROFILE=sqlite (default, WAL-tuned) or postgres (pooled); see core/db_profiles.py
 
-DATABASES = {
+from core.db_profiles import database_settings
+
+DATABASES = database_settings(BASE_DIR)
+
+# Fragment caches: this process's memory in front of a table every process shares; see core/caching.py.
+# The shared table is created by migration (or `manage.py createcachetable`).
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'studyroom-local',
+        'TIMEOUT': 60,
+        'OPTIONS': {'MAX_ENTRIES': 2000},
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'core_cache',
+        'TIMEOUT': 600,
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
 }
+CACHE_FRAGMENTS = os.getenv('CACHE_FRAGMENTS', '1') != '0'
+
+# Interview sessions are stored compact and compressed, and only written when a value changed; see core/sessions.py
+SESSION_ENGINE = 'core.sessions'
 
 
 # Password validation
@@ -124,6 +143,21 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Local files the app rebuilds from the database, kept out of the source tree and out of the served MEDIA_ROOT
+DATA_DIR = os.getenv('DATA_DIR', os.path.join(BASE_DIR, 'var'))
+# Memory-mapped skill/degree/role bitsets of stored resumes; see core/ai_models/resume_bitsets.py
+RESUME_INDEX_DIR = os.getenv('RESUME_INDEX_DIR', os.path.join(DATA_DIR, 'resume_index'))
+
+# Uploaded files are stored once per distinct content and hard-linked under their upload_to names;
+# see core/storage.py (and `manage.py gc_storage`)
+STORAGES = {
+    'default': {'BACKEND': 'core.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# Uploads are hashed, type-sniffed and streamed to a temporary file in one pass
+FILE_UPLOAD_HANDLERS = ['core.uploads.StreamingUploadHandler']
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
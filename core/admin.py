@@ -1,3 +1,18 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ResumeAnalysisCache
+from .resume_cache import hit_rate
+
+
+@admin.register(ResumeAnalysisCache)
+class ResumeAnalysisCacheAdmin(admin.ModelAdmin):
+    list_display = ('content_hash', 'analyzer_version', 'score', 'hits', 'created_at', 'last_hit_at')
+    list_filter = ('analyzer_version',)
+    search_fields = ('content_hash',)
+    readonly_fields = ('content_hash', 'analyzer_version', 'hits', 'created_at', 'last_hit_at')
+    change_list_template = 'admin/core/resumeanalysiscache/change_list.html'
+
+    def changelist_view(self, request, extra_context=None):
+        hits, misses, rate = hit_rate()
+        extra_context = dict(extra_context or {}, cache_hits=hits, cache_misses=misses, cache_hit_rate=rate)
+        return super().changelist_view(request, extra_context=extra_context)
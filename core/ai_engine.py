@@ -207,18 +207,15 @@ def evaluate_proctoring_response(question, response_text, role_type):
     except Exception:
         return 5.0, response
 
-def analyze_proctoring_session(session_transcript, responses_data, duration_minutes):
-    """Analyzes an entire proctoring session for integrity and quality."""
+def analyze_proctoring_session(session_summary, duration_minutes):
+    """Analyzes an entire proctoring session for integrity and quality from its precomputed summary."""
     prompt = f"""
     You are an expert exam proctoring analyst. Please analyze the following proctoring session data.
     
     Session Duration: {duration_minutes} minutes
     
-    Session Transcript:
-    {session_transcript[:3000]}
-    
-    Response Quality Summary:
-    {json.dumps(responses_data)[:2000]}
+    Session Summary (every answer with its score, length, time taken and an excerpt):
+    {json.dumps(session_summary, separators=(',', ':'))}
     
     Please provide:
     1. Integrity Score (0-10): Assessment of exam integrity and lack of cheating indicators.
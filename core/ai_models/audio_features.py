@@ -0,0 +1,263 @@
+"""
+Audio Features
+Local prosody analysis for interview audio segments: decodes browser audio to
+PCM and computes RMS energy, pitch, speaking rate and pause ratio with
+vectorized numpy. Results accumulate into a small per-question state so each
+segment only processes its own samples.
+"""
+import io
+import shutil
+import subprocess
+import wave
+import numpy as np
+from .config import Config
+
+FFMPEG_PATH = shutil.which('ffmpeg')
+AUDIO_DECODE_SUPPORT = FFMPEG_PATH is not None
+
+
+def decode_audio(data):
+    """
+    Decode an audio segment to mono float32 PCM at Config.AUDIO_SAMPLE_RATE.
+    WAV is decoded in-process; webm/opus and other containers go through ffmpeg.
+    Returns None when the segment cannot be decoded.
+    """
+    if not data:
+        return None
+    if data[:4] == b'RIFF':
+        return _decode_wav(data)
+    if not AUDIO_DECODE_SUPPORT:
+        return None
+    try:
+        result = subprocess.run(
+            [FFMPEG_PATH, '-nostdin', '-loglevel', 'error', '-i', 'pipe:0',
+             '-f', 's16le', '-ac', '1', '-ar', str(Config.AUDIO_SAMPLE_RATE), 'pipe:1'],
+            input=data,
+            capture_output=True,
+            timeout=Config.AUDIO_DECODE_TIMEOUT
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"Error decoding audio segment: {e}")
+        return None
+    if result.returncode != 0 or not result.stdout:
+        return None
+    return np.frombuffer(result.stdout, dtype='<i2').astype(np.float32) / 32768.0
+
+
+def _decode_wav(data):
+    try:
+        with wave.open(io.BytesIO(data)) as wav:
+            channels = wav.getnchannels()
+            width = wav.getsampwidth()
+            rate = wav.getframerate()
+            raw = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError) as e:
+        print(f"Error decoding WAV segment: {e}")
+        return None
+    if width != 2:
+        return None
+    pcm = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768.0
+    if channels > 1:
+        pcm = pcm.reshape(-1, channels).mean(axis=1)
+    if rate != Config.AUDIO_SAMPLE_RATE and len(pcm):
+        # Linear resampling is plenty for prosody features
+        duration = len(pcm) / rate
+        target = np.linspace(0, len(pcm) - 1, int(duration * Config.AUDIO_SAMPLE_RATE))
+        pcm = np.interp(target, np.arange(len(pcm)), pcm).astype(np.float32)
+    return pcm
+
+
+def frame_signal(pcm, frame_length, hop_length):
+    """Return a (frames, frame_length) strided view over the PCM buffer"""
+    if len(pcm) < frame_length:
+        return np.empty((0, frame_length), dtype=np.float32)
+    return np.lib.stride_tricks.sliding_window_view(pcm, frame_length)[::hop_length]
+
+
+def detect_voice_activity(pcm):
+    """
+    Energy and zero-crossing voice activity detection over the whole buffer.
+    Returns per-segment speech statistics; 'is_speech' is False for silent or
+    noise-only segments
+    """
+    frame_length = int(Config.AUDIO_SAMPLE_RATE * Config.VAD_FRAME_MS / 1000)
+    frames = frame_signal(pcm, frame_length, frame_length)
+    if not len(frames):
+        return {'frames': 0, 'speech_frames': 0, 'speech_ratio': 0.0, 'is_speech': False}
+
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_length - 1)
+
+    threshold = Config.VAD_ENERGY_THRESHOLD
+    speech = ((rms >= threshold) & (zcr <= Config.VAD_MAX_ZCR)) | (rms >= threshold * Config.VAD_LOUD_FACTOR)
+    speech_frames = int(np.count_nonzero(speech))
+    speech_ratio = speech_frames / len(frames)
+    return {
+        'frames': int(len(frames)),
+        'speech_frames': speech_frames,
+        'speech_ratio': round(speech_ratio, 3),
+        'is_speech': speech_ratio >= Config.VAD_MIN_SPEECH_RATIO
+    }
+
+
+def new_prosody_state():
+    return {
+        'frames': 0,
+        'voiced_frames': 0,
+        'seconds': 0.0,
+        'energy_sum': 0.0,
+        'energy_sq_sum': 0.0,
+        'pitch_count': 0,
+        'pitch_mean': 0.0,
+        'pitch_m2': 0.0,
+        'syllables': 0
+    }
+
+
+def _frame_pitch(frames, sample_rate):
+    """Autocorrelation pitch per frame via one batched FFT; 0 where unvoiced"""
+    if not len(frames):
+        return np.zeros(0, dtype=np.float32)
+    n = frames.shape[1]
+    windowed = (frames - frames.mean(axis=1, keepdims=True)) * np.hanning(n)
+    spectrum = np.fft.rfft(windowed, n=2 * n, axis=1)
+    autocorr = np.fft.irfft(spectrum * np.conj(spectrum), axis=1)[:, :n]
+
+    min_lag = max(1, int(sample_rate / Config.PROSODY_MAX_PITCH))
+    max_lag = min(n - 1, int(sample_rate / Config.PROSODY_MIN_PITCH))
+    search = autocorr[:, min_lag:max_lag]
+    best = np.argmax(search, axis=1)
+    peak = search[np.arange(len(search)), best]
+    energy = np.maximum(autocorr[:, 0], 1e-12)
+
+    pitch = sample_rate / (best + min_lag)
+    return np.where(peak / energy >= Config.PROSODY_VOICING_THRESHOLD, pitch, 0.0)
+
+
+def analyze_prosody(pcm, state=None):
+    """
+    Compute prosody features for one segment and fold them into state.
+    Returns (segment_features, updated_state); state is a plain dict so it can
+    live in the Django session.
+    """
+    state = dict(state) if state else new_prosody_state()
+    sample_rate = Config.AUDIO_SAMPLE_RATE
+    frame_length = int(sample_rate * Config.PROSODY_FRAME_MS / 1000)
+    hop_length = int(sample_rate * Config.PROSODY_HOP_MS / 1000)
+    frames = frame_signal(pcm, frame_length, hop_length)
+    if not len(frames):
+        return {}, state
+
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    voiced = rms >= Config.PROSODY_SILENCE_RMS
+    pitch = _frame_pitch(frames[voiced], sample_rate)
+    pitch = pitch[pitch > 0]
+
+    # Syllable nuclei: peaks of the smoothed energy envelope inside voiced regions
+    envelope = np.convolve(rms, np.ones(5) / 5, mode='same')
+    half = max(1, int(Config.PROSODY_MIN_SYLLABLE_MS / Config.PROSODY_HOP_MS) // 2)
+    padded = np.pad(envelope, half, mode='edge')
+    local_max = np.lib.stride_tricks.sliding_window_view(padded, 2 * half + 1).max(axis=1)
+    nuclei = int(np.count_nonzero((envelope >= local_max) & voiced & (envelope > 0)))
+
+    seconds = len(pcm) / sample_rate
+    voiced_rms = rms[voiced]
+
+    state['frames'] += int(len(frames))
+    state['voiced_frames'] += int(voiced.sum())
+    state['seconds'] += seconds
+    state['energy_sum'] += float(voiced_rms.sum())
+    state['energy_sq_sum'] += float((voiced_rms ** 2).sum())
+    state['syllables'] += nuclei
+
+    if len(pitch):
+        # Chan et al. parallel update of the running pitch mean/variance
+        count = len(pitch)
+        mean = float(pitch.mean())
+        m2 = float(((pitch - mean) ** 2).sum())
+        total = state['pitch_count'] + count
+        delta = mean - state['pitch_mean']
+        state['pitch_mean'] += delta * count / total
+        state['pitch_m2'] += m2 + delta ** 2 * state['pitch_count'] * count / total
+        state['pitch_count'] = total
+
+    segment = {
+        'rms_energy': round(float(rms.mean()), 5),
+        'pitch_hz': round(float(pitch.mean()), 1) if len(pitch) else 0.0,
+        'pitch_std': round(float(pitch.std()), 1) if len(pitch) else 0.0,
+        'speaking_rate': round(nuclei / seconds, 2) if seconds else 0.0,
+        'pause_ratio': round(1.0 - float(voiced.mean()), 3)
+    }
+    return segment, state
+
+
+def record_pause(pcm, state=None):
+    """Fold a silent segment into state as pause time without running prosody analysis"""
+    state = dict(state) if state else new_prosody_state()
+    sample_rate = Config.AUDIO_SAMPLE_RATE
+    frame_length = int(sample_rate * Config.PROSODY_FRAME_MS / 1000)
+    hop_length = int(sample_rate * Config.PROSODY_HOP_MS / 1000)
+    if len(pcm) >= frame_length:
+        state['frames'] += (len(pcm) - frame_length) // hop_length + 1
+        state['seconds'] += len(pcm) / sample_rate
+    state['pause_segments'] = state.get('pause_segments', 0) + 1
+    return state
+
+
+def summarize_prosody(state):
+    """Cumulative features for everything seen so far in this state"""
+    if not state or not state.get('frames'):
+        return {}
+    voiced_frames = state['voiced_frames']
+    energy_mean = state['energy_sum'] / voiced_frames if voiced_frames else 0.0
+    energy_var = state['energy_sq_sum'] / voiced_frames - energy_mean ** 2 if voiced_frames else 0.0
+    pitch_var = state['pitch_m2'] / state['pitch_count'] if state['pitch_count'] else 0.0
+    voiced_seconds = state['seconds'] * voiced_frames / state['frames']
+    return {
+        'rms_energy': round(energy_mean, 5),
+        'energy_cv': round(float(np.sqrt(max(energy_var, 0.0))) / energy_mean, 3) if energy_mean else 0.0,
+        'pitch_hz': round(state['pitch_mean'], 1),
+        'pitch_variance': round(pitch_var, 1),
+        'speaking_rate': round(state['syllables'] / voiced_seconds, 2) if voiced_seconds else 0.0,
+        'pause_ratio': round(1.0 - voiced_frames / state['frames'], 3),
+        'seconds': round(state['seconds'], 2)
+    }
+
+
+def score_voice_quality(summary):
+    """Map cumulative prosody features to a 0-10 voice quality score"""
+    if not summary:
+        return 5.0
+    score = 5.0
+
+    rate = summary['speaking_rate']
+    if 3.0 <= rate <= 5.5:
+        score += 2.0
+    elif 2.0 <= rate <= 6.5:
+        score += 1.0
+    elif rate:
+        score -= 1.0
+
+    pause_ratio = summary['pause_ratio']
+    if pause_ratio < 0.35:
+        score += 1.5
+    elif pause_ratio < 0.55:
+        score += 0.5
+    else:
+        score -= 1.5
+
+    # Relative pitch spread: monotone delivery scores lower, lively intonation higher
+    if summary['pitch_hz']:
+        pitch_cv = float(np.sqrt(summary['pitch_variance'])) / summary['pitch_hz']
+        if pitch_cv < 0.05:
+            score -= 1.0
+        elif pitch_cv <= 0.3:
+            score += 1.5
+
+    if summary['rms_energy'] < Config.PROSODY_SILENCE_RMS * 2:
+        score -= 1.0
+    elif summary['energy_cv'] < 1.0:
+        score += 0.5
+
+    return round(min(10.0, max(0.0, score)), 2)
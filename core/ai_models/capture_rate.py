@@ -0,0 +1,110 @@
+"""
+Capture Rate Controller
+Chooses how long the interview room should wait before sending the next frame,
+based on inference queue depth, how much the scene is changing and whether a
+violation was seen recently
+
+The latest frame thumbnail of each interview is kept in this process's
+memory, keyed by session, rather than in capture_state, so the session
+written on every frame carries only a few numbers. A frame handled by
+another process simply has no previous thumbnail to compare against.
+"""
+import base64
+import io
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from .config import Config
+
+try:
+    from PIL import Image
+    IMAGE_SUPPORT = True
+except ImportError:
+    IMAGE_SUPPORT = False
+
+THUMBNAIL_SIZE = (16, 12)
+
+
+def frame_thumbnail(frame_data):
+    """Tiny grayscale thumbnail of a base64 JPEG frame, used to measure scene change"""
+    if not IMAGE_SUPPORT or not frame_data:
+        return None
+    try:
+        if ',' in frame_data:
+            frame_data = frame_data.split(',')[1]
+        image = Image.open(io.BytesIO(base64.b64decode(frame_data)))
+        # draft() lets the JPEG decoder downscale while decoding, which is much cheaper
+        image.draft('L', (THUMBNAIL_SIZE[0] * 8, THUMBNAIL_SIZE[1] * 8))
+        thumbnail = image.convert('L').resize(THUMBNAIL_SIZE)
+        return thumbnail.tobytes()
+    except Exception as e:
+        print(f"Error building frame thumbnail: {e}")
+        return None
+
+
+class CaptureRateController:
+    def __init__(self):
+        self.base_ms = Config.ANALYSIS_FRAME_INTERVAL * 1000
+        self.min_ms = Config.CAPTURE_INTERVAL_MIN_MS
+        self.max_ms = Config.CAPTURE_INTERVAL_MAX_MS
+        self._thumbnails = OrderedDict()
+        self._thumbnails_lock = threading.Lock()
+
+    def _swap_thumbnail(self, key, thumbnail, now):
+        """Store the key's latest thumbnail and return the previous one, if recent enough to compare"""
+        with self._thumbnails_lock:
+            previous = self._thumbnails.pop(key, None)
+            self._thumbnails[key] = (thumbnail, now)
+            while len(self._thumbnails) > Config.CAPTURE_THUMBNAILS_KEPT:
+                self._thumbnails.popitem(last=False)
+        if previous is None or now - previous[1] > 2 * self.max_ms / 1000:
+            return None
+        return previous[0]
+
+    def next_interval_ms(self, capture_state, queue_depth, frame_analysis=None, frame_data=None, key=None):
+        """
+        Update capture_state (a plain dict kept in the session or on the stream)
+        with the latest frame and return the interval the client should use next.
+        `key` identifies the interview (its session key) for scene change tracking
+        """
+        now = time.time()
+        # Kept in the session by earlier versions
+        capture_state.pop('thumbnail', None)
+
+        thumbnail = frame_thumbnail(frame_data) if frame_data and key else None
+        if thumbnail is not None:
+            previous = self._swap_thumbnail(key, thumbnail, now)
+            if previous is not None and len(previous) == len(thumbnail):
+                change = float(np.mean(np.abs(np.frombuffer(thumbnail, dtype=np.uint8).astype(np.int16) -
+                                              np.frombuffer(previous, dtype=np.uint8)))) / 255.0
+                ewma = capture_state.get('change_rate')
+                alpha = Config.CAPTURE_CHANGE_SMOOTHING
+                capture_state['change_rate'] = round(change if ewma is None else alpha * change + (1 - alpha) * ewma, 4)
+
+        if frame_analysis and (frame_analysis.get('phone_detected') or frame_analysis.get('person_count', 1) > 1):
+            capture_state['last_violation_at'] = now
+
+        # Right after a phone or extra person, watch closely
+        last_violation = capture_state.get('last_violation_at')
+        if last_violation and now - last_violation < Config.CAPTURE_VIOLATION_HOLD:
+            interval = self.min_ms
+        else:
+            load = min(1.0, queue_depth / max(1, Config.FRAME_BATCH_MAX_QUEUE))
+            change_rate = capture_state.get('change_rate')
+            stable = change_rate is not None and change_rate < Config.CAPTURE_STABLE_CHANGE
+            active = change_rate is not None and change_rate > Config.CAPTURE_ACTIVE_CHANGE
+            busy = load >= Config.CAPTURE_BUSY_LOAD
+
+            if stable and busy:
+                interval = self.max_ms
+            else:
+                interval = self.base_ms * (1 + 2 * load)
+                if stable:
+                    interval *= 2
+                elif active:
+                    interval /= 2
+
+        interval = int(min(self.max_ms, max(self.min_ms, interval)))
+        capture_state['interval_ms'] = interval
+        return interval
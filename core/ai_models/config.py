@@ -28,10 +28,77 @@ class Config:
     
     # Physical analysis settings
     ENABLE_PHYSICAL_ANALYSIS = True
-    ANALYSIS_FRAME_INTERVAL = 3  # Increase interval slightly for better processing
+    ANALYSIS_FRAME_INTERVAL = 3  # Base seconds between frames; the server adapts it per response
     CONFIDENCE_WEIGHT = 0.5  # Confidence is key
     VOICE_WEIGHT = 0.3
     BODY_LANGUAGE_WEIGHT = 0.2
+
+    # Frame batching across concurrent interviews
+    ENABLE_FRAME_BATCHING = True
+    FRAME_BATCH_MAX_SIZE = 16  # Max frames sent to a model in one call
+    FRAME_BATCH_MAX_LATENCY_MS = 50  # Max time a frame waits for its batch to fill
+    FRAME_BATCH_MAX_QUEUE = 256  # Reject new frames beyond this queue depth
+    FRAME_BATCH_WORKERS = 2  # Batches processed concurrently
+    FRAME_BATCH_RESULT_TIMEOUT = 30  # Seconds a request waits for its frame result
+
+    # Adaptive capture rate returned with each analysis response
+    CAPTURE_INTERVAL_MIN_MS = 1000
+    CAPTURE_INTERVAL_MAX_MS = 10000
+    CAPTURE_VIOLATION_HOLD = 20  # Seconds to stay at the minimum interval after a violation
+    CAPTURE_STABLE_CHANGE = 0.02  # Mean thumbnail change below this is a stable scene
+    CAPTURE_ACTIVE_CHANGE = 0.08  # Mean thumbnail change above this is an active scene
+    CAPTURE_CHANGE_SMOOTHING = 0.5  # EWMA weight of the newest frame change
+    CAPTURE_BUSY_LOAD = 0.5  # Fraction of FRAME_BATCH_MAX_QUEUE treated as a deep queue
+    CAPTURE_THUMBNAILS_KEPT = 2000  # Latest frame thumbnails kept in process memory, one per interview session
+
+    # Interview media stream (WebSocket on the ASGI app)
+    ENABLE_MEDIA_STREAM = True
+    MEDIA_STREAM_PATH = '/ws/interview/analysis/'
+    MEDIA_STREAM_MAX_MESSAGE_BYTES = 4 * 1024 * 1024
+    MEDIA_STREAM_FLUSH_INTERVAL = 5  # Seconds between session writes from the stream
+
+    # Local prosody analysis for audio segments
+    AUDIO_SAMPLE_RATE = 16000
+    AUDIO_DECODE_TIMEOUT = 10  # Seconds allowed for ffmpeg to decode one segment
+    PROSODY_FRAME_MS = 40
+    PROSODY_HOP_MS = 10
+    PROSODY_MIN_PITCH = 75  # Hz
+    PROSODY_MAX_PITCH = 400  # Hz
+    PROSODY_VOICING_THRESHOLD = 0.3  # Normalized autocorrelation needed to accept a pitch
+    PROSODY_SILENCE_RMS = 0.01  # Frames quieter than this count as pauses
+    PROSODY_MIN_SYLLABLE_MS = 120  # Minimum spacing between syllable nuclei
+
+    # Voice activity detection in front of audio analysis
+    ENABLE_VAD = True
+    VAD_FRAME_MS = 20
+    VAD_ENERGY_THRESHOLD = 0.015  # RMS a frame needs to count as speech
+    VAD_MAX_ZCR = 0.25  # Zero-crossing rate above this is treated as hiss/noise
+    VAD_LOUD_FACTOR = 3.0  # Frames this many times over the energy threshold are speech regardless of ZCR
+    VAD_MIN_SPEECH_RATIO = 0.1  # Segments with fewer speech frames are recorded as pauses only
+
+    # Resume analysis pipeline
+    RESUME_ANALYSIS_DEADLINE = 25  # Seconds for all remote stages together; late stages fall back
+    RESUME_ANALYSIS_WORKERS = 8
+    RESUME_ANALYZER_VERSION = '2'  # Bump when analysis output changes; cached analyses of older versions are redone
+    RESUME_ANALYSIS_ASYNC = True  # Analyze uploads on background worker threads; False runs them inline after commit
+    RESUME_WORKER_THREADS = 2
+    RESUME_ANALYSIS_STALE = 120  # Seconds after which a PENDING/PROCESSING resume is assumed lost and queued again
+    RESUME_STATUS_POLL_MS = 2000
+
+    # Document text extraction (core/extraction.py)
+    EXTRACTION_MAX_BYTES = 10 * 1024 * 1024  # Larger uploads are rejected without being parsed
+    EXTRACTION_MAX_PAGES = 50  # Later PDF pages are skipped and the text marked truncated
+    EXTRACTION_TIMEOUT = 20  # Seconds per document; workers still parsing it are killed
+    EXTRACTION_WORKERS = min(4, os.cpu_count() or 1)  # Worker processes per document
+    EXTRACTION_DOCUMENTS = 4  # Documents parsed at once; others wait for a slot within their timeout
+    EXTRACTION_PAGES_PER_TASK = 4  # Smallest page range handed to one worker
+
+    # Resume uniqueness index (MinHash/LSH shortlist, exact re-scoring of candidates)
+    RESUME_SIMILARITY_THRESHOLD = 0.75  # Resumes at or above this similarity are duplicates
+    RESUME_LSH_NUM_PERM = 128  # MinHash permutations per resume
+    RESUME_LSH_BANDS = 32  # Bands of RESUME_LSH_NUM_PERM / RESUME_LSH_BANDS rows each
+    RESUME_LSH_MAX_CANDIDATES = 1000  # Shortlist size (most shared bands first) checked against the exact similarity
+    # The bitset index directory is the RESUME_INDEX_DIR Django setting
     
     # Interview settings
     MIN_QUESTIONS = 5
@@ -0,0 +1,122 @@
+"""
+Frame Batcher
+Collects video frames from all active interview sessions and runs them through
+the physical analyzer in micro-batches instead of one model call per frame
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from .config import Config
+
+
+class FrameQueueFull(Exception):
+    """Raised when too many frames are already waiting for analysis"""
+
+
+class FrameBatcher:
+    def __init__(self, batch_fn, max_batch=None, max_latency_ms=None, max_queue=None, workers=None):
+        """
+        batch_fn: callable taking a list of frames and returning a list of
+        results in the same order (e.g. PhysicalAnalyzer.analyze_video_frames)
+        """
+        self.batch_fn = batch_fn
+        self.max_batch = max(1, max_batch or Config.FRAME_BATCH_MAX_SIZE)
+        if max_latency_ms is None:
+            max_latency_ms = Config.FRAME_BATCH_MAX_LATENCY_MS
+        self.max_latency = max(0.0, max_latency_ms / 1000.0)
+        self.max_queue = max_queue or Config.FRAME_BATCH_MAX_QUEUE
+        self.workers = max(1, workers or Config.FRAME_BATCH_WORKERS)
+
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._threads = []
+
+        self.stats = {
+            'frames': 0,
+            'batches': 0,
+            'rejected': 0,
+            'errors': 0,
+            'max_batch_seen': 0
+        }
+
+    def submit(self, frame):
+        """Queue a frame and return a Future resolving to its analysis"""
+        future = Future()
+        with self._cond:
+            if len(self._pending) >= self.max_queue:
+                self.stats['rejected'] += 1
+                raise FrameQueueFull(f"{len(self._pending)} frames already waiting for analysis")
+            self._pending.append((frame, future, time.monotonic()))
+            self._ensure_workers()
+            self._cond.notify()
+        return future
+
+    def analyze(self, frame, timeout=None):
+        """Blocking helper used by request handlers"""
+        if timeout is None:
+            timeout = Config.FRAME_BATCH_RESULT_TIMEOUT
+        return self.submit(frame).result(timeout=timeout)
+
+    def queue_depth(self):
+        with self._cond:
+            return len(self._pending)
+
+    def get_stats(self):
+        with self._cond:
+            stats = dict(self.stats)
+            stats['queue_depth'] = len(self._pending)
+        stats['avg_batch_size'] = round(stats['frames'] / stats['batches'], 2) if stats['batches'] else 0.0
+        return stats
+
+    def _ensure_workers(self):
+        # Called with self._cond held
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._run, name='frame-batcher', daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+
+            # Wait until the batch is full or the oldest frame hits its latency budget
+            deadline = self._pending[0][2] + self.max_latency
+            while self._pending and len(self._pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            size = min(self.max_batch, len(self._pending))
+            return [self._pending.popleft() for _ in range(size)]
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._process(batch)
+
+    def _process(self, batch):
+        frames = [item[0] for item in batch]
+        try:
+            results = self.batch_fn(frames)
+            if results is None or len(results) != len(frames):
+                raise ValueError(f"Batch returned {0 if results is None else len(results)} results for {len(frames)} frames")
+        except Exception as e:
+            print(f"Error in batched frame analysis: {e}")
+            with self._cond:
+                self.stats['errors'] += 1
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        with self._cond:
+            self.stats['frames'] += len(frames)
+            self.stats['batches'] += 1
+            self.stats['max_batch_seen'] = max(self.stats['max_batch_seen'], len(frames))
+
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
@@ -1,12 +1,17 @@
 """
 Physical Actions Analyzer
-Analyzes confidence, voice, body language, and actions during interview using Hugging Face API
+Analyzes confidence, body language, and actions during interview using Hugging Face API;
+voice quality comes from local prosody analysis
 """
 import requests
 import json
 import base64
+import threading
 import numpy as np
 from .config import Config
+from .audio_features import (
+    decode_audio, detect_voice_activity, analyze_prosody, record_pause, summarize_prosody, score_voice_quality
+)
 
 class PhysicalAnalyzer:
     def __init__(self):
@@ -15,10 +20,18 @@ class PhysicalAnalyzer:
         
         # Hugging Face models for analysis
         self.face_emotion_model = 'trpakov/vit-face-expression'  # Face emotion detection
-        self.voice_emotion_model = 'j-hartmann/emotion-english-distilroberta-base'  # Voice emotion
         self.sentiment_model = Config.SENTIMENT_MODEL
         self.body_pose_model = 'facebook/detr-resnet-50'  # Body pose detection
         
+        # Process-wide audio counters; 'vad_skipped' is analysis work avoided on silence
+        self.audio_stats = {
+            'segments': 0,
+            'analyzed': 0,
+            'vad_skipped': 0,
+            'undecodable': 0
+        }
+        self._stats_lock = threading.Lock()
+        
         # Store analysis results
         self.current_analysis = {
             'confidence': 0.0,
@@ -98,57 +111,126 @@ class PhysicalAnalyzer:
             response = requests.post(api_endpoint, headers=headers, json=payload, timeout=12)
             
             if response.status_code == 200:
-                result = response.json()
-                
-                posture_score = 6.0 # Base neutral
-                person_count = 0
-                phone_detected = False
+                return self._score_objects(response.json())
+        except Exception as e:
+            print(f"Error in object analysis: {e}")
+        return {'posture_score': 5.0, 'person_count': 1, 'phone_detected': False}
+
+    def _score_objects(self, result):
+        """Turn object detection output into posture score, person count and phone flag"""
+        posture_score = 6.0 # Base neutral
+        person_count = 0
+        phone_detected = False
+        
+        if isinstance(result, list):
+            # Count persons
+            persons = [item for item in result if 'person' in item.get('label', '').lower()]
+            person_count = len(persons)
+            
+            # Detect mobile phones
+            phones = [item for item in result if 'phone' in item.get('label', '').lower()]
+            if phones:
+                phone_detected = True
+            
+            if persons:
+                # Clear person detected = better posture score
+                posture_score += 2.0
                 
-                if isinstance(result, list):
-                    # Count persons
-                    persons = [item for item in result if 'person' in item.get('label', '').lower()]
-                    person_count = len(persons)
-                    
-                    # Detect mobile phones
-                    phones = [item for item in result if 'phone' in item.get('label', '').lower()]
-                    if phones:
-                        phone_detected = True
-                    
-                    if persons:
-                        # Clear person detected = better posture score
-                        posture_score += 2.0
-                        
-                        # Tracking movement if we have previous box (simple heuristic)
-                        box = persons[0].get('box', {})
-                        if hasattr(self, '_prev_box') and box:
-                            # Calculate movement (simplified)
-                            diff = abs(box.get('xmin', 0) - self._prev_box.get('xmin', 0)) + \
-                                   abs(box.get('ymin', 0) - self._prev_box.get('ymin', 0))
-                            
-                            # Excessive movement might indicate fidgeting/nervousness
-                            if diff > 50: posture_score -= 1.5
-                            elif diff < 10: posture_score += 1.0 # Stable is good
-                        
-                        self._prev_box = box
-                    else:
-                        posture_score = 4.0 # Person not clearly in frame
-                    
-                    # Penalize if more than one person detected
-                    if person_count > 1:
-                        posture_score -= 3.0
+                # Tracking movement if we have previous box (simple heuristic)
+                box = persons[0].get('box', {})
+                if hasattr(self, '_prev_box') and box:
+                    # Calculate movement (simplified)
+                    diff = abs(box.get('xmin', 0) - self._prev_box.get('xmin', 0)) + \
+                           abs(box.get('ymin', 0) - self._prev_box.get('ymin', 0))
                     
-                    # Heavily penalize if phone detected
-                    if phone_detected:
-                        posture_score -= 4.0
+                    # Excessive movement might indicate fidgeting/nervousness
+                    if diff > 50: posture_score -= 1.5
+                    elif diff < 10: posture_score += 1.0 # Stable is good
                 
-                return {
-                    'posture_score': min(10.0, max(0.0, posture_score)),
-                    'person_count': person_count,
-                    'phone_detected': phone_detected
-                }
+                self._prev_box = box
+            else:
+                posture_score = 4.0 # Person not clearly in frame
+            
+            # Penalize if more than one person detected
+            if person_count > 1:
+                posture_score -= 3.0
+            
+            # Heavily penalize if phone detected
+            if phone_detected:
+                posture_score -= 4.0
+        
+        return {
+            'posture_score': min(10.0, max(0.0, posture_score)),
+            'person_count': person_count,
+            'phone_detected': phone_detected
+        }
+
+    def analyze_video_frames(self, frames):
+        """
+        Analyze a batch of frames with one request per model.
+        Returns a list of results in the same order as frames (None for failures)
+        """
+        if not frames:
+            return []
+        try:
+            headers = {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            }
+            images = [frame if isinstance(frame, str) else str(frame) for frame in frames]
+            
+            emotion_batch = self._run_model_batch(self.face_emotion_model, images, headers)
+            if emotion_batch is None:
+                emotion_batch = [self._analyze_face_emotion(image, headers) for image in images]
+            else:
+                emotion_batch = [
+                    {item['label'].lower(): item['score'] for item in result} if isinstance(result, list) else {}
+                    for result in emotion_batch
+                ]
+            
+            object_batch = self._run_model_batch(self.body_pose_model, images, headers)
+            if object_batch is None:
+                object_batch = [self._analyze_objects(image, headers) for image in images]
+            else:
+                object_batch = [self._score_objects(result) for result in object_batch]
+            
+            results = []
+            for emotion_scores, object_results in zip(emotion_batch, object_batch):
+                results.append({
+                    'emotions': emotion_scores,
+                    'posture_score': object_results.get('posture_score', 5.0),
+                    'confidence': self._calculate_confidence(emotion_scores),
+                    'person_count': object_results.get('person_count', 0),
+                    'phone_detected': object_results.get('phone_detected', False)
+                })
+            return results
         except Exception as e:
-            print(f"Error in object analysis: {e}")
-        return {'posture_score': 5.0, 'person_count': 1, 'phone_detected': False}
+            print(f"Error analyzing video frame batch: {e}")
+            return [None] * len(frames)
+
+    def _run_model_batch(self, model_name, images, headers):
+        """
+        Send all images to a model in a single request.
+        Returns one raw result per image, or None if the endpoint did not answer per-image
+        so the caller can fall back to single-image calls
+        """
+        if len(images) == 1:
+            return None
+        try:
+            payload = {"inputs": [f"data:image/jpeg;base64,{image}" for image in images]}
+            api_endpoint = f"https://api-inference.huggingface.co/models/{model_name}"
+            
+            response = requests.post(api_endpoint, headers=headers, json=payload, timeout=12 + len(images))
+            
+            if response.status_code == 200:
+                result = response.json()
+                if isinstance(result, list) and len(result) == len(images) and all(isinstance(r, list) for r in result):
+                    return result
+            else:
+                print(f"Batch API Error ({model_name}): {response.status_code} - {response.text}")
+        except Exception as e:
+            print(f"Error in batched call to {model_name}: {e}")
+        return None
 
     def _analyze_body_posture(self, image_data, headers):
         """Deprecated: use _analyze_objects instead"""
@@ -176,73 +258,64 @@ class PhysicalAnalyzer:
         except Exception as e:
             return 5.0
 
-    def _analyze_voice_emotion(self, audio_data, headers):
-        """Analyze actual voice emotion using speech model"""
+    def analyze_audio(self, audio_data, prosody_state=None):
+        """
+        Analyze an audio segment locally for voice confidence and quality.
+        prosody_state carries running features for the current question; the
+        updated state is returned so the caller can store it (e.g. in the session)
+        """
         try:
-            # Accuracy improvement: Send binary audio if available
             # If string, assume it's base64 from the frontend
-            if isinstance(audio_data, str) and len(audio_data) > 100:
-                # Remove header if present
+            if isinstance(audio_data, str):
                 if ',' in audio_data:
                     audio_data = audio_data.split(',')[1]
-                payload = base64.b64decode(audio_data)
-            else:
-                payload = audio_data
-
-            api_endpoint = f"https://api-inference.huggingface.co/models/{self.voice_emotion_model}"
-            
-            # Send binary data directly for audio models
-            response = requests.post(
-                api_endpoint,
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                data=payload,
-                timeout=15
-            )
+                audio_data = base64.b64decode(audio_data)
             
-            if response.status_code == 200:
-                result = response.json()
-                # wav2vec2-lg-xlsr-en-speech-emotion-recognition returns list of dicts
-                if isinstance(result, list):
-                    emotions = {item['label'].lower(): item['score'] for item in result}
-                    return emotions
-            else:
-                print(f"Voice API Error: {response.status_code} - {response.text}")
-        except Exception as e:
-            print(f"Error in voice emotion analysis: {e}")
-        return {}
-
-    def analyze_audio(self, audio_data):
-        """Analyze audio for voice confidence and quality"""
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}"
-            }
+            pcm = decode_audio(audio_data)
+            if pcm is None:
+                self._count_audio('undecodable')
+                return {'voice_score': 5.0, 'prosody': {}, 'prosody_state': prosody_state}
             
-            # Analyze voice emotion
-            emotion_data = self._analyze_voice_emotion(audio_data, headers)
-            
-            # Calculate voice score based on confidence in speech
-            voice_score = self._analyze_speech_quality(audio_data, emotion_data)
+            # Silent or noise-only segments only count towards pause time
+            vad = detect_voice_activity(pcm) if Config.ENABLE_VAD else None
+            if vad is not None and not vad['is_speech']:
+                self._count_audio('vad_skipped')
+                state = record_pause(pcm, prosody_state)
+                summary = summarize_prosody(state)
+                return {
+                    'voice_score': score_voice_quality(summary),
+                    'prosody': summary,
+                    'vad': vad,
+                    'skipped': True,
+                    'prosody_state': state
+                }
             
+            self._count_audio('analyzed')
+            segment, state = analyze_prosody(pcm, prosody_state)
+            summary = summarize_prosody(state)
             return {
-                'emotions': emotion_data,
-                'voice_score': voice_score
+                'voice_score': score_voice_quality(summary),
+                'prosody': summary,
+                'segment': segment,
+                'vad': vad,
+                'skipped': False,
+                'prosody_state': state
             }
         except Exception as e:
             print(f"Error analyzing audio: {e}")
-            return {'emotions': {}, 'voice_score': 5.0}
+            return {'voice_score': 5.0, 'prosody': {}, 'prosody_state': prosody_state}
 
-    def _analyze_speech_quality(self, audio_data, emotion_data):
-        """Improved speech quality analysis using emotion labels"""
-        if not emotion_data: return 5.0
-        
-        # High confidence in speech: calm, happy, pleasant
-        # Low confidence: angry, fearful, sad
-        positive = emotion_data.get('calm', 0) + emotion_data.get('happy', 0) + emotion_data.get('neutral', 0)
-        negative = emotion_data.get('angry', 0) + emotion_data.get('fear', 0) + emotion_data.get('sad', 0)
-        
-        quality = 5.0 + (positive * 5.0) - (negative * 3.0)
-        return min(10.0, max(0.0, quality))
+    def _count_audio(self, outcome):
+        with self._stats_lock:
+            self.audio_stats['segments'] += 1
+            self.audio_stats[outcome] += 1
+
+    def get_audio_stats(self):
+        """Audio counters including how many segments the VAD kept away from analysis"""
+        with self._stats_lock:
+            stats = dict(self.audio_stats)
+        stats['skip_rate'] = round(stats['vad_skipped'] / stats['segments'], 3) if stats['segments'] else 0.0
+        return stats
 
     def analyze_realtime_data(self, video_frames, audio_segments):
         """Analyze data with weights from Config"""
@@ -265,10 +338,12 @@ class PhysicalAnalyzer:
             
             # Audio analysis
             voice_scores = []
+            prosody_state = None
             for audio in audio_segments:
-                aa = self.analyze_audio(audio)
+                aa = self.analyze_audio(audio, prosody_state)
                 if aa:
                     voice_scores.append(aa.get('voice_score', 5.0))
+                    prosody_state = aa.get('prosody_state')
             
             # Calculate final results
             avg_conf = np.mean(conf_scores) if conf_scores else self.current_analysis['confidence']
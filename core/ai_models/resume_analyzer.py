@@ -1,16 +1,21 @@
-try:
-    import PyPDF2
-    PDF_SUPPORT = True
-except ImportError:
-    PDF_SUPPORT = False
-from docx import Document
 import re
-import os
 import requests
 import json
 import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from difflib import SequenceMatcher
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from ..models import ResumeFingerprint
+from ..extraction import PDF_SUPPORT, extract_document
 from .config import Config
+from . import resume_bitsets, resume_index
+from .skill_taxonomy import get_taxonomy
+
+# Shared pool for the remote stages of analyze_resume_text; a stage that misses
+# the deadline keeps its worker until its own request timeout expires
+_pipeline_executor = ThreadPoolExecutor(max_workers=Config.RESUME_ANALYSIS_WORKERS, thread_name_prefix='resume-analysis')
 
 class ResumeAnalyzer:
     def __init__(self):
@@ -19,19 +24,18 @@ class ResumeAnalyzer:
         self.sentiment_model = Config.SENTIMENT_MODEL
         self.analysis_model = Config.ANSWER_ANALYSIS_MODEL
         
-        # Initialize resume database for uniqueness checking
-        self.resume_db_path = os.path.join(os.path.dirname(__file__), '../data/resumes')
-        os.makedirs(self.resume_db_path, exist_ok=True)
-        self.resume_fingerprints_file = os.path.join(self.resume_db_path, 'resume_fingerprints.json')
-        self._ensure_fingerprints_db()
-        
-        self.skill_categories = {
-            'programming': ['python', 'java', 'javascript', 'c++', 'c#', 'ruby', 'php', 'swift', 'kotlin'],
-            'web_tech': ['html', 'css', 'react', 'angular', 'vue', 'django', 'flask', 'node.js', 'express'],
-            'databases': ['mysql', 'postgresql', 'mongodb', 'redis', 'sqlite', 'oracle'],
-            'cloud': ['aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform', 'jenkins'],
-            'data_science': ['pandas', 'numpy', 'tensorflow', 'pytorch', 'scikit-learn', 'r', 'matplotlib'],
-            'soft_skills': ['communication', 'leadership', 'teamwork', 'problem-solving', 'creativity', 'adaptability']
+        self.taxonomy = get_taxonomy()
+        self.skill_categories = self.taxonomy.categories
+        self.degree_keywords = ['bachelor', 'master', 'phd', 'mba', 'btech', 'mtech', 'be', 'me']
+        self.role_keywords = ['developer', 'engineer', 'manager', 'analyst', 'architect', 'lead', 'senior', 'junior']
+        
+        # Weights of each feature group in _calculate_similarity
+        self.similarity_weights = {
+            'skills': 0.4,
+            'education': 0.15,
+            'experience': 0.15,
+            'projects': 0.2,
+            'roles': 0.1
         }
     
     def parse_resume(self, file_path):
@@ -51,25 +55,16 @@ class ResumeAnalyzer:
         if not PDF_SUPPORT:
             return "PDF parsing not available - PyPDF2 not installed"
 
-        try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
-                return text
-        except Exception as e:
-            return f"Error reading PDF: {str(e)}"
+        result = extract_document(file_path, file_path)
+        if result['text'] is None:
+            return f"Error reading PDF: {result['error']}"
+        return result['text']
     
     def _parse_docx(self, file_path):
-        try:
-            doc = Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
-        except Exception as e:
-            return f"Error reading DOCX: {str(e)}"
+        result = extract_document(file_path, file_path)
+        if result['text'] is None:
+            return f"Error reading DOCX: {result['error']}"
+        return result['text']
     
     def analyze_resume_file(self, file_path):
         text = self.parse_resume(file_path)
@@ -83,8 +78,10 @@ class ResumeAnalyzer:
         analysis['word_count'] = len(words)
         analysis['char_count'] = len(text)
         
-        # Extract skills
-        analysis['skills'] = self._extract_skills(text)
+        # Extract skills, with how often each one is mentioned
+        mentions = self.taxonomy.extract(text)
+        analysis['skills'] = self.taxonomy.group(mentions)
+        analysis['skill_counts'] = {name: mention['count'] for name, mention in mentions.items()}
         
         # Extract experience
         analysis['experience'] = self._extract_experience(text)
@@ -92,32 +89,73 @@ class ResumeAnalyzer:
         # Extract education
         analysis['education'] = self._extract_education(text)
         
-        # Calculate scores
-        analysis['scores'] = self._calculate_scores(text, analysis['skills'])
+        # Local scores are ready immediately; the remote stages below refine them
+        analysis['scores'] = self._basic_scores(text, analysis['skills'])
+        
+        # Remote scoring, recommendations and both plagiarism sources are
+        # independent, so they run concurrently under one overall deadline
+        stages = {
+            'scores': (self._predict_scores_with_hf, text, analysis['skills']),
+            'recommendations': (self._generate_recommendations_with_hf, dict(analysis)),
+            'plagiarism_hf': (self._detect_plagiarism_hf, text),
+            'plagiarism_router_ai': (self._detect_plagiarism_router_ai, text)
+        }
+        results, timings = self._run_stages(stages, Config.RESUME_ANALYSIS_DEADLINE)
+        
+        if results.get('scores'):
+            analysis['scores'] = results['scores']
         
-        # Generate recommendations
-        analysis['recommendations'] = self._generate_recommendations(analysis)
+        # Recommendations were generated from the local scores
+        analysis['recommendations'] = results.get('recommendations') or self._basic_recommendations(analysis)
         
-        # Check for plagiarism/copying
-        plagiarism_result = self._get_plagiarism_percentage(text)
-        analysis['plagiarism'] = plagiarism_result
+        # Merge whichever plagiarism sources answered in time
+        analysis['plagiarism'] = self._merge_plagiarism_results(
+            results.get('plagiarism_hf'), results.get('plagiarism_router_ai')
+        )
         
+        analysis['timings'] = timings
         return analysis
     
-    def _extract_skills(self, text):
-        text_lower = text.lower()
-        found_skills = {}
+    def _run_stages(self, stages, deadline):
+        """
+        Run independent stages concurrently. Returns (results, timings); a stage
+        that fails or misses the deadline has no result and is reported with
+        its status so callers can fall back.
+        """
+        started = time.perf_counter()
+        timings = {}
         
-        for category, skills in self.skill_categories.items():
-            category_skills = []
-            for skill in skills:
-                if skill in text_lower:
-                    category_skills.append(skill.title())
-            
-            if category_skills:
-                found_skills[category] = category_skills
+        def timed(name, fn, *args):
+            stage_started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                timings[name] = round(time.perf_counter() - stage_started, 3)
+        
+        futures = {
+            name: _pipeline_executor.submit(timed, name, fn, *args)
+            for name, (fn, *args) in stages.items()
+        }
+        wait(futures.values(), timeout=deadline)
         
-        return found_skills
+        results = {}
+        report = {}
+        for name, future in futures.items():
+            if not future.done():
+                report[name] = {'status': 'timeout', 'seconds': round(time.perf_counter() - started, 3)}
+                continue
+            try:
+                results[name] = future.result()
+                status = 'ok' if results[name] else 'no_result'
+            except Exception as e:
+                print(f"Error in resume analysis stage {name}: {e}")
+                status = 'failed'
+            report[name] = {'status': status, 'seconds': timings.get(name)}
+        report['total'] = {'seconds': round(time.perf_counter() - started, 3)}
+        return results, report
+    
+    def _extract_skills(self, text):
+        return self.taxonomy.by_category(text)
     
     def _extract_experience(self, text):
         experience = {}
@@ -152,21 +190,27 @@ class ResumeAnalyzer:
             scores = hf_scores
         else:
             # Fallback to basic calculations if API fails
-            total_skills = sum(len(skills_list) for skills_list in skills.values())
-            scores['skills_score'] = min(10, total_skills / 2)
-            
-            exp_score = 0
-            if any(str(i) in text for i in range(1, 6)):
-                exp_score = min(10, 5)
-            scores['experience_score'] = exp_score
-            
-            edu_score = min(10, len(self._extract_education(text)['degrees']) * 3)
-            scores['education_score'] = edu_score
-            
-            scores['overall_score'] = (scores['skills_score'] + scores['experience_score'] + scores['education_score']) / 3
+            scores = self._basic_scores(text, skills)
         
         return scores
     
+    def _basic_scores(self, text, skills):
+        """Local heuristic scores used when the remote prediction is unavailable"""
+        scores = {}
+        total_skills = sum(len(skills_list) for skills_list in skills.values())
+        scores['skills_score'] = min(10, total_skills / 2)
+        
+        exp_score = 0
+        if any(str(i) in text for i in range(1, 6)):
+            exp_score = min(10, 5)
+        scores['experience_score'] = exp_score
+        
+        edu_score = min(10, len(self._extract_education(text)['degrees']) * 3)
+        scores['education_score'] = edu_score
+        
+        scores['overall_score'] = (scores['skills_score'] + scores['experience_score'] + scores['education_score']) / 3
+        return scores
+    
     def _predict_scores_with_hf(self, text, skills):
         """Use Hugging Face API to predict resume scores"""
         try:
@@ -420,6 +464,10 @@ Scores should be between 0.0 and 10.0."""
             return hf_recommendations
         
         # Fallback to basic recommendations
+        return self._basic_recommendations(analysis)
+    
+    def _basic_recommendations(self, analysis):
+        """Rule-based recommendations from the scores and word count"""
         recommendations = []
         scores = analysis['scores']
         
@@ -520,12 +568,6 @@ Recommendations:"""
         
         return None
     
-    def _ensure_fingerprints_db(self):
-        """Ensure the fingerprints database file exists"""
-        if not os.path.exists(self.resume_fingerprints_file):
-            with open(self.resume_fingerprints_file, 'w') as f:
-                json.dump({'resumes': []}, f, indent=2)
-    
     def _extract_key_features(self, text):
         """
         Extract key features for uniqueness checking:
@@ -562,9 +604,8 @@ Recommendations:"""
         features['projects'] = projects[:5]  # Limit to 5 projects
         
         # Extract career insights (titles, companies)
-        title_keywords = ['developer', 'engineer', 'manager', 'analyst', 'architect', 'lead', 'senior', 'junior']
         roles = []
-        for title_kw in title_keywords:
+        for title_kw in self.role_keywords:
             if title_kw in text_lower:
                 roles.append(title_kw)
         
@@ -572,13 +613,20 @@ Recommendations:"""
         
         return features
     
+    def _flatten_skills(self, features):
+        """Skills as a flat list; stored fingerprints keep them flat, fresh extractions by category"""
+        skills = features.get('skills', {})
+        if isinstance(skills, dict):
+            return [s for skill_list in skills.values() for s in skill_list]
+        return list(skills)
+    
     def _compute_resume_fingerprint(self, features):
         """
         Compute a fingerprint hash of the resume based on key features
         """
         # Flatten all features into a string for hashing
         fingerprint_data = {
-            'skills': sorted([s for skill_list in features.get('skills', {}).values() for s in skill_list]),
+            'skills': sorted(self._flatten_skills(features)),
             'education': sorted(features.get('education', [])),
             'experience': features.get('experience', ''),
             'projects': sorted(features.get('projects', [])),
@@ -590,89 +638,126 @@ Recommendations:"""
         
         return fingerprint_hash, fingerprint_data
     
-    def _calculate_similarity(self, features1, features2):
+    def _set_similarity(self, features1, features2):
         """
-        Calculate similarity score between two resume feature sets.
-        Returns a score between 0 and 1, where 1 is identical.
+        Weighted overlap of skills, education and roles: the part of
+        _calculate_similarity that only needs set operations.
         """
         similarity_scores = []
         
         # Skills similarity
-        skills1 = set(s for skill_list in features1.get('skills', {}).values() for s in skill_list)
-        skills2 = set(s for skill_list in features2.get('skills', {}).values() for s in skill_list)
+        skills1 = set(self._flatten_skills(features1))
+        skills2 = set(self._flatten_skills(features2))
         if skills1 or skills2:
             skills_similarity = len(skills1 & skills2) / len(skills1 | skills2) if (skills1 | skills2) else 0
-            similarity_scores.append(skills_similarity * 0.4)  # Weight skills at 40%
+            similarity_scores.append(skills_similarity * self.similarity_weights['skills'])
         
         # Education similarity
         edu1 = set(features1.get('education', []))
         edu2 = set(features2.get('education', []))
         if edu1 or edu2:
             edu_similarity = len(edu1 & edu2) / len(edu1 | edu2) if (edu1 | edu2) else 0
-            similarity_scores.append(edu_similarity * 0.15)  # Weight education at 15%
+            similarity_scores.append(edu_similarity * self.similarity_weights['education'])
+        
+        # Roles similarity
+        roles1 = set(features1.get('roles', []))
+        roles2 = set(features2.get('roles', []))
+        if roles1 or roles2:
+            roles_similarity = len(roles1 & roles2) / len(roles1 | roles2) if (roles1 | roles2) else 0
+            similarity_scores.append(roles_similarity * self.similarity_weights['roles'])
+        
+        return sum(similarity_scores)
+    
+    def _similarity_upper_bound(self, features1, features2):
+        """Never below _calculate_similarity: experience and projects taken at their maximum"""
+        weights = self.similarity_weights
+        return self._set_similarity(features1, features2) + weights['experience'] + weights['projects']
+    
+    def _bitset_index(self):
+        """Memory-mapped skill/degree/role bitsets of every stored fingerprint"""
+        weights = self.similarity_weights
+        skills = [s for skill_list in self.skill_categories.values() for s in skill_list]
+        return resume_bitsets.get_index(settings.RESUME_INDEX_DIR, [
+            ('skills', skills, weights['skills'], self._flatten_skills),
+            ('education', self.degree_keywords, weights['education'], lambda f: f.get('education', [])),
+            ('roles', self.role_keywords, weights['roles'], lambda f: f.get('roles', []))
+        ], fixed_bound=weights['experience'] + weights['projects'])
+    
+    def _calculate_similarity(self, features1, features2):
+        """
+        Calculate similarity score between two resume feature sets.
+        Returns a score between 0 and 1, where 1 is identical.
+        """
+        similarity_scores = [self._set_similarity(features1, features2)]
         
         # Experience similarity
         exp1 = str(features1.get('experience', '')).lower()
         exp2 = str(features2.get('experience', '')).lower()
         exp_similarity = SequenceMatcher(None, exp1, exp2).ratio()
-        similarity_scores.append(exp_similarity * 0.15)  # Weight experience at 15%
+        similarity_scores.append(exp_similarity * self.similarity_weights['experience'])
         
         # Projects similarity
         projects1 = features1.get('projects', [])
         projects2 = features2.get('projects', [])
         project_matches = sum(1 for p1 in projects1 for p2 in projects2 if SequenceMatcher(None, p1, p2).ratio() > 0.7)
-        projects_similarity = project_matches / max(len(projects1), len(projects2), 1)
-        similarity_scores.append(projects_similarity * 0.2)  # Weight projects at 20%
-        
-        # Roles similarity
-        roles1 = set(features1.get('roles', []))
-        roles2 = set(features2.get('roles', []))
-        if roles1 or roles2:
-            roles_similarity = len(roles1 & roles2) / len(roles1 | roles2) if (roles1 | roles2) else 0
-            similarity_scores.append(roles_similarity * 0.1)  # Weight roles at 10%
+        projects_similarity = min(1.0, project_matches / max(len(projects1), len(projects2), 1))
+        similarity_scores.append(projects_similarity * self.similarity_weights['projects'])
         
         total_similarity = sum(similarity_scores)
         return total_similarity
     
-    def _check_resume_uniqueness(self, features, similarity_threshold=0.75):
+    def _duplicate_message(self, similarity):
+        return (
+            f"❌ Resume Upload Failed: This resume is too similar to an existing resume. "
+            f"Similarity Score: {similarity:.1%}\n\n"
+            f"Your resume must be unique with distinct:\n"
+            f"✓ Career insights and professional roles\n"
+            f"✓ Technical skills and expertise areas\n"
+            f"✓ Projects and accomplishments\n\n"
+            f"Please upload a resume that represents a different professional profile."
+        )
+    
+    def _check_resume_uniqueness(self, features, similarity_threshold=Config.RESUME_SIMILARITY_THRESHOLD, fingerprint_hash=None,
+                                 owner=None):
         """
         Check if the resume is unique by comparing with existing resumes.
         Returns (is_unique, most_similar_score, error_message)
         
         similarity_threshold: Resumes with similarity >= this value are considered duplicates
+        fingerprint_hash: when given, an exact match is found with one indexed lookup
+        owner: student whose own stored fingerprints are skipped, so a re-upload or edit is not a duplicate
+        
+        A vectorized bitset pass bounds the similarity against every stored
+        resume and only those that can reach the threshold are scored exactly;
+        the LSH shortlist is used if the bitset file is unavailable.
         """
         try:
-            with open(self.resume_fingerprints_file, 'r') as f:
-                data = json.load(f)
-                existing_resumes = data.get('resumes', [])
-            
-            if not existing_resumes:
-                # First resume is always unique
-                return True, 0.0, None
+            others = self._other_fingerprints(owner)
+            if fingerprint_hash and others.filter(fingerprint_hash=fingerprint_hash).exists():
+                return False, 1.0, self._duplicate_message(1.0)
             
             max_similarity = 0.0
-            most_similar_features = None
             
-            for existing_resume in existing_resumes:
-                existing_features = existing_resume.get('features', {})
-                similarity_score = self._calculate_similarity(features, existing_features)
-                
-                if similarity_score > max_similarity:
-                    max_similarity = similarity_score
-                    most_similar_features = existing_resume
+            try:
+                candidates = self._bitset_index().candidates(features, similarity_threshold)
+            except Exception as e:
+                print(f"Error scanning resume bitsets: {e}")
+                candidates = resume_index.shortlist(features)
+            
+            for start in range(0, len(candidates), 500):
+                batch = candidates[start:start + 500]
+                for existing_features in others.filter(id__in=batch).values_list('features', flat=True):
+                    # Skip the SequenceMatcher work for candidates that cannot reach the threshold
+                    if self._similarity_upper_bound(features, existing_features) < similarity_threshold - 1e-9:
+                        continue
+                    similarity_score = self._calculate_similarity(features, existing_features)
+                    
+                    if similarity_score > max_similarity:
+                        max_similarity = similarity_score
             
             # Check if similarity exceeds threshold
             if max_similarity >= similarity_threshold:
-                error_msg = (
-                    f"❌ Resume Upload Failed: This resume is too similar to an existing resume. "
-                    f"Similarity Score: {max_similarity:.1%}\n\n"
-                    f"Your resume must be unique with distinct:\n"
-                    f"✓ Career insights and professional roles\n"
-                    f"✓ Technical skills and expertise areas\n"
-                    f"✓ Projects and accomplishments\n\n"
-                    f"Please upload a resume that represents a different professional profile."
-                )
-                return False, max_similarity, error_msg
+                return False, max_similarity, self._duplicate_message(max_similarity)
             
             return True, max_similarity, None
             
@@ -681,47 +766,51 @@ Recommendations:"""
             # If there's an error, allow the resume (fail-open)
             return True, 0.0, None
     
-    def _store_resume_fingerprint(self, fingerprint_hash, features):
+    def _other_fingerprints(self, owner):
+        """Stored fingerprints a resume of `owner` is compared with: all but the owner's own"""
+        if owner is None:
+            return ResumeFingerprint.objects.all()
+        return ResumeFingerprint.objects.exclude(student=owner)
+
+    def _store_resume_fingerprint(self, fingerprint_hash, features, owner=None):
         """
-        Store the resume fingerprint for future uniqueness checks
+        Store the resume fingerprint for future uniqueness checks.
+        Inserts are append-only; returns False when the hash is already stored.
         """
         try:
-            with open(self.resume_fingerprints_file, 'r') as f:
-                data = json.load(f)
-            
-            # Add new resume fingerprint
-            resume_entry = {
-                'hash': fingerprint_hash,
-                'features': features,
-                'timestamp': str(os.popen('date').read().strip())
-            }
-            
-            data['resumes'].append(resume_entry)
-            
-            with open(self.resume_fingerprints_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            
+            with transaction.atomic():
+                fingerprint = ResumeFingerprint.objects.create(fingerprint_hash=fingerprint_hash, features=features,
+                                                               student=owner)
+                resume_index.index_fingerprints([fingerprint])
             return True
+        except IntegrityError:
+            return False
         except Exception as e:
             print(f"Error storing resume fingerprint: {e}")
             return False
     
-    def check_and_validate_resume(self, text):
+    def check_and_validate_resume(self, text, owner=None):
         """
         Main method to check if a resume is unique.
+        owner: the uploading student, whose earlier resumes are not compared
         Returns (is_valid, error_message)
         """
         features = self._extract_key_features(text)
         fingerprint_hash, fingerprint_data = self._compute_resume_fingerprint(features)
         
-        is_unique, similarity_score, error_msg = self._check_resume_uniqueness(features, similarity_threshold=0.75)
+        is_unique, similarity_score, error_msg = self._check_resume_uniqueness(
+            features, fingerprint_hash=fingerprint_hash, owner=owner
+        )
         
-        if is_unique:
-            # Store this fingerprint for future comparisons
-            self._store_resume_fingerprint(fingerprint_hash, fingerprint_data)
-            return True, None
-        else:
+        if not is_unique:
             return False, error_msg
+        
+        # Store this fingerprint for future comparisons; the unique hash index
+        # catches an identical resume uploaded concurrently
+        if not self._store_resume_fingerprint(fingerprint_hash, fingerprint_data, owner=owner):
+            if self._other_fingerprints(owner).filter(fingerprint_hash=fingerprint_hash).exists():
+                return False, self._duplicate_message(1.0)
+        return True, None
     
     def _detect_plagiarism_hf(self, text):
         """
@@ -894,11 +983,15 @@ Risk level = hiring risk due to plagiarism"""
         Combines Hugging Face and Router AI results.
         Returns comprehensive plagiarism analysis.
         """
+        results, _ = self._run_stages({
+            'plagiarism_hf': (self._detect_plagiarism_hf, text),
+            'plagiarism_router_ai': (self._detect_plagiarism_router_ai, text)
+        }, Config.RESUME_ANALYSIS_DEADLINE)
+        return self._merge_plagiarism_results(results.get('plagiarism_hf'), results.get('plagiarism_router_ai'))
+    
+    def _merge_plagiarism_results(self, hf_result, router_result):
+        """Combine the plagiarism sources that returned a result; missing sources are skipped"""
         try:
-            # Get plagiarism scores from both sources
-            hf_result = self._detect_plagiarism_hf(text)
-            router_result = self._detect_plagiarism_router_ai(text)
-            
             overall_result = {
                 'percentage': 0.0,
                 'authenticity_score': 50.0,
@@ -0,0 +1,242 @@
+"""
+Resume Bitsets
+Stored resume fingerprints encoded as fixed-width bitsets over the skill, degree
+and role vocabularies, kept in one contiguous memory-mapped numpy array. A
+single vectorized popcount pass gives, for every stored resume, an upper bound
+of ResumeAnalyzer._calculate_similarity; only resumes whose bound reaches the
+threshold need the exact scorer.
+
+The array is a cache of the ResumeFingerprint table. A JSON sidecar records
+the vocabulary fingerprint, row count and last fingerprint id; the file is
+synced from the database before each scan and rebuilt when the vocabulary or
+the table no longer match.
+"""
+import hashlib
+import json
+import os
+import numpy as np
+from ..models import ResumeFingerprint
+
+try:
+    import fcntl
+    LOCK_SUPPORT = True
+except ImportError:
+    LOCK_SUPPORT = False
+
+LAYOUT_VERSION = 1
+INITIAL_CAPACITY = 1024
+HEADER_ROWS = 2
+
+_indexes = {}
+
+
+def unpacked_popcount(words):
+    """Set bits of each uint64, for numpy before 2.0 (which added np.bitwise_count)"""
+    words = np.ascontiguousarray(words, dtype=np.uint64)
+    bits = np.unpackbits(words.view(np.uint8).reshape(words.shape + (8,)), axis=-1)
+    return bits.sum(axis=-1, dtype=np.uint8)
+
+
+popcount = getattr(np, 'bitwise_count', unpacked_popcount)
+
+
+def canonical(value):
+    return str(value).lower().replace('.', '').strip()
+
+
+class BitsetGroup:
+    """One feature group (skills, education, roles) and its slice of the bitset row"""
+
+    def __init__(self, name, vocabulary, weight, offset):
+        self.name = name
+        self.vocabulary = sorted({canonical(term) for term in vocabulary})
+        self.positions = {term: i for i, term in enumerate(self.vocabulary)}
+        self.weight = weight
+        self.words = max(1, (len(self.vocabulary) + 63) // 64)
+        self.columns = slice(offset, offset + self.words)
+        self.flag = 0
+
+    def encode(self, values, row):
+        """Set the bits for values in row; returns False when the bitset cannot reproduce the exact Jaccard"""
+        values = set(values)
+        terms = {canonical(v) for v in values}
+        exact = len(terms) == len(values)
+        for term in terms:
+            position = self.positions.get(term)
+            if position is None:
+                exact = False
+                continue
+            row[self.columns.start + position // 64] |= np.uint64(1) << np.uint64(position % 64)
+        return exact
+
+
+class ResumeBitsetIndex:
+    def __init__(self, directory, groups, fixed_bound):
+        """
+        groups: (name, vocabulary, weight, values_fn) tuples, values_fn(features) -> list
+        fixed_bound: weight of the terms not covered by bitsets, taken at their maximum
+        """
+        self.directory = directory
+        self.path = os.path.join(directory, 'resume_bitsets.npy')
+        self.meta_path = os.path.join(directory, 'resume_bitsets.json')
+        self.lock_path = os.path.join(directory, 'resume_bitsets.lock')
+        self.fixed_bound = fixed_bound
+
+        self.groups = []
+        self.values = {}
+        offset = 0
+        for flag, (name, vocabulary, weight, values_fn) in enumerate(groups):
+            group = BitsetGroup(name, vocabulary, weight, offset)
+            group.flag = 1 << flag
+            offset += group.words
+            self.groups.append(group)
+            self.values[name] = values_fn
+        self.words = offset
+        # Column-major layout: row 0 holds fingerprint ids, row 1 the inexact flags
+        # and the rest one row per bitset word, so each word is scanned contiguously
+        self.height = HEADER_ROWS + self.words
+
+        layout = json.dumps([LAYOUT_VERSION] + [[g.name, g.vocabulary, g.weight] for g in self.groups])
+        self.vocabulary_hash = hashlib.sha256(layout.encode()).hexdigest()
+        self.columns = None
+        self.generation = None
+
+    def encode(self, features):
+        row = np.zeros(self.words, dtype=np.uint64)
+        inexact = 0
+        for group in self.groups:
+            if not group.encode(self.values[group.name](features), row):
+                inexact |= group.flag
+        return row, inexact
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, meta):
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _open(self, meta):
+        if self.generation != meta['generation'] or self.columns is None:
+            self.columns = np.load(self.path, mmap_mode='r+')
+            self.generation = meta['generation']
+
+    def _allocate(self, capacity, meta, keep=0):
+        """Write a new file with the given capacity, carrying over the first `keep` resumes"""
+        tmp_path = self.path + '.tmp'
+        columns = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint64, shape=(self.height, capacity))
+        if keep:
+            columns[:, :keep] = self.columns[:, :keep]
+        columns.flush()
+        del columns
+        os.replace(tmp_path, self.path)
+        meta['capacity'] = capacity
+        meta['generation'] = meta.get('generation', 0) + 1
+        self.columns = None
+
+    def _append(self, meta, fingerprints):
+        for fingerprint_id, features in fingerprints:
+            count = meta['count']
+            if count >= meta['capacity']:
+                self._allocate(meta['capacity'] * 2, meta, keep=count)
+                self._write_meta(meta)
+                self._open(meta)
+            self.columns[:, count] = self._column(fingerprint_id, features)
+            meta['count'] = count + 1
+            meta['last_id'] = fingerprint_id
+        self.columns.flush()
+
+    def _column(self, fingerprint_id, features):
+        row, inexact = self.encode(features)
+        return np.concatenate(([fingerprint_id, inexact], row)).astype(np.uint64)
+
+    def _rebuild(self):
+        meta = {'vocabulary_hash': self.vocabulary_hash, 'count': 0, 'last_id': 0,
+                'generation': (self._read_meta() or {}).get('generation', 0)}
+        capacity = max(INITIAL_CAPACITY, ResumeFingerprint.objects.count())
+        self._allocate(capacity, meta)
+        self._write_meta(meta)
+        self._open(meta)
+        return meta
+
+    def sync(self, rebuild=False):
+        """Bring the array up to date with the ResumeFingerprint table; returns the row count"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.lock_path, 'w') as lock:
+            if LOCK_SUPPORT:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            meta = self._read_meta()
+            if (rebuild or not meta or meta.get('vocabulary_hash') != self.vocabulary_hash
+                    or not os.path.exists(self.path)
+                    or ResumeFingerprint.objects.filter(id__lte=meta['last_id']).count() != meta['count']):
+                meta = self._rebuild()
+            self._open(meta)
+
+            pending = (ResumeFingerprint.objects.filter(id__gt=meta['last_id'])
+                       .order_by('id').values_list('id', 'features'))
+            if pending.exists():
+                self._append(meta, pending.iterator())
+                self._write_meta(meta)
+            return meta['count']
+
+    def encode_columns(self, fingerprints):
+        """Encode (id, features) pairs into an in-memory array with the on-disk layout"""
+        fingerprints = list(fingerprints)
+        columns = np.zeros((self.height, len(fingerprints)), dtype=np.uint64)
+        for i, (fingerprint_id, features) in enumerate(fingerprints):
+            columns[:, i] = self._column(fingerprint_id, features)
+        return columns
+
+    def bounds(self, columns, features):
+        """Similarity upper bound of features against every stored resume, in one vectorized pass"""
+        query, query_inexact = self.encode(features)
+        flags = columns[1]
+        flagged = np.flatnonzero(flags)
+        bound = np.full(columns.shape[1], self.fixed_bound, dtype=np.float32)
+        for group in self.groups:
+            if query_inexact & group.flag:
+                bound += group.weight
+                continue
+            stored = columns[HEADER_ROWS + group.columns.start:HEADER_ROWS + group.columns.stop]
+            q = query[group.columns]
+            if group.words == 1:
+                inter = popcount(stored[0] & q[0])
+                union = popcount(stored[0] | q[0])
+            else:
+                inter = popcount(stored & q[:, None]).sum(axis=0, dtype=np.uint16)
+                union = popcount(stored | q[:, None]).sum(axis=0, dtype=np.uint16)
+            # Both sets empty gives 0/1, matching the exact scorer skipping the term
+            jaccard = inter.astype(np.float32)
+            jaccard /= np.maximum(union, 1)
+            if len(flagged):
+                jaccard[flagged[(flags[flagged] & np.uint64(group.flag)) != 0]] = 1.0
+            jaccard *= group.weight
+            bound += jaccard
+        return bound
+
+    def upper_bounds(self, features):
+        """(fingerprint ids, similarity upper bounds) for every stored resume"""
+        count = self.sync()
+        columns = self.columns[:, :count]
+        return columns[0], self.bounds(columns, features)
+
+    def candidates(self, features, threshold):
+        """Fingerprint ids that can reach threshold, highest bound first"""
+        ids, bound = self.upper_bounds(features)
+        # Tolerance for float32 rounding; extra candidates only cost an exact check
+        keep = np.nonzero(bound >= threshold - 1e-5)[0]
+        keep = keep[np.argsort(-bound[keep], kind='stable')]
+        return ids[keep].tolist()
+
+
+def get_index(directory, groups, fixed_bound):
+    """Process-wide index per directory and layout, so the memory map is opened once"""
+    index = ResumeBitsetIndex(directory, groups, fixed_bound)
+    key = (os.path.abspath(directory), index.vocabulary_hash)
+    return _indexes.setdefault(key, index)
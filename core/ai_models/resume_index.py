@@ -0,0 +1,141 @@
+"""
+Resume Index
+MinHash/LSH index over stored resume fingerprints. Each resume is reduced to a
+set of tokens (skills, roles, degrees, experience and project word shingles),
+summarized by a MinHash signature and split into bands; resumes sharing any
+band bucket become candidates. Only that shortlist is re-scored with the exact
+ResumeAnalyzer._calculate_similarity, so uniqueness checks no longer scan
+every stored resume.
+"""
+import hashlib
+import re
+from functools import lru_cache
+import numpy as np
+from django.db.models import Count
+from ..models import ResumeFingerprint, ResumeLSHBucket
+from .config import Config
+
+_HASH_PRIME = np.uint64(4294967311)  # Smallest prime above 2**32
+_HASH_SEED = 1
+_permutations = {}
+
+# Skills carry the largest weight in the exact similarity, so each one is
+# repeated to give it a matching share of the token set
+SKILL_REPLICAS = 4
+DEGREE_REPLICAS = 2
+
+
+def _flatten(values):
+    if isinstance(values, dict):
+        return [v for group in values.values() for v in group]
+    return list(values or [])
+
+
+def resume_tokens(features):
+    """Token set approximating the weighted feature overlap used by the exact scorer"""
+    tokens = set()
+    for skill in _flatten(features.get('skills')):
+        for replica in range(SKILL_REPLICAS):
+            tokens.add(f'skill:{skill.lower()}:{replica}')
+    for degree in features.get('education', []):
+        for replica in range(DEGREE_REPLICAS):
+            tokens.add(f'edu:{degree.lower()}:{replica}')
+    for role in features.get('roles', []):
+        tokens.add(f'role:{role.lower()}')
+    experience = str(features.get('experience', '')).lower()
+    if experience:
+        tokens.add(f'exp:{experience}')
+    for project in features.get('projects', []):
+        words = re.findall(r'\w+', project.lower())
+        for i in range(max(1, len(words) - 1)):
+            tokens.add('proj:' + ' '.join(words[i:i + 2]))
+    return tokens
+
+
+def _permutation_params(num_perm):
+    if num_perm not in _permutations:
+        rng = np.random.default_rng(_HASH_SEED)
+        a = rng.integers(1, 2 ** 31, size=num_perm, dtype=np.uint64)
+        b = rng.integers(0, 2 ** 31, size=num_perm, dtype=np.uint64)
+        _permutations[num_perm] = (a, b)
+    return _permutations[num_perm]
+
+
+@lru_cache(maxsize=65536)
+def _token_hash(token):
+    # Stable 32-bit token hash; Python's hash() is salted per process
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=4).digest(), 'little')
+
+
+def minhash_signature(tokens, num_perm=None):
+    """MinHash signature as a uint64 array; None for an empty token set"""
+    if not tokens:
+        return None
+    num_perm = num_perm or Config.RESUME_LSH_NUM_PERM
+    hashes = np.fromiter((_token_hash(t) for t in tokens), dtype=np.uint64, count=len(tokens))
+    a, b = _permutation_params(num_perm)
+    return ((np.outer(a, hashes) + b[:, None]) % _HASH_PRIME).min(axis=1)
+
+
+def band_keys(signature, bands=None):
+    """One signed 64-bit bucket key per band; the band number is mixed in so keys never collide across bands"""
+    if signature is None:
+        return []
+    bands = bands or Config.RESUME_LSH_BANDS
+    keys = []
+    for band, rows in enumerate(np.array_split(signature, bands)):
+        digest = hashlib.blake2b(band.to_bytes(2, 'little') + rows.tobytes(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+
+def feature_band_keys(features):
+    return band_keys(minhash_signature(resume_tokens(features)))
+
+
+def index_fingerprints(fingerprints):
+    """Add bucket rows for the given ResumeFingerprint instances; returns how many were indexed"""
+    rows = []
+    indexed = 0
+    for fingerprint in fingerprints:
+        rows.extend(
+            ResumeLSHBucket(fingerprint_id=fingerprint.id, bucket=key)
+            for key in feature_band_keys(fingerprint.features)
+        )
+        indexed += 1
+    ResumeLSHBucket.objects.bulk_create(rows)
+    return indexed
+
+
+def _index_queryset(queryset, batch_size):
+    # Collect IDs first so bucket inserts never interleave with an open cursor
+    ids = list(queryset.values_list('id', flat=True))
+    indexed = 0
+    for start in range(0, len(ids), batch_size):
+        batch = ResumeFingerprint.objects.filter(id__in=ids[start:start + batch_size]).only('id', 'features')
+        indexed += index_fingerprints(batch)
+    return indexed
+
+
+def index_unindexed(batch_size=1000):
+    """Index fingerprints that have no buckets yet, e.g. rows bulk-imported from the legacy file"""
+    return _index_queryset(ResumeFingerprint.objects.filter(lsh_buckets__isnull=True), batch_size)
+
+
+def rebuild_index(batch_size=1000):
+    """Drop and rebuild all buckets; needed after changing the LSH settings"""
+    ResumeLSHBucket.objects.all().delete()
+    return _index_queryset(ResumeFingerprint.objects.all(), batch_size)
+
+
+def shortlist(features, limit=None):
+    """IDs of stored fingerprints sharing at least one band with these features, most shared bands first"""
+    keys = feature_band_keys(features)
+    if not keys:
+        return []
+    limit = limit or Config.RESUME_LSH_MAX_CANDIDATES
+    matches = (ResumeLSHBucket.objects.filter(bucket__in=keys)
+               .values('fingerprint_id')
+               .annotate(hits=Count('id'))
+               .order_by('-hits')[:limit])
+    return [match['fingerprint_id'] for match in matches]
@@ -1,20 +1,10 @@
-try:
-    import PyPDF2
-    PDF_SUPPORT = True
-except ImportError:
-    PDF_SUPPORT = False
-from docx import Document
 import re
+from ..extraction import PDF_SUPPORT, extract_text
+from .skill_taxonomy import get_taxonomy
 
 class ResumeParser:
     def __init__(self):
-        self.skills_keywords = [
-            'python', 'java', 'javascript', 'html', 'css', 'react', 'angular', 'vue',
-            'node.js', 'express', 'django', 'flask', 'spring', 'sql', 'mongodb',
-            'postgresql', 'aws', 'azure', 'docker', 'kubernetes', 'git', 'jenkins',
-            'machine learning', 'ai', 'data analysis', 'project management', 'agile',
-            'scrum', 'leadership', 'communication', 'problem solving', 'teamwork'
-        ]
+        self.taxonomy = get_taxonomy()
     
     def parse_resume(self, file):
         filename = file.filename.lower()
@@ -32,28 +22,13 @@ class ResumeParser:
         if not PDF_SUPPORT:
             return "PDF parsing not available - PyPDF2 not installed"
 
-        pdf_reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        return text
+        return extract_text(file, 'resume.pdf') or ""
     
     def _parse_docx(self, file):
-        doc = Document(file)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
+        return extract_text(file, 'resume.docx') or ""
     
     def extract_skills(self, text):
-        text_lower = text.lower()
-        found_skills = []
-        
-        for skill in self.skills_keywords:
-            if skill in text_lower:
-                found_skills.append(skill.title())
-        
-        return list(set(found_skills))  # Remove duplicates
+        return list(self.taxonomy.extract(text))
     
     def extract_experience(self, text):
         # Simple experience extraction using regex
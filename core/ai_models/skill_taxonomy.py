@@ -0,0 +1,103 @@
+"""
+Skill Taxonomy
+Canonical skill names with their synonyms and categories, loaded from
+data/skills/skill_taxonomy.json and compiled once into a single regex shaped
+like a trie of every synonym. One scan of the text finds all skills with their
+positions. Matches need a boundary on both sides, so 'java' does not match
+inside 'javascript'. Only the listed synonyms match, which keeps ambiguous
+names such as 'R' or 'Go' to unambiguous phrases.
+"""
+import json
+import os
+import re
+from functools import lru_cache
+
+TAXONOMY_FILE = os.path.join(os.path.dirname(__file__), 'data', 'skills', 'skill_taxonomy.json')
+
+# Characters that continue a skill name: 'c' followed by '++' or '#' is another skill
+_BOUNDARY_CHARS = r'\w+#'
+
+
+def _trie_pattern(words):
+    """Regex alternation for words with shared prefixes factored out, so matching never retries a prefix"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        branches = []
+        for char, child in sorted(node.items()):
+            if char:
+                branches.append((r'\s+' if char == ' ' else re.escape(char)) + build(child))
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{pattern})?' if '' in node else pattern
+
+    return build(trie)
+
+
+class SkillTaxonomy:
+    def __init__(self, path=TAXONOMY_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.version = data.get('version', 1)
+        self.categories = {}
+        self.category_of = {}
+        self.synonyms = {}
+        for category, skills in data['categories'].items():
+            self.categories[category] = list(skills)
+            for name, synonyms in skills.items():
+                self.category_of[name] = category
+                for synonym in synonyms:
+                    self.synonyms[' '.join(synonym.lower().split())] = name
+
+        source = rf'(?<![{_BOUNDARY_CHARS}])(?:{_trie_pattern(self.synonyms)})(?![{_BOUNDARY_CHARS}])'
+        # Matching lowercased text is much faster than IGNORECASE; the latter is kept
+        # for text whose lowercase form changes length, which would shift positions
+        self.pattern = re.compile(source)
+        self.pattern_ignorecase = re.compile(source, re.IGNORECASE)
+
+    @property
+    def names(self):
+        return list(self.category_of)
+
+    def find(self, text):
+        """(canonical name, start, end) for every skill mention, in text order"""
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            matches = self.pattern.finditer(lowered)
+        else:
+            matches = self.pattern_ignorecase.finditer(text)
+        return [(self.synonyms[' '.join(match.group(0).lower().split())], match.start(), match.end())
+                for match in matches]
+
+    def extract(self, text):
+        """{name: {'category', 'count', 'positions'}} in order of first mention"""
+        found = {}
+        for name, start, _ in self.find(text):
+            entry = found.setdefault(name, {'category': self.category_of[name], 'count': 0, 'positions': []})
+            entry['count'] += 1
+            entry['positions'].append(start)
+        return found
+
+    @staticmethod
+    def group(mentions):
+        """{category: [names]} from the result of extract"""
+        grouped = {}
+        for name, entry in mentions.items():
+            grouped.setdefault(entry['category'], []).append(name)
+        return grouped
+
+    def by_category(self, text):
+        """{category: [names]} for the categories that have at least one skill in the text"""
+        return self.group(self.extract(text))
+
+
+@lru_cache(maxsize=None)
+def get_taxonomy(path=TAXONOMY_FILE):
+    """Taxonomy compiled once per process"""
+    return SkillTaxonomy(path)
@@ -0,0 +1,168 @@
+"""
+Assignment analytics
+Per-assignment submission count, distinct submitters, mean score, score
+distribution and last submission time come from one GROUP BY query over the
+teacher's assignments (stats_queryset). The results are kept in
+AssignmentStats, which the submission signals update in place as work is
+submitted and graded, so dashboards read one row per assignment instead of
+scanning submissions.
+
+Scores are out of 10 and bucketed by whole point; the median is interpolated
+within its bucket, so it is exact to within one point.
+"""
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Q, Sum
+
+from .models import Assignment, AssignmentStats, Profile, Submission
+
+SCORE_BUCKETS = 11
+
+
+def score_bucket(score):
+    return min(max(int(score), 0), SCORE_BUCKETS - 1)
+
+
+def _bucket_filter(bucket):
+    if bucket == 0:
+        return Q(submissions__score__lt=1)
+    if bucket == SCORE_BUCKETS - 1:
+        return Q(submissions__score__gte=bucket)
+    return Q(submissions__score__gte=bucket, submissions__score__lt=bucket + 1)
+
+
+def stats_queryset(assignments):
+    """The assignments annotated with every rollup field, in a single query"""
+    buckets = {f'bucket_{b}': Count('submissions', filter=_bucket_filter(b)) for b in range(SCORE_BUCKETS)}
+    return assignments.order_by().annotate(
+        submission_count=Count('submissions'),
+        student_count=Count('submissions__student', distinct=True),
+        graded_count=Count('submissions__score'),
+        score_sum=Sum('submissions__score'),
+        mean_score=Avg('submissions__score'),
+        last_submission_at=Max('submissions__submitted_at'),
+        **buckets
+    )
+
+
+def refresh(assignment_ids):
+    """Recompute the rollup rows of the given assignments from their submissions"""
+    rows = []
+    for assignment in stats_queryset(Assignment.objects.filter(pk__in=assignment_ids)):
+        rows.append(AssignmentStats(
+            assignment=assignment,
+            submission_count=assignment.submission_count,
+            student_count=assignment.student_count,
+            graded_count=assignment.graded_count,
+            score_sum=assignment.score_sum or 0,
+            score_histogram=[getattr(assignment, f'bucket_{b}') for b in range(SCORE_BUCKETS)],
+            last_submission_at=assignment.last_submission_at
+        ))
+    AssignmentStats.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=['assignment'],
+        update_fields=['submission_count', 'student_count', 'graded_count', 'score_sum', 'score_histogram',
+                       'last_submission_at', 'updated_at']
+    )
+    return {row.assignment_id: row for row in rows}
+
+
+def _apply_score(stats, score, sign):
+    if score is None:
+        return
+    if len(stats.score_histogram) != SCORE_BUCKETS:
+        stats.score_histogram = [0] * SCORE_BUCKETS
+    stats.graded_count += sign
+    stats.score_sum += sign * score
+    stats.score_histogram[score_bucket(score)] += sign
+
+
+def record_submission(submission, created, previous=None):
+    """
+    Fold one saved submission into its assignment's rollup. `previous` holds the
+    score, student_id and assignment_id the row had before an update.
+    """
+    if previous and (previous['assignment_id'] != submission.assignment_id
+                     or previous['student_id'] != submission.student_id):
+        refresh({previous['assignment_id'], submission.assignment_id})
+        return
+    if not created and (previous is None or previous['score'] == submission.score):
+        return
+
+    with transaction.atomic():
+        stats = AssignmentStats.objects.select_for_update().filter(assignment_id=submission.assignment_id).first()
+        if stats is None:
+            # First write for an assignment from before the rollup existed; the
+            # recomputation already includes this submission
+            refresh([submission.assignment_id])
+            return
+        if created:
+            stats.submission_count += 1
+            if not Submission.objects.filter(assignment_id=submission.assignment_id,
+                                             student_id=submission.student_id).exclude(pk=submission.pk).exists():
+                stats.student_count += 1
+            if stats.last_submission_at is None or submission.submitted_at > stats.last_submission_at:
+                stats.last_submission_at = submission.submitted_at
+        else:
+            _apply_score(stats, previous['score'], -1)
+        _apply_score(stats, submission.score, 1)
+        stats.save()
+
+
+def student_total():
+    return Profile.objects.filter(role='STUDENT').count()
+
+
+def median_from_histogram(histogram):
+    """Median score interpolated within its whole-point bucket; None without graded submissions"""
+    total = sum(histogram)
+    if not total:
+        return None
+    target = total / 2
+    seen = 0
+    for bucket, count in enumerate(histogram):
+        if count and seen + count >= target:
+            if bucket == len(histogram) - 1:
+                return float(bucket)
+            return bucket + (target - seen) / count
+        seen += count
+    return float(len(histogram) - 1)
+
+
+def summarize(stats, students):
+    """Template-ready figures from a rollup row and the number of students"""
+    histogram = stats.score_histogram or [0] * SCORE_BUCKETS
+    peak = max(histogram) or 1
+    return {
+        'submissions': stats.submission_count,
+        'pending': max(students - stats.student_count, 0),
+        'graded': stats.graded_count,
+        'mean': stats.score_sum / stats.graded_count if stats.graded_count else None,
+        'median': median_from_histogram(histogram),
+        'distribution': [{'score': b, 'count': c, 'percent': round(c * 100 / peak)} for b, c in enumerate(histogram)],
+        'last_submission_at': stats.last_submission_at
+    }
+
+
+def with_stats(assignments):
+    """
+    The assignments (a queryset, or instances fetched with select_related('stats'))
+    as a list, each with a `summary` dict. Rows missing for older assignments are
+    built with one aggregate query.
+    """
+    if hasattr(assignments, 'select_related'):
+        assignments = assignments.select_related('stats')
+    assignments = list(assignments)
+    missing = []
+    for assignment in assignments:
+        try:
+            assignment.stats
+        except AssignmentStats.DoesNotExist:
+            missing.append(assignment)
+    if missing:
+        built = refresh([a.pk for a in missing])
+        for assignment in missing:
+            assignment.stats = built[assignment.pk]
+
+    students = student_total()
+    for assignment in assignments:
+        assignment.summary = summarize(assignment.stats, students)
+    return assignments
@@ -0,0 +1,137 @@
+"""
+Fragment caching
+Computed page data (counts, dashboard pages, history lists) is cached in two
+tiers: the 'default' local-memory cache of this process in front of the
+'shared' database cache every process sees. Keys carry the generation of
+each scope they depend on, a user ('user:<id>') or a global scope such as
+'assignments'. The signals in core/signals.py bump those generations in the
+shared tier once a write commits, which retires every key built on the old
+value in both tiers at once; nothing has to find and delete keys. Each
+process keeps the generations it read in its local tier for
+GENERATION_TTL seconds, so a local hit costs no database round trip; a
+bump is seen at once by the process that made it and within that many
+seconds by the others.
+
+Hits and misses are counted per fragment name in this process (stats()).
+Any cache error falls back to computing the value.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+FRAGMENT_PREFIX = 'fragment'
+GENERATION_PREFIX = 'generation'
+GENERATION_TTL = 5  # Seconds a process trusts its local copy of a generation
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _count(name, outcome):
+    with _stats_lock:
+        counts = _stats.setdefault(name, {'local_hits': 0, 'shared_hits': 0, 'misses': 0})
+        counts[outcome] += 1
+
+
+def stats():
+    """{name: {'local_hits', 'shared_hits', 'misses', 'hit_rate'}} for this process"""
+    with _stats_lock:
+        result = {}
+        for name, counts in _stats.items():
+            total = sum(counts.values())
+            hits = counts['local_hits'] + counts['shared_hits']
+            result[name] = dict(counts, hit_rate=round(hits / total, 3) if total else 0.0)
+        return result
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def user_scope(user):
+    return f"user:{getattr(user, 'pk', user)}"
+
+
+def _generations(scopes):
+    """Current generation of each scope, starting unseen scopes at a fresh value"""
+    local, shared = caches['default'], caches['shared']
+    keys = [f'{GENERATION_PREFIX}:{scope}' for scope in scopes]
+    found = local.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        fetched = shared.get_many(missing)
+        for key in missing:
+            if key not in fetched:
+                # A clock value, so a scope whose generation was evicted never reuses an old one
+                shared.add(key, time.time_ns(), timeout=None)
+                fetched[key] = shared.get(key)
+        local.set_many(fetched, GENERATION_TTL)
+        found.update(fetched)
+    return [found[key] for key in keys]
+
+
+def bump(*scopes):
+    """Retire every fragment cached under these scopes"""
+    local, shared = caches['default'], caches['shared']
+    for scope in scopes:
+        key = f'{GENERATION_PREFIX}:{scope}'
+        try:
+            try:
+                generation = shared.incr(key)
+            except ValueError:
+                generation = time.time_ns()
+                shared.set(key, generation, timeout=None)
+            local.set(key, generation, GENERATION_TTL)
+        except Exception as e:
+            print(f"Error invalidating cache scope {scope}: {e}")
+
+
+def bump_on_commit(*scopes):
+    """Bump once the current transaction commits, so readers cannot re-cache the old rows"""
+    transaction.on_commit(lambda: bump(*scopes))
+
+
+def cached(name, compute, user=None, scopes=(), vary=(), timeout=None):
+    """
+    compute() cached under `name`, the user's scope, any global `scopes` and the
+    `vary` values (a page cursor, say). timeout defaults to the shared tier's.
+    """
+    if not getattr(settings, 'CACHE_FRAGMENTS', True):
+        return compute()
+    scopes = ([user_scope(user)] if user is not None else []) + list(scopes)
+    try:
+        generations = _generations(scopes)
+        digest = hashlib.sha1(repr((scopes, generations, list(vary))).encode()).hexdigest()
+        key = f'{FRAGMENT_PREFIX}:{name}:{digest}'
+        local, shared = caches['default'], caches['shared']
+        value = local.get(key)
+        if value is not None:
+            _count(name, 'local_hits')
+            return value
+        value = shared.get(key)
+        if value is not None:
+            _count(name, 'shared_hits')
+            local.set(key, value)
+            return value
+    except Exception as e:
+        print(f"Error reading cache for {name}: {e}")
+        return compute()
+
+    _count(name, 'misses')
+    value = compute()
+    try:
+        shared.set(key, value, timeout)
+        local.set(key, value)
+    except Exception as e:
+        print(f"Error writing cache for {name}: {e}")
+    return value
+
+
+def cached_queryset(name, queryset, user=None, scopes=(), vary=(), timeout=None):
+    """The queryset's rows as a list, cached like cached()"""
+    return cached(name, lambda: list(queryset), user=user, scopes=scopes, vary=vary, timeout=timeout)
@@ -0,0 +1,17 @@
+"""
+SQLite backend that opens transactions with BEGIN IMMEDIATE
+A plain BEGIN starts a read transaction that has to upgrade to a write lock
+at its first write. When another connection wrote in between, SQLite fails
+the upgrade at once with "database is locked" instead of waiting out
+busy_timeout, which hits every atomic block that reads before it writes
+(get_or_create, select_for_update, the rollup updates). Taking the write lock
+at BEGIN makes those blocks queue on busy_timeout like single statements do.
+Set TRANSACTION_MODE in the database settings to DEFERRED or EXCLUSIVE to
+change it; Django 5.1 offers the same as OPTIONS['transaction_mode'].
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f"BEGIN {self.settings_dict.get('TRANSACTION_MODE', 'IMMEDIATE')}")
@@ -0,0 +1,80 @@
+"""
+Database profiles
+settings.DATABASES is built from the DB_PROFILE environment variable:
+
+  sqlite (default)  db.sqlite3, or SQLITE_PATH. Every new connection gets the
+                    PRAGMAS of its settings: WAL journaling so readers never
+                    block the writer, a busy timeout so writers queue for the
+                    lock instead of failing with "database is locked",
+                    synchronous=NORMAL (durable at checkpoints, safe with WAL)
+                    and memory-mapped reads. Transactions begin IMMEDIATE so
+                    the busy timeout also covers read-then-write blocks.
+  postgres          POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD,
+                    POSTGRES_HOST and POSTGRES_PORT, with connections kept
+                    open for DB_CONN_MAX_AGE seconds and health-checked
+                    before reuse. Needs psycopg2 or psycopg installed.
+
+This module is imported by settings, so it must not import models.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def sqlite_profile(base_dir, env):
+    busy_timeout_ms = int(env.get('SQLITE_BUSY_TIMEOUT_MS', 20000))
+    return {
+        # Django's SQLite backend with write transactions that wait for the lock; see core/db_backends
+        'ENGINE': 'core.db_backends.sqlite3',
+        'NAME': env.get('SQLITE_PATH') or base_dir / 'db.sqlite3',
+        # The driver's own wait for the lock, matched to busy_timeout
+        'OPTIONS': {'timeout': busy_timeout_ms / 1000},
+        'PRAGMAS': {
+            'journal_mode': 'WAL',
+            'busy_timeout': busy_timeout_ms,
+            'synchronous': 'NORMAL',
+            'mmap_size': int(env.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+            'temp_store': 'MEMORY',
+        },
+    }
+
+
+def postgres_profile(base_dir, env):
+    return {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': env.get('POSTGRES_DB', 'studyroom'),
+        'USER': env.get('POSTGRES_USER', 'studyroom'),
+        'PASSWORD': env.get('POSTGRES_PASSWORD', ''),
+        'HOST': env.get('POSTGRES_HOST', 'localhost'),
+        'PORT': env.get('POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': int(env.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'connect_timeout': int(env.get('POSTGRES_CONNECT_TIMEOUT', 5))},
+    }
+
+
+PROFILES = {
+    'sqlite': sqlite_profile,
+    'postgres': postgres_profile,
+}
+
+
+def database_settings(base_dir, env=None):
+    """DATABASES for the profile named by DB_PROFILE"""
+    env = os.environ if env is None else env
+    name = env.get('DB_PROFILE', 'sqlite').lower()
+    if name not in PROFILES:
+        raise ImproperlyConfigured(f"Unknown DB_PROFILE '{name}', expected one of: {', '.join(PROFILES)}")
+    return {'default': PROFILES[name](base_dir, env)}
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    pragmas = connection.settings_dict.get('PRAGMAS')
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
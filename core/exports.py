@@ -0,0 +1,162 @@
+"""
+Streaming exports
+Submissions, interview results and proctoring sessions as CSV, JSONL or
+Excel-compatible CSV (a UTF-8 byte order mark so Excel detects the encoding,
+and cells that Excel would run as formulas escaped). Rows come from
+values_list().iterator(chunk_size=EXPORT_CHUNK_SIZE), so neither model
+instances nor the result set are held in memory, and are encoded into
+chunks of about EXPORT_BUFFER_BYTES that a StreamingHttpResponse or the
+export_data command writes out as they are produced. Under ASGI the response
+gets astream(), an async iterator pulling one chunk at a time, because
+Django collects a sync iterator into a list before sending any of it there.
+Memory stays the same for a hundred rows or a million; bench_exports
+measures it through the response.
+"""
+import csv
+import json
+
+from asgiref.sync import sync_to_async
+from django.db.models import F
+
+from .models import Interview, ProctoringSession, Submission
+
+EXPORT_CHUNK_SIZE = 500
+EXPORT_BUFFER_BYTES = 64 * 1024
+
+FORMATS = {
+    # name: (content type, file extension)
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'excel': ('text/csv; charset=utf-8', 'csv'),
+}
+
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class Export:
+    """Column headers and the queryset expressions behind them"""
+
+    def __init__(self, name, queryset, columns):
+        self.name = name
+        self.queryset = queryset
+        self.headers = [header for header, expression in columns]
+        self.expressions = {f'export_{n}': expression for n, (header, expression) in enumerate(columns)}
+
+    def rows(self):
+        values = (self.queryset.annotate(**self.expressions).values_list(*self.expressions)
+                  .iterator(chunk_size=EXPORT_CHUNK_SIZE))
+        for row in values:
+            yield [value.isoformat() if hasattr(value, 'isoformat') else value for value in row]
+
+
+def submissions_export(assignment):
+    return Export(f'assignment-{assignment.pk}-submissions', assignment.submissions.order_by('submitted_at', 'pk'), [
+        ('submission_id', F('pk')),
+        ('student', F('student__username')),
+        ('email', F('student__email')),
+        ('submitted_at', F('submitted_at')),
+        ('score', F('score')),
+        ('feedback', F('ai_feedback')),
+    ])
+
+
+def interviews_export(queryset=None):
+    queryset = Interview.objects.all() if queryset is None else queryset
+    return Export('interviews', queryset.order_by('created_at', 'pk'), [
+        ('interview_id', F('pk')),
+        ('student', F('student__username')),
+        ('role', F('role_type')),
+        ('created_at', F('created_at')),
+        ('score', F('score')),
+        ('recommendation', F('ai_recommendation')),
+    ])
+
+
+def proctoring_export(queryset=None):
+    # The transcript and per-answer summaries stay out; they are the bulk of each row
+    queryset = ProctoringSession.objects.all() if queryset is None else queryset
+    return Export('proctoring-sessions', queryset.order_by('started_at', 'pk'), [
+        ('session_id', F('pk')),
+        ('student', F('student__username')),
+        ('role', F('role_type')),
+        ('status', F('status')),
+        ('started_at', F('started_at')),
+        ('ended_at', F('ended_at')),
+        ('responses', F('response_count')),
+        ('scored', F('scored_count')),
+        ('score_total', F('score_total')),
+        ('score', F('score')),
+        ('integrity_score', F('integrity_score')),
+        ('flagged_issues', F('flagged_issues')),
+    ])
+
+
+class _Lines:
+    """File-like target for csv.writer that hands back what was written"""
+
+    def write(self, line):
+        return line
+
+
+def _excel_cell(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _cell(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _lines(export, fmt):
+    if fmt == 'jsonl':
+        for row in export.rows():
+            yield json.dumps(dict(zip(export.headers, row)), ensure_ascii=False) + '\n'
+        return
+    writer = csv.writer(_Lines())
+    if fmt == 'excel':
+        yield '\ufeff'
+        yield writer.writerow(export.headers)
+        for row in export.rows():
+            yield writer.writerow([_excel_cell(_cell(value)) for value in row])
+    else:
+        yield writer.writerow(export.headers)
+        for row in export.rows():
+            yield writer.writerow([_cell(value) for value in row])
+
+
+def stream(export, fmt):
+    """The export as UTF-8 chunks of about EXPORT_BUFFER_BYTES"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of: {', '.join(FORMATS)}")
+    buffer = []
+    size = 0
+    for line in _lines(export, fmt):
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_BUFFER_BYTES:
+            yield ''.join(buffer).encode()
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer).encode()
+
+
+async def astream(export, fmt):
+    """stream() for ASGI responses; each chunk is produced in the sync thread as it is needed"""
+    chunks = stream(export, fmt)
+    next_chunk = sync_to_async(next)
+    try:
+        while True:
+            chunk = await next_chunk(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close)()
+
+
+def filename(export, fmt):
+    return f"{export.name}.{FORMATS[fmt][1]}"
@@ -0,0 +1,191 @@
+"""
+Document text extraction
+One bounded code path for the text of uploaded resumes and assignment
+submissions. Each document is parsed in worker processes of its own: PDF
+pages are split into ranges extracted in parallel, and a malformed file that
+hangs or crashes its workers costs only that document, since no other
+document's tasks run in them. Workers fork from a server that has the
+parsers imported already, and at most EXTRACTION_DOCUMENTS documents are
+parsed at once. Inputs are capped in bytes, pages and wall-clock time; pages
+that miss the deadline are left out and the result is marked truncated.
+"""
+import io
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from .ai_models.config import Config
+
+try:
+    import PyPDF2
+    PDF_SUPPORT = True
+except ImportError:
+    PDF_SUPPORT = False
+
+try:
+    from docx import Document
+    DOCX_SUPPORT = True
+except ImportError:
+    DOCX_SUPPORT = False
+
+TEXT_FALLBACK_ENCODING = 'cp1252'  # Plain text that is not valid UTF-8 is usually Windows Latin-1
+
+_context = None
+_context_lock = threading.Lock()
+_document_slots = threading.BoundedSemaphore(Config.EXTRACTION_DOCUMENTS)
+
+
+# Worker-side functions; they only see bytes, never Django objects
+
+def _pdf_page_count(data):
+    return len(PyPDF2.PdfReader(io.BytesIO(data)).pages)
+
+
+def _pdf_pages(data, start, stop):
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return [reader.pages[i].extract_text() or '' for i in range(start, stop)]
+
+
+def _docx_text(data):
+    return ''.join(paragraph.text + '\n' for paragraph in Document(io.BytesIO(data)).paragraphs)
+
+
+def _mp_context():
+    global _context
+    with _context_lock:
+        if _context is None:
+            if 'forkserver' in multiprocessing.get_all_start_methods():
+                # forkserver children start from a clean process instead of a copy of a threaded server,
+                # with the parsers imported once in the server rather than in every worker
+                _context = multiprocessing.get_context('forkserver')
+                _context.set_forkserver_preload(
+                    [module for module, available in (('PyPDF2', PDF_SUPPORT), ('docx', DOCX_SUPPORT)) if available]
+                )
+            else:
+                _context = multiprocessing.get_context('spawn')
+        return _context
+
+
+def _kill(pool):
+    """Kill a document's workers, e.g. ones still parsing a hung file"""
+    for process in list((pool._processes or {}).values()):
+        process.kill()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _remaining(deadline):
+    return max(0.0, deadline - time.monotonic())
+
+
+def _read_source(source):
+    """Bytes of a path, bytes or file-like object, reading at most one byte past the size cap"""
+    limit = Config.EXTRACTION_MAX_BYTES
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source[:limit + 1])
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return f.read(limit + 1)
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    data = source.read(limit + 1)
+    return data.encode('utf-8') if isinstance(data, str) else data
+
+
+def _extract_pdf(pool, data, result, deadline, max_pages):
+    page_count = pool.submit(_pdf_page_count, data).result(timeout=_remaining(deadline))
+    pages = min(page_count, max_pages)
+    result['truncated'] = page_count > pages
+
+    step = max(Config.EXTRACTION_PAGES_PER_TASK, math.ceil(pages / Config.EXTRACTION_WORKERS))
+    futures = [pool.submit(_pdf_pages, data, start, min(start + step, pages)) for start in range(0, pages, step)]
+    done, not_done = wait(futures, timeout=_remaining(deadline))
+    if not_done:
+        result['truncated'] = True
+        result['error'] = f"timed out after {len(done)} of {len(futures)} page ranges"
+
+    texts = []
+    for future in futures:
+        if future not in done:
+            continue
+        if future.exception() is not None:
+            if isinstance(future.exception(), BrokenProcessPool):
+                raise future.exception()
+            result['truncated'] = True
+            result['error'] = str(future.exception())
+            continue
+        texts.extend(future.result())
+    result['pages'] = len(texts)
+    return ''.join(texts)
+
+
+def decode_text(data):
+    """Plain text as UTF-8, switching to TEXT_FALLBACK_ENCODING from the first byte that is not"""
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError as e:
+        return data[:e.start].decode('utf-8') + data[e.start:].decode(TEXT_FALLBACK_ENCODING, errors='replace')
+
+
+def extract_document(source, file_name, max_pages=None, timeout=None, file_type=None):
+    """
+    Text of a PDF, DOCX or plain-text document given as a path, bytes or file object.
+    file_type ('pdf', 'docx', ...) overrides the type implied by the file name extension.
+    Returns {'text', 'pages', 'truncated', 'error'}; text is None when nothing could be extracted.
+    """
+    result = {'text': None, 'pages': 0, 'truncated': False, 'error': None}
+    data = _read_source(source)
+    if len(data) > Config.EXTRACTION_MAX_BYTES:
+        result['error'] = f"file is larger than {Config.EXTRACTION_MAX_BYTES} bytes"
+        return result
+
+    kind = '.' + file_type if file_type else os.path.splitext(file_name.lower())[1]
+    if kind == '.pdf' and not PDF_SUPPORT:
+        result['error'] = "PDF parsing not available - PyPDF2 not installed"
+        return result
+    if kind == '.docx' and not DOCX_SUPPORT:
+        result['error'] = "DOCX parsing not available - python-docx not installed"
+        return result
+    if kind == '.doc':
+        # Word 97-2003 binaries; decoding them as text only yields noise
+        result['error'] = "Word 97-2003 (.doc) files are not supported, save the document as DOCX or PDF"
+        return result
+    if kind not in ('.pdf', '.docx'):
+        result['text'] = decode_text(data)
+        return result
+
+    deadline = time.monotonic() + (timeout or Config.EXTRACTION_TIMEOUT)
+    if not _document_slots.acquire(timeout=_remaining(deadline)):
+        result['error'] = "timed out waiting for an extraction worker"
+        return result
+    pool = ProcessPoolExecutor(max_workers=Config.EXTRACTION_WORKERS, mp_context=_mp_context())
+    try:
+        if kind == '.pdf':
+            result['text'] = _extract_pdf(pool, data, result, deadline, max_pages or Config.EXTRACTION_MAX_PAGES)
+        else:
+            result['text'] = pool.submit(_docx_text, data).result(timeout=_remaining(deadline))
+            result['pages'] = 1
+    except TimeoutError:
+        result['error'] = "timed out"
+    except BrokenProcessPool:
+        result['error'] = "worker crashed"
+    except Exception as e:
+        result['error'] = str(e)
+    finally:
+        if result['error']:
+            _kill(pool)
+        else:
+            pool.shutdown(wait=True)
+        _document_slots.release()
+    return result
+
+
+def extract_text(source, file_name, max_pages=None, timeout=None, file_type=None):
+    """Extracted text, or None when the document could not be read"""
+    result = extract_document(source, file_name, max_pages=max_pages, timeout=timeout, file_type=file_type)
+    if result['error']:
+        print(f"Error extracting text from {file_name}: {result['error']}")
+    return result['text']
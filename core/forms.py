@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
+from .uploads import DOCUMENT_TYPES
 from .models import Profile, Assignment, Submission, Resume, ProctoringSession, ProctoringQuestion, ProctoringResponse
 
 class SignUpForm(UserCreationForm):
@@ -44,7 +45,7 @@ class ResumeUploadForm(forms.ModelForm):
         fields = ['file']
         widgets = {
             'file': forms.FileInput(attrs={
-                'accept': '.pdf,.docx,.doc,.txt',
+                'accept': '.pdf,.docx,.txt',
                 'class': 'form-control'
             })
         }
@@ -52,10 +53,15 @@ class ResumeUploadForm(forms.ModelForm):
     def clean_file(self):
         file = self.cleaned_data.get('file')
         if file:
-            allowed_extensions = ['pdf', 'docx', 'doc', 'txt']
+            allowed_extensions = ['pdf', 'docx', 'txt']
             file_ext = file.name.split('.')[-1].lower()
+            detected_type = getattr(file, 'detected_type', None)
+            if file_ext == 'doc' or detected_type == 'doc':
+                raise forms.ValidationError("Word 97-2003 (.doc) files cannot be read. Save the resume as DOCX or PDF.")
             if file_ext not in allowed_extensions:
-                raise forms.ValidationError("Only PDF, DOCX, DOC, and TXT files are allowed.")
+                raise forms.ValidationError("Only PDF, DOCX, and TXT files are allowed.")
+            if detected_type and detected_type not in DOCUMENT_TYPES:
+                raise forms.ValidationError("The file content is not a PDF, DOCX or text document.")
             if file.size > 5 * 1024 * 1024:  # 5MB limit
                 raise forms.ValidationError("File size should not exceed 5MB.")
         return file
@@ -0,0 +1,105 @@
+"""
+Per-question physical analysis bookkeeping shared by the HTTP endpoint and
+the interview media stream.
+"""
+from .ai_models.config import Config
+
+
+def get_question_analysis(physical_analysis, current_q):
+    """Return the running analysis for a question, creating it if needed."""
+    key = f'question_{current_q}'
+    if key not in physical_analysis:
+        physical_analysis[key] = {
+            'confidence': 0.0,
+            'voice_quality': 0.0,
+            'body_language': 0.0,
+            'overall_physical_score': 0.0,
+            'person_count': 1,
+            'phone_detected': False,
+            'violations': [],
+            'details': {
+                'confidence_scores': [],
+                'voice_scores': [],
+                'posture_scores': [],
+                'frame_count': 0,
+                'audio_segment_count': 0
+            }
+        }
+    return physical_analysis[key]
+
+
+def record_frame_analysis(current_data, frame_analysis):
+    """Fold a single frame result into the running averages."""
+    if not frame_analysis:
+        return
+    details = current_data['details']
+    details['confidence_scores'].append(frame_analysis.get('confidence', 5.0))
+    details['posture_scores'].append(frame_analysis.get('posture_score', 5.0))
+    details['frame_count'] += 1
+
+    current_data['confidence'] = round(
+        sum(details['confidence_scores']) / len(details['confidence_scores']), 2
+    )
+    current_data['body_language'] = round(
+        sum(details['posture_scores']) / len(details['posture_scores']), 2
+    )
+
+    # Violations reflect the latest frame so alerts clear once the scene is clean
+    person_count = frame_analysis.get('person_count', 1)
+    phone_detected = frame_analysis.get('phone_detected', False)
+    violations = []
+    if phone_detected:
+        violations.append("Mobile phone detected")
+    if person_count == 0:
+        violations.append("No face detected")
+    elif person_count > 1:
+        violations.append(f"Multiple people detected ({person_count})")
+
+    current_data['person_count'] = person_count
+    current_data['phone_detected'] = phone_detected
+    current_data['violations'] = violations
+    _update_overall(current_data)
+
+
+def get_prosody_state(current_data):
+    """Running prosody features for the question, passed to PhysicalAnalyzer.analyze_audio."""
+    return current_data['details'].get('prosody_state')
+
+
+def record_audio_analysis(current_data, audio_analysis):
+    """Fold a single audio segment result into the running averages."""
+    if not audio_analysis:
+        return
+    details = current_data['details']
+    details['voice_scores'].append(audio_analysis.get('voice_score', 5.0))
+    details['audio_segment_count'] += 1
+    if audio_analysis.get('skipped'):
+        details['vad_skipped_segments'] = details.get('vad_skipped_segments', 0) + 1
+
+    if audio_analysis.get('prosody'):
+        # Prosody state is cumulative, so its score already covers the whole answer
+        details['prosody_state'] = audio_analysis['prosody_state']
+        details['prosody'] = audio_analysis['prosody']
+        current_data['voice_quality'] = round(audio_analysis['voice_score'], 2)
+    else:
+        current_data['voice_quality'] = round(
+            sum(details['voice_scores']) / len(details['voice_scores']), 2
+        )
+    _update_overall(current_data)
+
+
+def _update_overall(current_data):
+    current_data['overall_physical_score'] = round(
+        (current_data['confidence'] * Config.CONFIDENCE_WEIGHT +
+         current_data['voice_quality'] * Config.VOICE_WEIGHT +
+         current_data['body_language'] * Config.BODY_LANGUAGE_WEIGHT), 2
+    )
+
+
+def summarize(current_data):
+    return {
+        'confidence': current_data['confidence'],
+        'voice_quality': current_data['voice_quality'],
+        'body_language': current_data['body_language'],
+        'overall_physical_score': current_data['overall_physical_score']
+    }
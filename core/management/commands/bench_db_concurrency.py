@@ -0,0 +1,147 @@
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+from django.utils import timezone
+
+from core.db_profiles import postgres_profile, sqlite_profile
+from core.models import Assignment, Submission
+
+
+class Command(BaseCommand):
+    help = ("Simulate interview load (candidates saving analysis-heavy sessions while graders write scores) "
+            "against plain SQLite, the tuned SQLite profile and, when POSTGRES_DB is set, the Postgres profile")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidates', type=int, default=8, help='Threads saving interview sessions')
+        parser.add_argument('--graders', type=int, default=2, help='Threads writing submission scores')
+        parser.add_argument('--seconds', type=float, default=5.0, help='Load duration per profile')
+        parser.add_argument('--payload-kb', type=int, default=8, help='Session size, like physical_analysis data')
+
+    def handle(self, *args, **options):
+        workdir = Path(tempfile.mkdtemp(prefix='bench-db-'))
+        plain = sqlite_profile(workdir, os.environ)
+        # Django's defaults before the profiles: rollback journal, 5s driver timeout, no pragmas
+        plain.update(ENGINE='django.db.backends.sqlite3', OPTIONS={}, PRAGMAS={})
+        profiles = [('sqlite plain', plain), ('sqlite tuned', sqlite_profile(workdir, os.environ))]
+        if os.environ.get('POSTGRES_DB'):
+            profiles.append(('postgres', postgres_profile(workdir, os.environ)))
+        else:
+            self.stdout.write("Postgres skipped: set POSTGRES_DB (and POSTGRES_USER, ...) to include it")
+
+        try:
+            for n, (label, config) in enumerate(profiles):
+                self._bench(n, label, config, workdir, options)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _bench(self, n, label, config, workdir, options):
+        alias = f'bench_{n}'
+        if config['ENGINE'].endswith('sqlite3'):
+            config['TEST'] = {'NAME': workdir / f'{alias}.sqlite3'}
+        try:
+            self._create(alias, config)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"{label}: could not create the database: {e}"))
+            return
+        try:
+            self._report(label, self._run(alias, options))
+        finally:
+            connections[alias].creation.destroy_test_db(config['NAME'], verbosity=0)
+            connections[alias].close()
+
+    def _create(self, alias, config):
+        settings.DATABASES[alias] = config
+        # Fills in the defaults Django gives every alias; 'default' must be present for the check
+        connections.settings[alias] = connections.configure_settings(settings.DATABASES)[alias]
+        connections[alias].creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+    def _run(self, alias, options):
+        # bulk_create skips the profile and rollup signals, which write to the default database
+        teacher = User.objects.using(alias).bulk_create([User(username='bench-teacher')])[0]
+        assignment = Assignment.objects.using(alias).bulk_create(
+            [Assignment(teacher=teacher, title='Bench', description='Bench')]
+        )[0]
+        submissions = Submission.objects.using(alias).bulk_create(
+            [Submission(assignment=assignment, student=teacher, file=f'submissions/bench{i}.txt') for i in range(50)]
+        )
+        payload = 'x' * (options['payload_kb'] * 1024)
+        deadline = time.monotonic() + options['seconds']
+        results = {'session': [], 'grade': [], 'errors': 0}
+        lock = threading.Lock()
+
+        def candidate(key):
+            expire = timezone.now() + timedelta(hours=1)
+            Session.objects.using(alias).create(session_key=key, session_data=payload, expire_date=expire)
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    # What SessionStore.load and save do on every update_physical_analysis call
+                    session = Session.objects.using(alias).get(session_key=key)
+                    session.session_data = payload
+                    with transaction.atomic(using=alias):
+                        session.save(using=alias, force_update=True)
+                    # And a read-then-write block, like the rollup updates and get_or_create
+                    with transaction.atomic(using=alias):
+                        Session.objects.using(alias).select_for_update().get(session_key=key)
+                        Session.objects.using(alias).filter(session_key=key).update(expire_date=expire)
+                    kind = 'session'
+                except OperationalError:
+                    kind = 'errors'
+                with lock:
+                    if kind == 'errors':
+                        results['errors'] += 1
+                    else:
+                        results[kind].append(time.perf_counter() - started)
+            connections[alias].close()
+
+        def grader(seed):
+            rng = random.Random(seed)
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    with transaction.atomic(using=alias):
+                        Submission.objects.using(alias).filter(pk=rng.choice(submissions).pk).update(
+                            score=rng.uniform(0, 10), ai_feedback=payload[:2000]
+                        )
+                    kind = 'grade'
+                except OperationalError:
+                    kind = 'errors'
+                with lock:
+                    if kind == 'errors':
+                        results['errors'] += 1
+                    else:
+                        results[kind].append(time.perf_counter() - started)
+            connections[alias].close()
+
+        threads = [threading.Thread(target=candidate, args=(f'bench-session-{i:04d}',))
+                   for i in range(options['candidates'])]
+        threads += [threading.Thread(target=grader, args=(i,)) for i in range(options['graders'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        results['seconds'] = options['seconds']
+        return results
+
+    def _report(self, label, results):
+        parts = []
+        for kind in ('session', 'grade'):
+            timings = sorted(results[kind])
+            if timings:
+                p50 = timings[len(timings) // 2] * 1000
+                p95 = timings[min(int(len(timings) * 0.95), len(timings) - 1)] * 1000
+                parts.append(f"{kind} {len(timings) / results['seconds']:7.1f}/s p50 {p50:6.1f}ms p95 {p95:7.1f}ms")
+            else:
+                parts.append(f"{kind} none")
+        self.stdout.write(f"{label:<13} " + '  '.join(parts) + f"  locked errors {results['errors']}")
@@ -0,0 +1,85 @@
+import time
+import tracemalloc
+import warnings
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from core import exports
+from core.models import Assignment, Submission
+
+
+class Command(BaseCommand):
+    help = ("Peak Python memory of a submissions export sent through StreamingHttpResponse as the table grows: "
+            "iterated as a WSGI server does, and as an ASGI server does with an async and with a sync iterator "
+            "(which Django reads into a list first); rows are inserted in a transaction that is rolled back")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10000, 100000],
+                            help='Submission counts, reached cumulatively')
+        parser.add_argument('--format', choices=list(exports.FORMATS), default='csv')
+        parser.add_argument('--no-baseline', action='store_true',
+                            help='Skip the ASGI response with a sync iterator, which holds the whole export')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            teacher = User.objects.create_user(username='bench-export-teacher')
+            students = User.objects.bulk_create([User(username=f'bench-export-{n}') for n in range(50)])
+            assignment = Assignment.objects.create(teacher=teacher, title='Bench', description='Export bench')
+            start = timezone.now()
+            feedback = "Clear structure; the error handling misses the empty input case. " * 4
+            rows = 0
+            for size in sorted(options['sizes']):
+                # bulk_create skips the rollup and cache signals, which are not under test here
+                Submission.objects.bulk_create(
+                    [Submission(assignment=assignment, student=students[n % len(students)],
+                                file=f'submissions/bench{n}.txt', score=n % 11, ai_feedback=feedback,
+                                submitted_at=start - timezone.timedelta(seconds=n))
+                     for n in range(rows, size)],
+                    batch_size=5000
+                )
+                rows = size
+                self._report(size, assignment, options)
+            transaction.set_rollback(True)
+
+    def _measure(self, produce):
+        tracemalloc.start()
+        started = time.perf_counter()
+        written = produce()
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return written, elapsed, peak
+
+    def _report(self, size, assignment, options):
+        fmt = options['format']
+
+        def wsgi():
+            # What a WSGI server does with the response: each chunk is sent and dropped
+            response = StreamingHttpResponse(exports.stream(exports.submissions_export(assignment), fmt))
+            return sum(len(chunk) for chunk in response)
+
+        def asgi(content):
+            async def send_all():
+                response = StreamingHttpResponse(content(exports.submissions_export(assignment), fmt))
+                written = 0
+                async for chunk in response:
+                    written += len(chunk)
+                return written
+            return lambda: async_to_sync(send_all)()
+
+        written, elapsed, peak = self._measure(wsgi)
+        line = f"{size:>8} rows {written / 1024 / 1024:7.1f}MB  WSGI peak {peak / 1024:8.0f}KB in {elapsed:5.2f}s"
+        written, elapsed, peak = self._measure(asgi(exports.astream))
+        line += f"  ASGI async peak {peak / 1024:8.0f}KB in {elapsed:5.2f}s"
+        if not options['no_baseline']:
+            with warnings.catch_warnings():
+                # Django warns that it is consuming the sync iterator synchronously
+                warnings.simplefilter('ignore')
+                written, elapsed, peak = self._measure(asgi(exports.stream))
+            line += f"  ASGI sync peak {peak / 1024:8.0f}KB in {elapsed:5.2f}s"
+        self.stdout.write(line)
@@ -0,0 +1,113 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.ai_models.frame_batcher import FrameBatcher, FrameQueueFull
+
+
+class SimulatedModel:
+    """Stand-in for a hosted vision model: fixed cost per call plus a small cost per image"""
+
+    def __init__(self, call_ms, item_ms, replicas):
+        self.call_s = call_ms / 1000.0
+        self.item_s = item_ms / 1000.0
+        self._slots = threading.Semaphore(replicas)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, frames):
+        with self._slots:
+            with self._lock:
+                self.calls += 1
+            time.sleep(self.call_s + self.item_s * len(frames))
+        return [{'confidence': 5.0, 'posture_score': 5.0} for _ in frames]
+
+
+class Command(BaseCommand):
+    help = 'Compare frame throughput of one-model-call-per-request against the micro-batching queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sessions', type=int, default=200, help='Concurrent interview sessions')
+        parser.add_argument('--frames', type=int, default=5, help='Frames sent by each session')
+        parser.add_argument('--call-ms', type=float, default=120.0, help='Fixed model cost per call')
+        parser.add_argument('--item-ms', type=float, default=6.0, help='Model cost per image')
+        parser.add_argument('--replicas', type=int, default=4, help='Model calls served in parallel')
+        parser.add_argument('--max-batch', type=int, default=16)
+        parser.add_argument('--max-latency-ms', type=float, default=50.0)
+        parser.add_argument('--max-queue', type=int, default=1024)
+
+    def handle(self, *args, **options):
+        sessions = options['sessions']
+        frames = options['frames']
+
+        def make_model():
+            return SimulatedModel(options['call_ms'], options['item_ms'], options['replicas'])
+
+        model = make_model()
+        single = self._run(sessions, frames, lambda frame: model([frame])[0])
+        single['model_calls'] = model.calls
+
+        model = make_model()
+        batcher = FrameBatcher(
+            model,
+            max_batch=options['max_batch'],
+            max_latency_ms=options['max_latency_ms'],
+            max_queue=options['max_queue'],
+            workers=options['replicas']
+        )
+        batched = self._run(sessions, frames, lambda frame: batcher.analyze(frame, timeout=300))
+        batched['model_calls'] = model.calls
+        batched['avg_batch_size'] = batcher.get_stats()['avg_batch_size']
+
+        self.stdout.write(f"{sessions} sessions x {frames} frames, model {options['call_ms']}ms/call + "
+                          f"{options['item_ms']}ms/image, {options['replicas']} replicas")
+        for label, result in (('per-request', single), ('batched', batched)):
+            line = (f"{label:>12}: {result['throughput']:8.1f} frames/s  "
+                    f"p50 {result['p50_ms']:7.1f}ms  p95 {result['p95_ms']:7.1f}ms  "
+                    f"model calls {result['model_calls']}  rejected {result['rejected']}")
+            if 'avg_batch_size' in result:
+                line += f"  avg batch {result['avg_batch_size']}"
+            self.stdout.write(line)
+        if single['throughput']:
+            self.stdout.write(f"Speedup: {batched['throughput'] / single['throughput']:.1f}x")
+
+    def _run(self, sessions, frames, analyze):
+        latencies = []
+        rejected = [0]
+        lock = threading.Lock()
+
+        def session_loop(session_id):
+            for i in range(frames):
+                started = time.perf_counter()
+                try:
+                    analyze(f"frame-{session_id}-{i}")
+                except FrameQueueFull:
+                    with lock:
+                        rejected[0] += 1
+                    continue
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    latencies.append(elapsed)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=session_loop, args=(n,)) for n in range(sessions)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+        latencies.sort()
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+        return {
+            'throughput': len(latencies) / wall if wall else 0.0,
+            'p50_ms': percentile(0.5),
+            'p95_ms': percentile(0.95),
+            'rejected': rejected[0]
+        }
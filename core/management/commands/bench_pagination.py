@@ -0,0 +1,70 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Assignment, Submission
+from core.pagination import DEFAULT_PER_PAGE, KeysetPaginator
+
+
+class Command(BaseCommand):
+    help = ("Time keyset and OFFSET pages of one assignment's submissions as the table grows; "
+            "rows are inserted in a transaction that is rolled back")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                            help='Submission counts, reached cumulatively')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--per-page', type=int, default=DEFAULT_PER_PAGE)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            teacher = User.objects.create_user(username='bench-pagination-teacher')
+            student = User.objects.create_user(username='bench-pagination-student')
+            assignment = Assignment.objects.create(teacher=teacher, title='Bench', description='Pagination bench')
+            start = timezone.now()
+            rows = 0
+            for size in sorted(options['sizes']):
+                # bulk_create skips the rollup signals, which are not under test here
+                Submission.objects.bulk_create(
+                    [Submission(assignment=assignment, student=student, file=f'submissions/bench{n}.txt',
+                                submitted_at=start - timezone.timedelta(seconds=n))
+                     for n in range(rows, size)],
+                    batch_size=5000
+                )
+                rows = size
+                self._report(size, assignment, options['per_page'], options['repeat'])
+            transaction.set_rollback(True)
+        self.stdout.write("Keyset pages seek from the cursor and stay flat; OFFSET pages scan the skipped rows "
+                          "and the paginator adds a COUNT(*).")
+
+    def _time(self, repeat, fetch):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fetch()
+        return (time.perf_counter() - started) / repeat * 1000
+
+    def _report(self, size, assignment, per_page, repeat):
+        queryset = assignment.submissions.select_related('student')
+        keyset = KeysetPaginator(queryset, ordering=('-submitted_at', '-pk'), per_page=per_page)
+        ordered = queryset.order_by('-submitted_at', '-pk')
+        # Cursors as a client would hold them after reading up to the middle and the end
+        middle = keyset.encode(ordered[size // 2], 'next')
+        last = keyset.encode(ordered[max(size - per_page - 1, 0)], 'next')
+
+        def offset_page(number):
+            # A fresh Paginator per request, as a view would build it
+            return list(Paginator(ordered, per_page).page(number).object_list)
+
+        pages = (size + per_page - 1) // per_page
+        timings = {
+            'keyset first': self._time(repeat, lambda: keyset.page(None).object_list),
+            'keyset middle': self._time(repeat, lambda: keyset.page(middle).object_list),
+            'keyset last': self._time(repeat, lambda: keyset.page(last).object_list),
+            'offset middle': self._time(repeat, lambda: offset_page(max(pages // 2, 1))),
+            'offset last': self._time(repeat, lambda: offset_page(pages)),
+        }
+        self.stdout.write(f"{size:>8} rows: " + '  '.join(f"{label} {ms:7.2f}ms" for label, ms in timings.items()))
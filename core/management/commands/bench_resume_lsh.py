@@ -0,0 +1,247 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from core.ai_models import resume_bitsets, resume_index
+from core.ai_models.config import Config
+from core.ai_models.resume_analyzer import ResumeAnalyzer
+
+DEGREES = ['bachelor', 'master', 'phd', 'mba', 'btech', 'mtech', 'be', 'me']
+ROLES = ['developer', 'engineer', 'manager', 'analyst', 'architect', 'lead', 'senior', 'junior']
+VERBS = ['developed', 'built', 'designed', 'implemented', 'led', 'created']
+ADJECTIVES = ['scalable', 'real-time', 'distributed', 'secure', 'internal', 'customer-facing', 'automated', 'mobile']
+DOMAINS = ['payments', 'analytics', 'inventory', 'healthcare', 'logistics', 'education', 'booking', 'media', 'fraud',
+           'recommendation', 'search', 'chat']
+ARTIFACTS = ['platform', 'dashboard', 'pipeline', 'service', 'api', 'app', 'engine', 'portal']
+
+
+class SyntheticCorpus:
+    """
+    Compact synthetic store: features are kept as bitmasks and project indices
+    and only expanded into analyzer-style dicts when needed, so a million
+    resumes fit in memory
+    """
+
+    def __init__(self, size, queries, planted, seed):
+        self.rng = np.random.default_rng(seed)
+        self.skills = sorted({s for group in ResumeAnalyzer().skill_categories.values() for s in group})[:64]
+        techs = self.skills
+        self.projects = [
+            f"{v} a {a} {d} {art} using {t}"
+            for v in VERBS for a in ADJECTIVES for d in DOMAINS for art in ARTIFACTS[:2] for t in techs[:2]
+        ]
+
+        rng = self.rng
+        picks = rng.random((size, len(self.skills))) < rng.uniform(0.08, 0.25, size)[:, None]
+        self.skill_mask = self._pack(picks)
+        self.degree_mask = self._pack(rng.random((size, len(DEGREES))) < 0.15)
+        self.role_mask = self._pack(rng.random((size, len(ROLES))) < 0.2)
+        self.experience = rng.integers(0, 16, size)
+        project_count = rng.integers(1, 5, size)
+        self.project_ids = rng.integers(0, len(self.projects), (size, 4))
+        self.project_ids[np.arange(4)[None, :] >= project_count[:, None]] = -1
+        self.overrides = {}
+        self.related = set()
+
+        # Plant near-duplicates of each query's original inside the smallest prefix
+        self.queries = []
+        positions = rng.choice(min(size, 10000), size=queries * (planted + 1), replace=False)
+        for q in range(queries):
+            original = self.features(int(positions[q * (planted + 1)]))
+            self.related.add(int(positions[q * (planted + 1)]))
+            for p in range(1, planted + 1):
+                index = int(positions[q * (planted + 1) + p])
+                self.overrides[index] = self.mutate(original)
+                self.related.add(index)
+                self._sync_masks(index)
+            self.queries.append(self.mutate(original))
+
+    @staticmethod
+    def _pack(bits):
+        weights = np.uint64(1) << np.arange(bits.shape[1], dtype=np.uint64)
+        return (bits.astype(np.uint64) * weights).sum(axis=1).astype(np.uint64)
+
+    def _mask(self, values, vocabulary):
+        return sum(1 << vocabulary.index(v.lower()) for v in values if v.lower() in vocabulary)
+
+    def _sync_masks(self, index):
+        features = self.overrides[index]
+        self.skill_mask[index] = self._mask(features['skills']['all'], self.skills)
+        self.degree_mask[index] = self._mask(features['education'], DEGREES)
+        self.role_mask[index] = self._mask(features['roles'], ROLES)
+
+    def features(self, index):
+        if index in self.overrides:
+            return self.overrides[index]
+        skills = int(self.skill_mask[index])
+        degrees = int(self.degree_mask[index])
+        roles = int(self.role_mask[index])
+        experience = int(self.experience[index])
+        return {
+            'skills': {'all': [s.title() for i, s in enumerate(self.skills) if skills >> i & 1]},
+            'education': [d for i, d in enumerate(DEGREES) if degrees >> i & 1],
+            'experience': str(experience) if experience else 'Not specified',
+            'projects': [self.projects[p] for p in self.project_ids[index] if p >= 0],
+            'roles': [r for i, r in enumerate(ROLES) if roles >> i & 1]
+        }
+
+    def mutate(self, features):
+        """A resubmission of the same resume with a few edits"""
+        rng = self.rng
+        skills = list(features['skills']['all'])
+        projects = list(features['projects'])
+        for _ in range(int(rng.integers(1, 4))):
+            edit = rng.integers(0, 3)
+            if edit == 0 and len(skills) > 1:
+                skills.pop(int(rng.integers(0, len(skills))))
+            elif edit == 1:
+                skill = self.skills[int(rng.integers(0, len(self.skills)))].title()
+                if skill not in skills:
+                    skills.append(skill)
+            elif projects:
+                i = int(rng.integers(0, len(projects)))
+                words = projects[i].split()
+                words[int(rng.integers(0, len(words)))] = ADJECTIVES[int(rng.integers(0, len(ADJECTIVES)))]
+                projects[i] = ' '.join(words)
+        return dict(features, skills={'all': skills}, projects=projects)
+
+
+class Command(BaseCommand):
+    help = ('Measure recall and speed of the MinHash/LSH shortlist and the bitset pass against the '
+            'brute-force resume similarity scan')
+
+    # Recall is reported twice: against every stored resume the brute-force
+    # scorer flags, and against the planted resubmissions (edited copies of
+    # the same resume), which is what the uniqueness check exists to catch
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+        parser.add_argument('--queries', type=int, default=20)
+        parser.add_argument('--planted', type=int, default=3, help='Near-duplicates stored for each query')
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        sizes = sorted(options['sizes'])
+        analyzer = ResumeAnalyzer()
+        threshold = Config.RESUME_SIMILARITY_THRESHOLD
+        limit = Config.RESUME_LSH_MAX_CANDIDATES
+
+        started = time.perf_counter()
+        corpus = SyntheticCorpus(sizes[-1], options['queries'], options['planted'], options['seed'])
+        self.stdout.write(f"Generated {sizes[-1]} synthetic resumes in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        keys = np.empty((sizes[-1], Config.RESUME_LSH_BANDS), dtype=np.int64)
+        for i in range(sizes[-1]):
+            keys[i] = resume_index.feature_band_keys(corpus.features(i))
+        signing_s = time.perf_counter() - started
+        self.stdout.write(f"Signed and banded {sizes[-1]} resumes in {signing_s:.1f}s "
+                          f"({signing_s / sizes[-1] * 1e6:.0f}us each)")
+
+        started = time.perf_counter()
+        bitset_index = analyzer._bitset_index()
+        bitsets = bitset_index.encode_columns((i, corpus.features(i)) for i in range(sizes[-1]))
+        self.stdout.write(f"Encoded bitsets for {sizes[-1]} resumes in {time.perf_counter() - started:.1f}s "
+                          f"({bitsets.shape[0] * bitsets.itemsize} bytes each)")
+
+        # Per-pair cost of the current scanner, measured on random pairs
+        sample = [corpus.features(i) for i in range(min(200, sizes[-1]))]
+        started = time.perf_counter()
+        for other in sample:
+            analyzer._calculate_similarity(corpus.queries[0], other)
+        pair_s = (time.perf_counter() - started) / len(sample)
+
+        self.stdout.write(f"threshold {threshold}, {Config.RESUME_LSH_NUM_PERM} permutations in "
+                          f"{Config.RESUME_LSH_BANDS} bands, shortlist <= {limit}")
+        for size in sizes:
+            self._run(size, corpus, keys[:size], bitset_index, bitsets[:, :size], analyzer, threshold, limit, pair_s)
+
+    def _run(self, size, corpus, keys, bitset_index, bitsets, analyzer, threshold, limit, pair_s):
+        # Sorted key array plays the role of the bucket index
+        flat = keys.ravel()
+        order = np.argsort(flat, kind='stable')
+        sorted_keys = flat[order]
+        owners = order // keys.shape[1]
+
+        skill_mask = corpus.skill_mask[:size]
+        degree_mask = corpus.degree_mask[:size]
+        role_mask = corpus.role_mask[:size]
+
+        found_total = truth_total = shortlist_total = 0
+        related_found = related_total = 0
+        bitset_found = bitset_candidates = 0
+        lsh_s = brute_s = bitset_s = 0.0
+        for query in corpus.queries:
+            started = time.perf_counter()
+            query_keys = np.array(resume_index.feature_band_keys(query), dtype=np.int64)
+            lo = np.searchsorted(sorted_keys, query_keys, side='left')
+            hi = np.searchsorted(sorted_keys, query_keys, side='right')
+            hits = np.concatenate([owners[a:b] for a, b in zip(lo, hi)]) if len(lo) else np.empty(0, dtype=np.int64)
+            ids, counts = np.unique(hits, return_counts=True)
+            candidates = ids[np.argsort(-counts, kind='stable')][:limit]
+            found = set()
+            for i in candidates:
+                stored = corpus.features(int(i))
+                if (analyzer._similarity_upper_bound(query, stored) >= threshold
+                        and analyzer._calculate_similarity(query, stored) >= threshold):
+                    found.add(int(i))
+            lsh_s += time.perf_counter() - started
+            shortlist_total += len(candidates)
+
+            # Brute-force ground truth. Pairs are skipped only when an upper bound
+            # of the exact score (project and experience terms at their maximum)
+            # is below the threshold, so the result equals a full scan
+            started = time.perf_counter()
+            truth = set()
+            for i in np.nonzero(self._upper_bound(query, corpus, skill_mask, degree_mask, role_mask) >= threshold)[0]:
+                if analyzer._calculate_similarity(query, corpus.features(int(i))) >= threshold:
+                    truth.add(int(i))
+            brute_s += time.perf_counter() - started
+
+            # Bitset pass: exact upper bound against every stored resume
+            started = time.perf_counter()
+            bound = bitset_index.bounds(bitsets, query)
+            survivors = np.nonzero(bound >= threshold - 1e-5)[0]
+            bitset_hits = {int(i) for i in survivors
+                           if analyzer._calculate_similarity(query, corpus.features(int(i))) >= threshold}
+            bitset_s += time.perf_counter() - started
+            bitset_candidates += len(survivors)
+            bitset_found += len(truth & bitset_hits)
+
+            truth_total += len(truth)
+            found_total += len(truth & found)
+            related = truth & corpus.related
+            related_total += len(related)
+            related_found += len(related & found)
+
+        queries = len(corpus.queries)
+        recall = found_total / truth_total if truth_total else 1.0
+        related_recall = related_found / related_total if related_total else 1.0
+        self.stdout.write(
+            f"{size:>9}: recall {recall:6.1%} ({found_total}/{truth_total}), "
+            f"resubmissions {related_recall:6.1%} ({related_found}/{related_total})  "
+            f"avg shortlist {shortlist_total / queries:6.1f}  "
+            f"LSH {lsh_s / queries * 1000:8.2f}ms/query  "
+            f"full scan ~{pair_s * size * 1000:10.0f}ms/query (pruned truth scan {brute_s / queries * 1000:.0f}ms)"
+        )
+        bitset_recall = bitset_found / truth_total if truth_total else 1.0
+        self.stdout.write(
+            f"{'':>9}  bitsets: recall {bitset_recall:6.1%}  avg survivors {bitset_candidates / queries:6.1f}  "
+            f"{bitset_s / queries * 1000:8.2f}ms/query"
+        )
+
+    @staticmethod
+    def _jaccard(query_mask, masks):
+        union = resume_bitsets.popcount(masks | np.uint64(query_mask)).astype(np.float64)
+        inter = resume_bitsets.popcount(masks & np.uint64(query_mask)).astype(np.float64)
+        return np.divide(inter, union, out=np.zeros_like(union), where=union > 0)
+
+    def _upper_bound(self, query, corpus, skill_mask, degree_mask, role_mask):
+        bound = np.full(len(skill_mask), 0.15 + 0.2)
+        for values, vocabulary, masks, weight in (
+                (query['skills']['all'], corpus.skills, skill_mask, 0.4),
+                (query['education'], DEGREES, degree_mask.astype(np.uint64), 0.15),
+                (query['roles'], ROLES, role_mask.astype(np.uint64), 0.1)):
+            bound += weight * self._jaccard(corpus._mask(values, vocabulary), masks)
+        return bound
@@ -0,0 +1,91 @@
+import random
+import time
+
+from django.contrib.sessions.backends.db import SessionStore as DjangoStore
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from core import sessions
+from core.interview_analysis import get_question_analysis, record_audio_analysis, record_frame_analysis
+
+
+class Command(BaseCommand):
+    help = ("Compare Django's database sessions with core.sessions on a long interview: stored size and "
+            "the time and bytes written per analysis update and per read-only poll; rows are rolled back")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', type=int, default=20, help='Answered questions in the session')
+        parser.add_argument('--frames', type=int, default=60, help='Frames analysed per question')
+        parser.add_argument('--requests', type=int, default=200)
+
+    def handle(self, *args, **options):
+        state = self._interview(options['questions'], options['frames'])
+        with transaction.atomic():
+            for label, store_class in (('django db', DjangoStore), ('core.sessions', sessions.SessionStore)):
+                self._report(label, store_class, state, options)
+            transaction.set_rollback(True)
+
+    def _interview(self, questions, frames):
+        """Session contents at the end of a long interview, shaped like the interview views leave them"""
+        rng = random.Random(0)
+        physical_analysis = {}
+        for q in range(questions):
+            data = get_question_analysis(physical_analysis, q)
+            for _ in range(frames):
+                record_frame_analysis(data, {'confidence': round(rng.uniform(4, 9), 2),
+                                             'posture_score': round(rng.uniform(4, 9), 2), 'person_count': 1})
+                record_audio_analysis(data, {'voice_score': round(rng.uniform(4, 9), 2)})
+        words = "design tradeoffs latency caching queue database index transaction retry".split()
+        answer = lambda: ' '.join(rng.choice(words) for _ in range(120))
+        return {
+            '_auth_user_id': '1', 'candidate_name': 'Bench Candidate', 'job_role': 'software_engineer',
+            'interview_id': 1, 'current_question': questions, 'score': 7 * questions, 'enable_voice': True,
+            'total_questions_target': questions + 1,
+            'resume_analysis': {'skills': {'programming': ['Python', 'Go'], 'frameworks': ['Django']},
+                                'summary': answer(), 'experience': [answer() for _ in range(3)]},
+            'questions': [{'question': f"Question {q}: {answer()[:200]}", 'type': 'technical', 'difficulty': 'medium'}
+                          for q in range(questions + 1)],
+            'responses': [{'question_index': q, 'question': f"Question {q}", 'answer': answer(), 'score': 7,
+                           'feedback': answer()[:300], 'detailed_analysis': {'strengths': [answer()[:80]] * 3,
+                                                                             'improvements': [answer()[:80]] * 3}}
+                          for q in range(questions)],
+            'physical_analysis': physical_analysis,
+            'capture_state': {'interval_ms': 2000, 'last_change': 0.1},
+        }
+
+    def _report(self, label, store_class, state, options):
+        store = store_class()
+        store.update(state)
+        store.save()
+        key = store.session_key
+        current_q = state['current_question']
+
+        def analysis_update(n):
+            # update_physical_analysis: one frame folded into the current question
+            session = store_class(key)
+            record_frame_analysis(get_question_analysis(session['physical_analysis'], current_q),
+                                  {'confidence': 6.0 + n % 3, 'posture_score': 7.0})
+            session['capture_state'] = dict(session['capture_state'], interval_ms=2000 + n % 2 * 500)
+            session.modified = True
+            session.save()
+
+        def poll(n):
+            # A view that reads the interview and marks the session modified without changing it
+            session = store_class(key)
+            session.get('questions')
+            session.get('responses')
+            session.modified = True
+            session.save()
+
+        stored = len(store_class.get_model_class().objects.get(session_key=key).session_data)
+        results = []
+        for name, request in (('update', analysis_update), ('poll', poll)):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                for n in range(options['requests']):
+                    request(n)
+                elapsed = (time.perf_counter() - started) / options['requests'] * 1000
+            writes = [q for q in queries if q['sql'].lstrip().upper().startswith('UPDATE')]
+            results.append(f"{name} {elapsed:6.2f}ms {len(writes) / options['requests']:4.2f} writes/request")
+        self.stdout.write(f"{label:<14} stored {stored / 1024:7.1f}KB  " + '  '.join(results))
@@ -0,0 +1,111 @@
+import re
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from core.ai_models.skill_taxonomy import SkillTaxonomy
+
+# Keyword lists and loops used by ResumeAnalyzer._extract_skills and
+# ResumeParser.extract_skills before the shared taxonomy
+LEGACY_ANALYZER_SKILLS = {
+    'programming': ['python', 'java', 'javascript', 'c++', 'c#', 'ruby', 'php', 'swift', 'kotlin'],
+    'web_tech': ['html', 'css', 'react', 'angular', 'vue', 'django', 'flask', 'node.js', 'express'],
+    'databases': ['mysql', 'postgresql', 'mongodb', 'redis', 'sqlite', 'oracle'],
+    'cloud': ['aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform', 'jenkins'],
+    'data_science': ['pandas', 'numpy', 'tensorflow', 'pytorch', 'scikit-learn', 'r', 'matplotlib'],
+    'soft_skills': ['communication', 'leadership', 'teamwork', 'problem-solving', 'creativity', 'adaptability']
+}
+LEGACY_PARSER_SKILLS = [
+    'python', 'java', 'javascript', 'html', 'css', 'react', 'angular', 'vue',
+    'node.js', 'express', 'django', 'flask', 'spring', 'sql', 'mongodb',
+    'postgresql', 'aws', 'azure', 'docker', 'kubernetes', 'git', 'jenkins',
+    'machine learning', 'ai', 'data analysis', 'project management', 'agile',
+    'scrum', 'leadership', 'communication', 'problem solving', 'teamwork'
+]
+
+FILLER = ('designed delivered improved maintained the a for with team product customers service reliability '
+          'latency reports quarterly during across multiple regions features release ownership mentoring').split()
+
+
+def legacy_analyzer_skills(text):
+    text_lower = text.lower()
+    found_skills = {}
+    for category, skills in LEGACY_ANALYZER_SKILLS.items():
+        category_skills = [skill.title() for skill in skills if skill in text_lower]
+        if category_skills:
+            found_skills[category] = category_skills
+    return found_skills
+
+
+def legacy_parser_skills(text):
+    text_lower = text.lower()
+    return list({skill.title() for skill in LEGACY_PARSER_SKILLS if skill in text_lower})
+
+
+def bounded_pattern(synonym):
+    escaped = re.escape(synonym).replace(r'\ ', r'\s+')
+    return re.compile(r'(?<![\w+#])' + escaped + r'(?![\w+#])', re.IGNORECASE)
+
+
+def per_skill_counts(text, patterns):
+    counts = {}
+    for name, pattern in patterns:
+        found = len(pattern.findall(text))
+        if found:
+            counts[name] = counts.get(name, 0) + found
+    return counts
+
+
+class Command(BaseCommand):
+    help = 'Compare the compiled skill taxonomy with the per-keyword substring loops it replaced'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 50000, 500000],
+                            help='Resume sizes in characters')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        started = time.perf_counter()
+        taxonomy = SkillTaxonomy()
+        self.stdout.write(f"Compiled {len(taxonomy.synonyms)} synonyms of {len(taxonomy.names)} skills "
+                          f"in {(time.perf_counter() - started) * 1000:.1f}ms")
+        synonyms = list(taxonomy.synonyms)
+        # What the loops would need for the same answers: one boundary-checked scan per synonym
+        per_skill = [(taxonomy.synonyms[synonym], bounded_pattern(synonym)) for synonym in synonyms]
+
+        for size in options['sizes']:
+            text = self._resume(rng, size, synonyms)
+            timings = {}
+            for label, extract in (('analyzer loop', legacy_analyzer_skills),
+                                   ('parser loop', legacy_parser_skills),
+                                   ('bounded loop', lambda t: per_skill_counts(t, per_skill)),
+                                   ('taxonomy', taxonomy.extract)):
+                started = time.perf_counter()
+                for _ in range(options['repeat']):
+                    result = extract(text)
+                timings[label] = (time.perf_counter() - started) / options['repeat'] * 1000
+            mentions = sum(m['count'] for m in result.values())
+
+            self.stdout.write(
+                f"{size:>8} chars: " + '  '.join(f"{label} {ms:8.2f}ms" for label, ms in timings.items())
+                + f"  ({len(result)} skills, {mentions} mentions)"
+            )
+        self.stdout.write("The substring loops check about 40 keywords with no word boundaries. The bounded loop "
+                          "finds the taxonomy's skills but counts 'vue' inside 'vue.js' too; the taxonomy takes "
+                          "the longest synonym at each position in one pass.")
+
+    def _resume(self, rng, size, synonyms):
+        """Filler prose with a skill mention roughly every 15 words, ambiguous substrings included"""
+        words = []
+        length = 0
+        while length < size:
+            if rng.random() < 0.07:
+                word = synonyms[int(rng.integers(0, len(synonyms)))]
+            else:
+                word = FILLER[int(rng.integers(0, len(FILLER)))]
+            words.append(word)
+            length += len(word) + 1
+        return ' '.join(words)
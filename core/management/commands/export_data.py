@@ -0,0 +1,44 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import exports
+from core.models import Assignment
+
+
+class Command(BaseCommand):
+    help = "Stream assignment submissions, interview results or proctoring sessions to a file or stdout"
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=['submissions', 'interviews', 'proctoring'])
+        parser.add_argument('--assignment', type=int, help='Assignment id, for submissions')
+        parser.add_argument('--format', choices=list(exports.FORMATS), default='csv')
+        parser.add_argument('--output', help='File to write; stdout when omitted')
+
+    def handle(self, *args, **options):
+        if options['kind'] == 'submissions':
+            if options['assignment'] is None:
+                raise CommandError("--assignment is required for submissions")
+            assignment = Assignment.objects.filter(pk=options['assignment']).first()
+            if assignment is None:
+                raise CommandError(f"No assignment {options['assignment']}")
+            export = exports.submissions_export(assignment)
+        elif options['kind'] == 'interviews':
+            export = exports.interviews_export()
+        else:
+            export = exports.proctoring_export()
+
+        if options['output']:
+            with open(options['output'], 'wb') as f:
+                written = self._write(export, options['format'], f)
+            self.stderr.write(f"Wrote {written / 1024:.1f}KB to {options['output']}")
+        else:
+            self._write(export, options['format'], getattr(self.stdout._out, 'buffer', sys.stdout.buffer))
+
+    def _write(self, export, fmt, f):
+        written = 0
+        for chunk in exports.stream(export, fmt):
+            f.write(chunk)
+            written += len(chunk)
+        f.flush()
+        return written
@@ -0,0 +1,72 @@
+import os
+import time
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+
+from core.storage import ContentAddressedStorage
+
+
+class Command(BaseCommand):
+    help = ("Delete stored file names that no FileField references any more, then blobs no name links to, "
+            "and report how much deduplication saves")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-seconds', type=int, default=3600,
+                            help='Leave files younger than this; their rows may not be committed yet')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be deleted')
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError("The default storage is not core.storage.ContentAddressedStorage")
+        oldest = time.time() - options['grace_seconds']
+        dry_run = options['dry_run']
+
+        referenced = self._referenced_names()
+        orphans = 0
+        for name, path, stat in list(default_storage.linked_names()):
+            # ctime moves when the link is made, so a fresh name is never taken for an old one
+            if name not in referenced and stat.st_ctime < oldest:
+                orphans += 1
+                if not dry_run:
+                    os.remove(path)
+
+        # A blob whose only link is itself has a reference count of zero
+        unlinked = 0
+        freed = 0
+        for path, stat in default_storage.blobs():
+            # In a dry run the orphans above still hold their links, so their blobs are not counted
+            if stat.st_nlink == 1 and stat.st_mtime < oldest:
+                unlinked += 1
+                freed += stat.st_size
+                if not dry_run:
+                    os.remove(path)
+
+        verb = 'Would delete' if dry_run else 'Deleted'
+        self.stdout.write(f"{verb} {orphans} unreferenced names and {unlinked} unlinked blobs "
+                          f"({freed / 1024 / 1024:.1f}MB)")
+        self._report()
+
+    def _referenced_names(self):
+        """Every file name held by a FileField saved through this storage"""
+        names = set()
+        for model in apps.get_models():
+            for field in model._meta.get_fields():
+                if isinstance(field, models.FileField) and isinstance(field.storage, ContentAddressedStorage):
+                    names.update(model._default_manager.exclude(**{f'{field.name}__isnull': True})
+                                 .exclude(**{field.name: ''}).values_list(field.name, flat=True).distinct())
+        return names
+
+    def _report(self):
+        blobs = 0
+        stored = 0
+        linked = 0
+        for path, stat in default_storage.blobs():
+            blobs += 1
+            stored += stat.st_size
+            linked += stat.st_size * (stat.st_nlink - 1)
+        saved = max(linked - stored, 0)
+        self.stdout.write(f"{blobs} blobs hold {stored / 1024 / 1024:.1f}MB for {linked / 1024 / 1024:.1f}MB of "
+                          f"linked files, {saved / 1024 / 1024:.1f}MB saved by deduplication")
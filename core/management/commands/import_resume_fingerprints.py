@@ -0,0 +1,46 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.ai_models import resume_index
+from core.models import ResumeFingerprint
+
+
+class Command(BaseCommand):
+    help = 'Import fingerprints from the legacy resume_fingerprints.json file into the ResumeFingerprint table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(settings.BASE_DIR, 'core', 'data', 'resumes', 'resume_fingerprints.json'),
+            help='Legacy JSON file to import'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f"Fingerprint file not found: {path}")
+        try:
+            with open(path, 'r') as f:
+                entries = json.load(f).get('resumes', [])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read {path}: {e}")
+
+        rows = [
+            ResumeFingerprint(fingerprint_hash=entry['hash'], features=entry.get('features', {}))
+            for entry in entries if entry.get('hash')
+        ]
+        before = ResumeFingerprint.objects.count()
+        # Existing hashes are skipped, so the import can be re-run safely
+        ResumeFingerprint.objects.bulk_create(rows, batch_size=options['batch_size'], ignore_conflicts=True)
+        imported = ResumeFingerprint.objects.count() - before
+        indexed = resume_index.index_unindexed(batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} of {len(entries)} fingerprints ({len(rows) - imported} duplicates skipped)"
+        ))
+        self.stdout.write(f"Added {indexed} fingerprints to the LSH index")
+        self.stdout.write(f"The legacy file can now be removed: {path}")
@@ -0,0 +1,325 @@
+import csv
+import hashlib
+import heapq
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import caching, resume_cache
+from core.ai_engine import analyze_resume
+from core.ai_models import resume_index
+from core.ai_models.config import Config
+from core.ai_models.resume_analyzer import ResumeAnalyzer
+from core.extraction import extract_text
+from core.models import Resume, ResumeFingerprint
+from core.utils import parse_ai_evaluation_response
+
+RESUME_EXTENSIONS = ('.pdf', '.docx', '.txt')
+REPORT_FIELDS = ['file', 'username', 'status', 'score', 'skills', 'unique', 'similarity', 'seconds', 'error']
+
+
+class ResumeSource:
+    """One resume file in a directory or zip archive; the key is its relative path"""
+
+    def __init__(self, key, size, read):
+        self.key = key
+        self.size = size
+        self.read = read
+
+    @property
+    def username(self):
+        return os.path.splitext(os.path.basename(self.key))[0]
+
+
+def read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def directory_sources(root):
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            if filename.lower().endswith(RESUME_EXTENSIONS):
+                path = os.path.join(dirpath, filename)
+                yield ResumeSource(os.path.relpath(path, root), os.path.getsize(path),
+                                   lambda path=path: read_file(path))
+
+
+def zip_sources(archive):
+    # ZipFile serializes reads of its shared file handle, so members can be read from worker threads
+    for info in archive.infolist():
+        if not info.is_dir() and info.filename.lower().endswith(RESUME_EXTENSIONS):
+            yield ResumeSource(info.filename, info.file_size, lambda info=info: archive.read(info))
+
+
+def process_resume(source, analyzer):
+    """Read, extract and analyze one file; runs on a worker thread and leaves database writes to the caller"""
+    started = time.perf_counter()
+    result = {'source': source, 'status': 'ok', 'error': ''}
+    try:
+        if source.size > Config.EXTRACTION_MAX_BYTES:
+            result['status'] = 'too_large'
+            return result
+        data = source.read()
+        result['content_hash'] = hashlib.sha256(data).hexdigest()
+        cached = resume_cache.get_analysis(result['content_hash'], count_hit=False)
+        if cached:
+            result.update(status='cached', text=cached.extracted_text, score=cached.score,
+                          skills=cached.skills, suggestions=cached.suggestions)
+        else:
+            text = resume_cache.get_text(result['content_hash']) or extract_text(data, source.key)
+            if not text:
+                result['status'] = 'failed'
+                result['error'] = 'no text extracted'
+                return result
+            score, skills, suggestions = analyze_resume(text)
+            result.update(text=text, score=score, skills=skills, suggestions=suggestions)
+
+        features = analyzer._extract_key_features(result['text'])
+        result['fingerprint'] = analyzer._compute_resume_fingerprint(features)
+        result['features'] = features
+
+        field = Resume._meta.get_field('file')
+        content = ContentFile(data)
+        # Already hashed above, so content-addressed storage need not hash it again
+        content.content_hash = result['content_hash']
+        result['file_name'] = field.storage.save(
+            field.generate_filename(None, os.path.basename(source.key)), content
+        )
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = str(e)
+    finally:
+        result['seconds'] = time.perf_counter() - started
+    return result
+
+
+class Command(BaseCommand):
+    help = ('Extract, analyze and fingerprint a directory or zip of resumes named <username>.<ext>, '
+            "creating or updating one Resume per student; resumes too similar to another student's are "
+            'reported as duplicates and not saved')
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Directory or .zip archive of resumes')
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Files analyzed at once; PDF/DOCX parsing runs in the extraction process pool')
+        parser.add_argument('--batch-size', type=int, default=100, help='Files committed per transaction')
+        parser.add_argument('--report', default='ingest_report.csv', help='Report path, .csv or .jsonl')
+        parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and start over')
+        parser.add_argument('--create-users', action='store_true',
+                            help='Create student accounts for file names that match no username')
+        parser.add_argument('--slowest', type=int, default=10)
+
+    def handle(self, *args, **options):
+        source = options['source']
+        if zipfile.is_zipfile(source):
+            archive = zipfile.ZipFile(source)
+            sources = list(zip_sources(archive))
+        elif os.path.isdir(source):
+            sources = list(directory_sources(source))
+        else:
+            raise CommandError(f"Not a directory or zip archive: {source}")
+
+        report_path = options['report']
+        checkpoint_path = report_path + '.checkpoint'
+        if options['restart']:
+            for path in (report_path, checkpoint_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        done = self._load_checkpoint(checkpoint_path)
+        pending = [s for s in sources if s.key not in done]
+        self.stdout.write(f"{len(sources)} resumes found, {len(sources) - len(pending)} already ingested")
+
+        self.users = self._resolve_users({s.username for s in pending}, options['create_users'])
+        self.analyzer = ResumeAnalyzer()
+        self.report = self._open_report(report_path)
+        self.counts = {}
+        self.slowest = []
+        self.slowest_size = options['slowest']
+
+        started = time.perf_counter()
+        batch = []
+        with open(checkpoint_path, 'a') as checkpoint, ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for result in self._run(pool, pending, options['workers'] * 2):
+                batch.append(result)
+                if len(batch) >= options['batch_size']:
+                    self._flush(batch, checkpoint)
+                    batch = []
+            self._flush(batch, checkpoint)
+        self.report_file.close()
+        elapsed = time.perf_counter() - started
+
+        processed = sum(self.counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Ingested {processed} files in {elapsed:.1f}s ({processed / elapsed if elapsed else 0:.1f} files/sec): "
+            + ', '.join(f"{status} {count}" for status, count in sorted(self.counts.items()))
+        ))
+        if self.slowest:
+            self.stdout.write("Slowest documents:")
+            for seconds, key in sorted(self.slowest, reverse=True):
+                self.stdout.write(f"  {seconds:8.2f}s  {key}")
+        self.stdout.write(f"Report written to {report_path}")
+
+    def _run(self, pool, sources, window):
+        """Results as files finish, with at most `window` files read into memory at once"""
+        sources = iter(sources)
+        running = set()
+        while True:
+            for source in sources:
+                if source.username not in self.users:
+                    yield {'source': source, 'status': 'no_user', 'error': 'no matching username', 'seconds': 0.0}
+                    continue
+                running.add(pool.submit(process_resume, source, self.analyzer))
+                if len(running) >= window:
+                    break
+            if not running:
+                return
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield future.result()
+
+    def _resolve_users(self, usernames, create):
+        users = {}
+        names = sorted(usernames)
+        for start in range(0, len(names), 500):
+            users.update(User.objects.filter(username__in=names[start:start + 500]).in_bulk(field_name='username'))
+        if create:
+            for username in names:
+                if username not in users:
+                    # Profile (role STUDENT by default) is created by the post_save signal
+                    user = User.objects.create_user(username=username)
+                    user.set_unusable_password()
+                    user.save()
+                    users[username] = user
+        return users
+
+    def _open_report(self, path):
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.report_file = open(path, 'a', newline='')
+        self.jsonl = path.endswith('.jsonl')
+        if self.jsonl:
+            return None
+        writer = csv.DictWriter(self.report_file, fieldnames=REPORT_FIELDS)
+        if new:
+            writer.writeheader()
+        return writer
+
+    def _load_checkpoint(self, path):
+        if not os.path.exists(path):
+            return set()
+        with open(path, 'r') as f:
+            return {line.rstrip('\n') for line in f if line.strip()}
+
+    def _check_duplicates(self, results):
+        """
+        Uniqueness against stored fingerprints and against earlier files of the same batch;
+        a student's own resumes are not compared, so re-ingesting an updated file is no duplicate
+        """
+        accepted = []
+        for result in results:
+            fingerprint_hash, _ = result['fingerprint']
+            username = result['source'].username
+            unique, similarity, _ = self.analyzer._check_resume_uniqueness(
+                result['features'], fingerprint_hash=fingerprint_hash, owner=self.users[username]
+            )
+            for other in accepted:
+                if not unique:
+                    break
+                if other['source'].username == username:
+                    continue
+                if other['fingerprint'][0] == fingerprint_hash:
+                    score = 1.0
+                elif (self.analyzer._similarity_upper_bound(result['features'], other['features'])
+                        < Config.RESUME_SIMILARITY_THRESHOLD):
+                    continue
+                else:
+                    score = self.analyzer._calculate_similarity(result['features'], other['features'])
+                similarity = max(similarity, score)
+                unique = score < Config.RESUME_SIMILARITY_THRESHOLD
+            result['unique'] = unique
+            result['similarity'] = round(similarity, 3)
+            if unique:
+                accepted.append(result)
+        return accepted
+
+    def _flush(self, batch, checkpoint):
+        analyzed = [r for r in batch if r['status'] in ('ok', 'cached')]
+        with transaction.atomic():
+            accepted = self._check_duplicates(analyzed)
+            hashes = [r['fingerprint'][0] for r in accepted]
+            ResumeFingerprint.objects.bulk_create(
+                [ResumeFingerprint(fingerprint_hash=h, features=r['fingerprint'][1], student=self.users[r['source'].username])
+                 for h, r in zip(hashes, accepted)],
+                ignore_conflicts=True
+            )
+            resume_index.index_fingerprints(
+                ResumeFingerprint.objects.filter(fingerprint_hash__in=hashes, lsh_buckets__isnull=True)
+            )
+
+            resume_cache.count_hits([r['content_hash'] for r in analyzed if r['status'] == 'cached'])
+            for r in analyzed:
+                if r['status'] == 'ok':
+                    resume_cache.store_analysis(r['content_hash'], r['text'], r['score'], r['skills'], r['suggestions'])
+            # A resume too similar to another student's is reported and not saved
+            resumes = {}
+            for r in accepted:
+                # A student with several files in the drive keeps the last one
+                resumes[r['source'].username] = Resume(
+                    student=self.users[r['source'].username], file=r['file_name'], analysis_status='COMPLETED',
+                    score=r['score'], skills_extracted=r['skills'], suggestions=r['suggestions'],
+                    ai_analysis=parse_ai_evaluation_response(r['suggestions'])['suggestions']
+                )
+            Resume.objects.bulk_create(
+                resumes.values(), update_conflicts=True, unique_fields=['student'],
+                update_fields=['file', 'analysis_status', 'score', 'skills_extracted', 'suggestions', 'ai_analysis',
+                               'updated_at']
+            )
+            # bulk_create sends no post_save, so the students' cached resume detail is retired here
+            caching.bump_on_commit(*[caching.user_scope(resume.student) for resume in resumes.values()])
+
+        storage = Resume._meta.get_field('file').storage
+        for r in analyzed:
+            if not r['unique']:
+                r['status'] = 'duplicate'
+                r['error'] = f"too similar to another student's resume ({r['similarity']:.1%})"
+                storage.delete(r['file_name'])
+
+        # Reported and checkpointed only once the batch is committed
+        for r in batch:
+            self._write_report(r)
+            checkpoint.write(r['source'].key + '\n')
+            self.counts[r['status']] = self.counts.get(r['status'], 0) + 1
+            entry = (r['seconds'], r['source'].key)
+            if len(self.slowest) < self.slowest_size:
+                heapq.heappush(self.slowest, entry)
+            else:
+                heapq.heappushpop(self.slowest, entry)
+        self.report_file.flush()
+        checkpoint.flush()
+
+    def _write_report(self, result):
+        skills = result.get('skills') or []
+        if isinstance(skills, dict):
+            skills = [s for group in skills.values() for s in group]
+        row = {
+            'file': result['source'].key,
+            'username': result['source'].username,
+            'status': result['status'],
+            'score': round(result['score'], 2) if result.get('score') is not None else None,
+            'skills': skills if self.jsonl else ';'.join(skills),
+            'unique': result.get('unique'),
+            'similarity': result.get('similarity'),
+            'seconds': round(result['seconds'], 3),
+            'error': result['error']
+        }
+        if self.jsonl:
+            self.report_file.write(json.dumps(row) + '\n')
+        else:
+            self.report.writerow(row)
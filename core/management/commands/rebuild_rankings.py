@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import rankings
+
+
+class Command(BaseCommand):
+    help = 'Recompute candidate rankings and per-role score distributions from interviews and proctoring sessions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Students recomputed per query')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        candidates = rankings.rebuild(batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Ranked {candidates} candidates across {len(rankings.roles())} roles in {elapsed:.1f}s"
+        ))
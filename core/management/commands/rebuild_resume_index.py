@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.ai_models import resume_index
+from core.ai_models.resume_analyzer import ResumeAnalyzer
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the resume similarity indexes (LSH buckets and bitset file) from stored fingerprints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--missing-only', action='store_true', help='Only index fingerprints without buckets')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with transaction.atomic():
+            if options['missing_only']:
+                indexed = resume_index.index_unindexed(batch_size=options['batch_size'])
+            else:
+                indexed = resume_index.rebuild_index(batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} fingerprints in LSH buckets in {elapsed:.1f}s"))
+
+        started = time.perf_counter()
+        rows = ResumeAnalyzer()._bitset_index().sync(rebuild=not options['missing_only'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Resume bitset file holds {rows} fingerprints ({elapsed:.1f}s)"))
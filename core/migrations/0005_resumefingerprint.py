@@ -0,0 +1,22 @@
+# Generated by Django 4.2.28 on 2026-10-19 04:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_proctoringquestion_resume_proctoringsession_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint_hash', models.CharField(max_length=64, unique=True)),
+                ('features', models.JSONField(help_text='Normalized features used for similarity checks')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
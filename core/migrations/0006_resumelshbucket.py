@@ -0,0 +1,22 @@
+# Generated by Django 4.2.28 on 2026-10-19 04:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_resumefingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField(db_index=True, help_text='MinHash band key')),
+                ('fingerprint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='core.resumefingerprint')),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.28 on 2026-10-19 04:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_resumelshbucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeAnalysisCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(help_text='SHA-256 of the uploaded file bytes', max_length=64)),
+                ('analyzer_version', models.CharField(max_length=20)),
+                ('extracted_text', models.TextField()),
+                ('score', models.FloatField()),
+                ('skills', models.JSONField(default=list)),
+                ('suggestions', models.TextField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_hit_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'unique_together': {('content_hash', 'analyzer_version')},
+            },
+        ),
+    ]
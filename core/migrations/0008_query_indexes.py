@@ -0,0 +1,33 @@
+# Generated by Django 4.2.28 on 2026-10-19 05:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_resumeanalysiscache'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['student', 'created_at'], name='core_interv_student_3863c8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proctoringquestion',
+            index=models.Index(fields=['session', 'order'], name='core_procto_session_82cf59_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proctoringsession',
+            index=models.Index(fields=['student', 'started_at'], name='core_procto_student_67d703_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['assignment', 'student'], name='core_submis_assignm_ac9603_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['student', 'submitted_at'], name='core_submis_student_8a60d2_idx'),
+        ),
+    ]
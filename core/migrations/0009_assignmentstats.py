@@ -0,0 +1,27 @@
+# Generated by Django 4.2.28 on 2026-10-19 05:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssignmentStats',
+            fields=[
+                ('assignment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='core.assignment')),
+                ('submission_count', models.PositiveIntegerField(default=0)),
+                ('student_count', models.PositiveIntegerField(default=0, help_text='Distinct students who submitted')),
+                ('graded_count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('score_histogram', models.JSONField(default=list, help_text='Graded submissions per whole score point, 0 to 10')),
+                ('last_submission_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.28 on 2026-10-19 05:15
+
+from django.db import migrations, models
+
+
+def backfill_rollups(apps, schema_editor):
+    """Counts and per-answer summaries for sessions answered before the rollups existed"""
+    ProctoringResponse = apps.get_model('core', 'ProctoringResponse')
+    ProctoringSession = apps.get_model('core', 'ProctoringSession')
+    db_alias = schema_editor.connection.alias
+    sessions = {}
+    transcripts = {}
+    responses = ProctoringResponse.objects.using(db_alias).select_related('question')
+    for response in responses.order_by('question__order', 'pk'):
+        words = response.response_text.split()
+        transcripts.setdefault(response.question.session_id, []).append(
+            f"Q: {response.question.question_text}\nA: {response.response_text}\n\n"
+        )
+        sessions.setdefault(response.question.session_id, []).append({
+            'response_id': response.pk,
+            'order': response.question.order,
+            'words': len(words),
+            'seconds': response.duration_seconds,
+            'score': response.score,
+            'excerpt': ' '.join(words)[:240]
+        })
+    for session_id, answers in sessions.items():
+        scores = [a['score'] for a in answers if a['score'] is not None]
+        ProctoringSession.objects.using(db_alias).filter(pk=session_id).update(
+            response_count=len(answers), scored_count=len(scores), score_total=sum(scores),
+            question_summaries=answers
+        )
+        # Sessions still in progress get the transcript that later responses append to
+        ProctoringSession.objects.using(db_alias).filter(pk=session_id, transcript__isnull=True).update(
+            transcript=''.join(transcripts[session_id])
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proctoringsession',
+            name='question_summaries',
+            field=models.JSONField(blank=True, default=list, help_text='Per-answer figures and excerpt'),
+        ),
+        migrations.AddField(
+            model_name='proctoringsession',
+            name='response_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='proctoringsession',
+            name='score_total',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='proctoringsession',
+            name='scored_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
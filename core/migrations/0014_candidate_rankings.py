@@ -0,0 +1,45 @@
+# Generated by Django 4.2.28 on 2026-10-19 05:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0013_interviewsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoleRankingStats',
+            fields=[
+                ('role_type', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('candidate_count', models.PositiveIntegerField(default=0)),
+                ('score_histogram', models.JSONField(default=list, help_text='Candidates per tenth of a point, 0 to 10')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CandidateRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role_type', models.CharField(max_length=100)),
+                ('interview_score', models.FloatField(blank=True, help_text='Best interview score for the role', null=True)),
+                ('proctoring_score', models.FloatField(blank=True, help_text='Best proctoring session score for the role', null=True)),
+                ('integrity_score', models.FloatField(blank=True, help_text='Lowest integrity score of those sessions', null=True)),
+                ('rank_score', models.FloatField(help_text='Weighted score the ranking orders by, 0 to 10')),
+                ('interview_count', models.PositiveIntegerField(default=0)),
+                ('session_count', models.PositiveIntegerField(default=0)),
+                ('last_activity_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['role_type', '-rank_score', 'id', 'last_activity_at'], name='core_candid_role_ty_a32f00_idx')],
+                'unique_together': {('student', 'role_type')},
+            },
+        ),
+    ]
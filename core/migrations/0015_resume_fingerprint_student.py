@@ -0,0 +1,21 @@
+# Generated by Django 4.2.28 on 2026-10-19 06:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0014_candidate_rankings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumefingerprint',
+            name='student',
+            field=models.ForeignKey(blank=True, help_text="Owner of the resume; a student's own fingerprints never make a duplicate", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='resume_fingerprints', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.sessions.base_session import AbstractBaseSession
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
@@ -36,6 +37,41 @@ class Resume(models.Model):
     def __str__(self):
         return f"{self.student.username} - Resume"
 
+class ResumeFingerprint(models.Model):
+    fingerprint_hash = models.CharField(max_length=64, unique=True)
+    features = models.JSONField(help_text="Normalized features used for similarity checks")
+    student = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='resume_fingerprints',
+                                help_text="Owner of the resume; a student's own fingerprints never make a duplicate")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.fingerprint_hash[:12]
+
+class ResumeLSHBucket(models.Model):
+    fingerprint = models.ForeignKey(ResumeFingerprint, on_delete=models.CASCADE, related_name='lsh_buckets')
+    bucket = models.BigIntegerField(db_index=True, help_text="MinHash band key")
+
+    def __str__(self):
+        return f"{self.fingerprint_id}:{self.bucket}"
+
+class ResumeAnalysisCache(models.Model):
+    content_hash = models.CharField(max_length=64, help_text="SHA-256 of the uploaded file bytes")
+    analyzer_version = models.CharField(max_length=20)
+    extracted_text = models.TextField()
+    score = models.FloatField()
+    skills = models.JSONField(default=list)
+    suggestions = models.TextField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_hit_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('content_hash', 'analyzer_version')
+
+    def __str__(self):
+        return f"{self.content_hash[:12]} (v{self.analyzer_version})"
+
 class ProctoringSession(models.Model):
     SESSION_STATUS = (
         ('SCHEDULED', 'Scheduled'),
@@ -56,6 +92,14 @@ class ProctoringSession(models.Model):
     score = models.FloatField(null=True, blank=True)
     integrity_score = models.FloatField(null=True, blank=True, help_text="Score from 0-10 indicating exam integrity")
     flagged_issues = models.JSONField(null=True, blank=True, help_text="List of potential issues detected")
+    # Maintained by core.proctoring as each response is saved
+    response_count = models.PositiveIntegerField(default=0)
+    scored_count = models.PositiveIntegerField(default=0)
+    score_total = models.FloatField(default=0)
+    question_summaries = models.JSONField(default=list, blank=True, help_text="Per-answer figures and excerpt")
+
+    class Meta:
+        indexes = [models.Index(fields=['student', 'started_at'])]
 
     def __str__(self):
         return f"{self.student.username} - {self.role_type} Proctoring"
@@ -68,6 +112,7 @@ class ProctoringQuestion(models.Model):
 
     class Meta:
         ordering = ['order']
+        indexes = [models.Index(fields=['session', 'order'])]
 
     def __str__(self):
         return f"Q{self.order}: {self.question_text[:50]}"
@@ -91,6 +136,9 @@ class Interview(models.Model):
     ai_recommendation = models.TextField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['student', 'created_at'])]
+
     def __str__(self):
         return f"{self.student.username} - {self.role_type}"
 
@@ -102,6 +150,12 @@ class Assignment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     due_date = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['teacher', 'created_at', 'id']),
+            models.Index(fields=['created_at', 'id']),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -113,5 +167,69 @@ class Submission(models.Model):
     score = models.FloatField(null=True, blank=True)
     ai_feedback = models.TextField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['assignment', 'student']),
+            models.Index(fields=['student', 'submitted_at']),
+            models.Index(fields=['assignment', 'submitted_at', 'id']),
+        ]
+
     def __str__(self):
         return f"{self.student.username} - {self.assignment.title}"
+
+class AssignmentStats(models.Model):
+    """Rollup of an assignment's submissions, updated by core.analytics as submissions are saved and graded"""
+    assignment = models.OneToOneField(Assignment, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    submission_count = models.PositiveIntegerField(default=0)
+    student_count = models.PositiveIntegerField(default=0, help_text="Distinct students who submitted")
+    graded_count = models.PositiveIntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+    score_histogram = models.JSONField(default=list, help_text="Graded submissions per whole score point, 0 to 10")
+    last_submission_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.assignment_id}: {self.submission_count} submissions"
+
+class InterviewSession(AbstractBaseSession):
+    """Session rows of core.sessions: signed, per-key compressed binary instead of base64 text"""
+    session_data = models.BinaryField()
+
+    @classmethod
+    def get_session_store_class(cls):
+        from .sessions import SessionStore
+        return SessionStore
+
+class CandidateRanking(models.Model):
+    """A student's standing for one interview role, maintained by core.rankings as interviews and sessions are saved"""
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='rankings')
+    role_type = models.CharField(max_length=100)
+    interview_score = models.FloatField(null=True, blank=True, help_text="Best interview score for the role")
+    proctoring_score = models.FloatField(null=True, blank=True, help_text="Best proctoring session score for the role")
+    integrity_score = models.FloatField(null=True, blank=True, help_text="Lowest integrity score of those sessions")
+    rank_score = models.FloatField(help_text="Weighted score the ranking orders by, 0 to 10")
+    interview_count = models.PositiveIntegerField(default=0)
+    session_count = models.PositiveIntegerField(default=0)
+    last_activity_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('student', 'role_type')
+        indexes = [
+            # Top-K per role reads this index in order and stops after K rows; the activity date
+            # is carried along so a window is checked without leaving the index
+            models.Index(fields=['role_type', '-rank_score', 'id', 'last_activity_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.student.username} - {self.role_type}: {self.rank_score:.2f}"
+
+class RoleRankingStats(models.Model):
+    """Rank score distribution of a role's candidates, from which percentile ranks are read"""
+    role_type = models.CharField(max_length=100, primary_key=True)
+    candidate_count = models.PositiveIntegerField(default=0)
+    score_histogram = models.JSONField(default=list, help_text="Candidates per tenth of a point, 0 to 10")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.role_type}: {self.candidate_count} candidates"
@@ -0,0 +1,143 @@
+"""
+Keyset pagination
+Pages are read with a seek condition on the ordering columns instead of
+OFFSET, so the database walks an index from the cursor and reads one page
+plus one row: later pages cost the same as the first, and no COUNT(*) is run.
+The ordering must be unique and end in the primary key, e.g.
+('-submitted_at', '-pk'); a matching composite index keeps each page an index
+range scan.
+
+Cursors are signed tokens holding the ordering values of the row at the edge
+of a page and the direction to read. A tampered or stale cursor falls back to
+the first page.
+"""
+from datetime import date, datetime
+
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import QueryDict
+
+CURSOR_SALT = 'core.pagination'
+DEFAULT_PER_PAGE = 25
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, param='cursor', query=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.param = param
+        self.query = query
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def _url(self, cursor):
+        query = self.query.copy() if self.query is not None else QueryDict(mutable=True)
+        query[self.param] = cursor
+        return '?' + query.urlencode()
+
+    @property
+    def next_url(self):
+        return self._url(self.next_cursor) if self.has_next else None
+
+    @property
+    def previous_url(self):
+        return self._url(self.previous_cursor) if self.has_previous else None
+
+    def as_json(self, serialize):
+        """Body for a JSON list endpoint; clients pass `next` back as the cursor parameter"""
+        return {
+            'results': [serialize(obj) for obj in self.object_list],
+            'next': self.next_cursor,
+            'previous': self.previous_cursor
+        }
+
+
+class KeysetPaginator:
+    def __init__(self, queryset, ordering=('-created_at', '-pk'), per_page=DEFAULT_PER_PAGE):
+        self.queryset = queryset
+        self.per_page = per_page
+        meta = queryset.model._meta
+        self.keys = []
+        for name in ordering:
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            field = meta.pk if name == 'pk' else meta.get_field(name)
+            self.keys.append((field, descending))
+
+    def _order_by(self, reverse):
+        return [('-' if descending != reverse else '') + field.name for field, descending in self.keys]
+
+    def _seek(self, values, reverse):
+        """Rows strictly after `values` in the ordering (before them when reading backwards)"""
+        condition = Q()
+        for i, (field, descending) in enumerate(self.keys):
+            step = Q(**{field.name + ('__lt' if descending != reverse else '__gt'): values[i]})
+            for earlier, value in zip(self.keys[:i], values):
+                step &= Q(**{earlier[0].name: value})
+            condition |= step
+        # Implied by the OR above, but a plain range on the leading column is what lets the index seek
+        field, descending = self.keys[0]
+        return Q(**{field.name + ('__lte' if descending != reverse else '__gte'): values[0]}) & condition
+
+    def encode(self, obj, direction):
+        values = []
+        for field, _ in self.keys:
+            value = getattr(obj, field.attname)
+            values.append(value.isoformat() if isinstance(value, (date, datetime)) else value)
+        return signing.dumps([direction, values], salt=CURSOR_SALT, compress=True)
+
+    def decode(self, cursor):
+        """(direction, values) from a cursor; None if it is missing or invalid"""
+        if not cursor:
+            return None
+        try:
+            direction, values = signing.loads(cursor, salt=CURSOR_SALT)
+            if direction not in ('next', 'previous') or len(values) != len(self.keys):
+                return None
+            return direction, [field.to_python(value) for (field, _), value in zip(self.keys, values)]
+        except (signing.BadSignature, ValidationError, ValueError, TypeError) as e:
+            print(f"Error decoding page cursor: {e}")
+            return None
+
+    def page(self, cursor=None, param='cursor', query=None):
+        decoded = self.decode(cursor)
+        direction, values = decoded or ('next', None)
+        reverse = direction == 'previous'
+
+        queryset = self.queryset.order_by(*self._order_by(reverse))
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, reverse))
+        rows = list(queryset[:self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if reverse:
+            rows.reverse()
+            has_previous, has_next = more, True
+        else:
+            has_previous, has_next = values is not None, more
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode(rows[-1], 'next') if rows and has_next else None,
+            previous_cursor=self.encode(rows[0], 'previous') if rows and has_previous else None,
+            param=param,
+            query=query
+        )
+
+    def paginate(self, request, param='cursor'):
+        """Page selected by the request's `param` query parameter; other parameters are kept in page links"""
+        return self.page(request.GET.get(param), param, request.GET)
@@ -0,0 +1,98 @@
+"""
+Proctoring session rollups
+Each saved ProctoringResponse appends its transcript segment to its session
+inside the database and updates the session's response count, score total
+and per-answer summary. Completing a session reads that one row instead of
+rebuilding the transcript from every response, and the final analysis gets
+summarize_session(): figures for every answer with a short excerpt of each,
+in place of a raw transcript cut off at a fixed length.
+"""
+from django.db import transaction
+from django.db.models import TextField, Value
+from django.db.models.functions import Coalesce, Concat
+
+from .models import ProctoringResponse, ProctoringSession
+
+EXCERPT_CHARS = 240
+SHORT_ANSWER_WORDS = 15
+
+
+def transcript_segment(question_text, response_text):
+    return f"Q: {question_text}\nA: {response_text}\n\n"
+
+
+def answer_summary(question, response):
+    words = response.response_text.split()
+    return {
+        'response_id': response.pk,
+        'order': question.order,
+        'words': len(words),
+        'seconds': response.duration_seconds,
+        'score': response.score,
+        'excerpt': ' '.join(words)[:EXCERPT_CHARS]
+    }
+
+
+def record_response(response, created, previous_score=None):
+    """Fold one saved response into its session; `previous_score` is the score before an update"""
+    question = response.question
+    with transaction.atomic():
+        session = (ProctoringSession.objects.select_for_update()
+                   .only('response_count', 'scored_count', 'score_total', 'question_summaries')
+                   .get(pk=question.session_id))
+        updates = {}
+        scored, total = session.scored_count, session.score_total
+        if created:
+            updates['response_count'] = session.response_count + 1
+            # Appended by the database, so the stored transcript is never read back here
+            updates['transcript'] = Concat(
+                Coalesce('transcript', Value('')), Value(transcript_segment(question.question_text,
+                                                                            response.response_text)),
+                output_field=TextField()
+            )
+        elif previous_score is not None:
+            scored, total = scored - 1, total - previous_score
+        if response.score is not None:
+            scored, total = scored + 1, total + response.score
+        summaries = [s for s in session.question_summaries if s['response_id'] != response.pk]
+        summaries.append(answer_summary(question, response))
+        summaries.sort(key=lambda s: (s['order'], s['response_id']))
+        ProctoringSession.objects.filter(pk=session.pk).update(
+            scored_count=scored, score_total=total, question_summaries=summaries, **updates
+        )
+
+
+def rebuild(session_id):
+    """Recompute a session's rollups from its responses, e.g. after a response is deleted"""
+    responses = (ProctoringResponse.objects.filter(question__session_id=session_id)
+                 .select_related('question').order_by('question__order', 'pk'))
+    transcript = []
+    summaries = []
+    scores = []
+    for response in responses:
+        transcript.append(transcript_segment(response.question.question_text, response.response_text))
+        summaries.append(answer_summary(response.question, response))
+        if response.score is not None:
+            scores.append(response.score)
+    ProctoringSession.objects.filter(pk=session_id).update(
+        transcript=''.join(transcript) or None, response_count=len(summaries), scored_count=len(scores),
+        score_total=sum(scores), question_summaries=summaries
+    )
+
+
+def summarize_session(session, duration_minutes):
+    """Compact input for analyze_proctoring_session, built from the session row alone"""
+    answers = session.question_summaries or []
+    scores = [a['score'] for a in answers if a['score'] is not None]
+    return {
+        'duration_minutes': duration_minutes,
+        'responses': session.response_count,
+        'scored': session.scored_count,
+        'average_score': round(session.score_total / session.scored_count, 2) if session.scored_count else None,
+        'lowest_score': min(scores) if scores else None,
+        'highest_score': max(scores) if scores else None,
+        'total_words': sum(a['words'] for a in answers),
+        'short_answers': sum(1 for a in answers if a['words'] < SHORT_ANSWER_WORDS),
+        'answers': [{'question': a['order'], 'score': a['score'], 'words': a['words'], 'seconds': a['seconds'],
+                     'excerpt': a['excerpt']} for a in answers]
+    }
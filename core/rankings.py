@@ -0,0 +1,189 @@
+"""
+Candidate rankings
+CandidateRanking holds one row per student and interview role: their best
+interview score, best proctoring score, lowest integrity score (one
+compromised session counts against a candidate) and the weighted rank_score
+the ranking orders by. The interview and proctoring signals refresh only the
+candidate whose row changed, from that candidate's own interviews and
+sessions, so saving never re-sorts a role.
+
+Top-K reads the (role_type, -rank_score) index in order and stops after K
+rows; a date window keeps candidates active within it. Percentile ranks come
+from RoleRankingStats, a per-role histogram of rank scores in tenths of a
+point that is adjusted as rows change, so no other candidate's row is
+rewritten when one score moves. `manage.py rebuild_rankings` recomputes
+everything, e.g. to backfill.
+"""
+from django.db import transaction
+from django.db.models import Count, Max, Min
+
+from .models import CandidateRanking, Interview, ProctoringSession, RoleRankingStats
+
+INTERVIEW_WEIGHT = 0.6
+PROCTORING_WEIGHT = 0.25
+INTEGRITY_WEIGHT = 0.15
+
+HISTOGRAM_BUCKETS = 101  # Tenths of a point, 0.0 to 10.0
+DEFAULT_TOP_K = 20
+MAX_TOP_K = 200
+
+
+def rank_score(interview_score, proctoring_score, integrity_score):
+    """Weighted mean of the components a candidate has, 0 to 10"""
+    parts = [(interview_score, INTERVIEW_WEIGHT), (proctoring_score, PROCTORING_WEIGHT),
+             (integrity_score, INTEGRITY_WEIGHT)]
+    weight = sum(w for score, w in parts if score is not None)
+    if not weight:
+        return 0.0
+    return round(sum(score * w for score, w in parts if score is not None) / weight, 3)
+
+
+def histogram_bucket(score):
+    return min(max(int(round(score * 10, 6)), 0), HISTOGRAM_BUCKETS - 1)
+
+
+def _candidates(interviews, sessions):
+    """{(student_id, role_type): CandidateRanking} built from the given interviews and sessions"""
+    rows = {}
+    for row in (interviews.order_by().values('student_id', 'role_type')
+                .annotate(best=Max('score'), count=Count('id'), last=Max('created_at'))):
+        rows[row['student_id'], row['role_type']] = CandidateRanking(
+            student_id=row['student_id'], role_type=row['role_type'], interview_score=row['best'],
+            interview_count=row['count'], last_activity_at=row['last']
+        )
+    for row in (sessions.order_by().values('student_id', 'role_type')
+                .annotate(best=Max('score'), integrity=Min('integrity_score'), count=Count('id'),
+                          last=Max('started_at'))):
+        key = (row['student_id'], row['role_type'])
+        ranking = rows.get(key)
+        if ranking is None:
+            ranking = rows[key] = CandidateRanking(student_id=key[0], role_type=key[1], last_activity_at=row['last'])
+        ranking.proctoring_score = row['best']
+        ranking.integrity_score = row['integrity']
+        ranking.session_count = row['count']
+        ranking.last_activity_at = max(ranking.last_activity_at, row['last'])
+    for ranking in rows.values():
+        ranking.rank_score = rank_score(ranking.interview_score, ranking.proctoring_score, ranking.integrity_score)
+    return rows
+
+
+def _upsert(rankings):
+    CandidateRanking.objects.bulk_create(
+        rankings, update_conflicts=True, unique_fields=['student', 'role_type'],
+        update_fields=['interview_score', 'proctoring_score', 'integrity_score', 'rank_score', 'interview_count',
+                       'session_count', 'last_activity_at', 'updated_at']
+    )
+
+
+def _adjust_histograms(changes):
+    """Apply {role_type: [(score, +1 or -1), ...]} to the role distributions"""
+    for role_type in sorted(changes):
+        stats, _ = RoleRankingStats.objects.select_for_update().get_or_create(
+            role_type=role_type, defaults={'score_histogram': [0] * HISTOGRAM_BUCKETS}
+        )
+        if len(stats.score_histogram) != HISTOGRAM_BUCKETS:
+            stats.score_histogram = [0] * HISTOGRAM_BUCKETS
+        for score, sign in changes[role_type]:
+            stats.candidate_count += sign
+            stats.score_histogram[histogram_bucket(score)] += sign
+        stats.save()
+
+
+def refresh(pairs):
+    """Recompute the rankings of the given (student_id, role_type) candidates"""
+    pairs = set(pairs)
+    if not pairs:
+        return
+    students = {student_id for student_id, role_type in pairs}
+    roles = {role_type for student_id, role_type in pairs}
+    with transaction.atomic():
+        previous = {(r.student_id, r.role_type): r for r in CandidateRanking.objects.select_for_update().filter(
+            student_id__in=students, role_type__in=roles) if (r.student_id, r.role_type) in pairs}
+        # Filtering on both sets may match other pairs too; only the requested ones are kept
+        built = {key: ranking for key, ranking in _candidates(
+            Interview.objects.filter(student_id__in=students, role_type__in=roles),
+            ProctoringSession.objects.filter(student_id__in=students, role_type__in=roles)
+        ).items() if key in pairs}
+
+        changes = {}
+        for key, ranking in built.items():
+            old = previous.get(key)
+            if old is not None and old.rank_score == ranking.rank_score:
+                continue
+            if old is not None:
+                changes.setdefault(key[1], []).append((old.rank_score, -1))
+            changes.setdefault(key[1], []).append((ranking.rank_score, 1))
+        _upsert(list(built.values()))
+        _adjust_histograms(changes)
+
+        # Candidates left without interviews or sessions; post_delete takes them out of the histogram
+        gone = [previous[key].pk for key in previous if key not in built]
+        if gone:
+            CandidateRanking.objects.filter(pk__in=gone).delete()
+
+
+def remove(ranking):
+    """Take a deleted row out of its role's distribution"""
+    _adjust_histograms({ranking.role_type: [(ranking.rank_score, -1)]})
+
+
+def rebuild(batch_size=500):
+    """Recompute every ranking and role distribution from interviews and sessions; returns the candidate count"""
+    student_ids = sorted(set(Interview.objects.values_list('student_id', flat=True).distinct())
+                         | set(ProctoringSession.objects.values_list('student_id', flat=True).distinct()))
+    histograms = {}
+    built = set()
+    with transaction.atomic():
+        for start in range(0, len(student_ids), batch_size):
+            batch = student_ids[start:start + batch_size]
+            rankings = list(_candidates(Interview.objects.filter(student_id__in=batch),
+                                        ProctoringSession.objects.filter(student_id__in=batch)).values())
+            _upsert(rankings)
+            for ranking in rankings:
+                built.add((ranking.student_id, ranking.role_type))
+                histograms.setdefault(ranking.role_type, [0] * HISTOGRAM_BUCKETS)[
+                    histogram_bucket(ranking.rank_score)] += 1
+        stale = [pk for pk, student_id, role_type in
+                 CandidateRanking.objects.values_list('pk', 'student_id', 'role_type').iterator(chunk_size=2000)
+                 if (student_id, role_type) not in built]
+        CandidateRanking.objects.filter(pk__in=stale).delete()
+        # Replaced wholesale, after the deletes above have adjusted the old ones
+        RoleRankingStats.objects.all().delete()
+        RoleRankingStats.objects.bulk_create([
+            RoleRankingStats(role_type=role_type, candidate_count=sum(histogram), score_histogram=histogram)
+            for role_type, histogram in histograms.items()
+        ])
+    return sum(sum(histogram) for histogram in histograms.values())
+
+
+def percentile(histogram, score):
+    """Percent of the role's candidates ranked below `score`, counting half of its own bucket"""
+    total = sum(histogram)
+    if not total:
+        return None
+    bucket = histogram_bucket(score)
+    below = sum(histogram[:bucket])
+    return round((below + histogram[bucket] / 2) * 100 / total, 1)
+
+
+def roles():
+    return list(RoleRankingStats.objects.filter(candidate_count__gt=0).order_by('role_type')
+                .values_list('role_type', flat=True))
+
+
+def top_candidates(role_type, k=DEFAULT_TOP_K, since=None, until=None):
+    """
+    The K best-ranked candidates for a role, optionally only those active in
+    [since, until), each with a `percentile` among all of the role's candidates
+    """
+    rankings = CandidateRanking.objects.filter(role_type=role_type).select_related('student')
+    if since is not None:
+        rankings = rankings.filter(last_activity_at__gte=since)
+    if until is not None:
+        rankings = rankings.filter(last_activity_at__lt=until)
+    rankings = list(rankings.order_by('-rank_score', 'id')[:min(max(k, 1), MAX_TOP_K)])
+    stats = RoleRankingStats.objects.filter(role_type=role_type).first()
+    histogram = stats.score_histogram if stats else []
+    for ranking in rankings:
+        ranking.percentile = percentile(histogram, ranking.rank_score)
+    return rankings
@@ -0,0 +1,87 @@
+"""
+Resume analysis cache
+Analyses are stored under the SHA-256 of the uploaded file bytes and the
+analyzer version, so re-uploading the same PDF returns the stored result
+without extracting or analyzing it again. The extracted text is kept with
+each entry; after an analyzer upgrade the new analysis reuses it and only the
+parsing step is skipped.
+
+Every entry is one analysis run (a miss) and counts its later hits, so the
+hit rate is hits / (hits + entries).
+"""
+import hashlib
+
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .ai_models.config import Config
+from .models import ResumeAnalysisCache
+
+FAILED_ANALYSIS_PREFIX = 'Resume analysis failed'
+
+
+def hash_upload(uploaded_file):
+    """SHA-256 of an uploaded file; computed while streaming by StreamingUploadHandler, else read in chunks"""
+    if getattr(uploaded_file, 'content_hash', None):
+        return uploaded_file.content_hash
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+
+def hash_stored(field_file):
+    """SHA-256 of a saved file; content-addressed storage already has it, other storages read the file"""
+    if hasattr(field_file.storage, 'content_hash'):
+        return field_file.storage.content_hash(field_file.name)
+    with field_file.open('rb') as f:
+        return hash_upload(f)
+
+
+def get_analysis(content_hash, count_hit=True):
+    """Cached analysis for the current analyzer version, counting the hit; None on a miss"""
+    entry = ResumeAnalysisCache.objects.filter(
+        content_hash=content_hash, analyzer_version=Config.RESUME_ANALYZER_VERSION
+    ).first()
+    if entry is not None and count_hit:
+        count_hits([content_hash])
+    return entry
+
+
+def count_hits(content_hashes):
+    """Record hits for entries looked up with count_hit=False, e.g. by readers that must not write"""
+    if content_hashes:
+        ResumeAnalysisCache.objects.filter(
+            content_hash__in=content_hashes, analyzer_version=Config.RESUME_ANALYZER_VERSION
+        ).update(hits=F('hits') + 1, last_hit_at=timezone.now())
+
+
+def get_text(content_hash):
+    """Extracted text stored by any analyzer version, so an upgrade can skip parsing"""
+    return (ResumeAnalysisCache.objects.filter(content_hash=content_hash)
+            .order_by('-created_at').values_list('extracted_text', flat=True).first())
+
+
+def store_analysis(content_hash, text, score, skills, suggestions):
+    """Cache a finished analysis; failed analyses are not stored so the next upload retries them"""
+    if not text or str(suggestions).startswith(FAILED_ANALYSIS_PREFIX):
+        return None
+    try:
+        entry, _ = ResumeAnalysisCache.objects.get_or_create(
+            content_hash=content_hash,
+            analyzer_version=Config.RESUME_ANALYZER_VERSION,
+            defaults={'extracted_text': text, 'score': score, 'skills': skills, 'suggestions': suggestions}
+        )
+        return entry
+    except Exception as e:
+        print(f"Error caching resume analysis: {e}")
+        return None
+
+
+def hit_rate(queryset=None):
+    """(hits, misses, rate) over the given entries, all of them by default"""
+    queryset = ResumeAnalysisCache.objects.all() if queryset is None else queryset
+    hits = queryset.aggregate(total=Sum('hits'))['total'] or 0
+    misses = queryset.count()
+    return hits, misses, hits / (hits + misses) if hits + misses else 0.0
@@ -0,0 +1,128 @@
+"""
+Resume analysis worker
+upload_resume only stores the file. Text extraction and analyze_resume run
+here on background threads once the upload's transaction commits, and the
+worker drives Resume.analysis_status: PENDING when queued, PROCESSING while
+it runs, then COMPLETED or FAILED. resume_detail polls resume_status for the
+transitions.
+
+Jobs are queued in this process only. A resume left PENDING or PROCESSING
+for longer than Config.RESUME_ANALYSIS_STALE (after a restart, say) is
+queued again the next time its status is read.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from . import caching, resume_cache
+from .ai_engine import analyze_resume
+from .ai_models.config import Config
+from .extraction import extract_text
+from .models import Resume
+from .utils import parse_ai_evaluation_response
+
+RUNNING_STATES = ('PENDING', 'PROCESSING')
+
+_executor = ThreadPoolExecutor(max_workers=Config.RESUME_WORKER_THREADS, thread_name_prefix='resume-worker')
+_queued = set()
+_queued_lock = threading.Lock()
+
+
+def complete_from_cache(resume, cached):
+    """Fill the resume from a cached analysis; no job is needed"""
+    resume.score = cached.score
+    resume.skills_extracted = cached.skills
+    resume.suggestions = cached.suggestions
+    resume.ai_analysis = parse_ai_evaluation_response(cached.suggestions)['suggestions']
+    resume.analysis_status = 'COMPLETED'
+    resume.save()
+
+
+def enqueue(resume, content_hash=None, text=None, file_type=None):
+    """Mark the resume PENDING and start its analysis once the current transaction commits"""
+    Resume.objects.filter(pk=resume.pk).update(analysis_status='PENDING', updated_at=timezone.now())
+    resume.analysis_status = 'PENDING'
+    job = (resume.pk, resume.file.name, content_hash, text, file_type)
+    transaction.on_commit(lambda: _submit(*job))
+
+
+def _submit(resume_id, file_name, content_hash, text, file_type):
+    if not Config.RESUME_ANALYSIS_ASYNC:
+        run_analysis(resume_id, file_name, content_hash, text, file_type)
+        return
+    # A re-upload is a different file name, so it queues even while the old file runs
+    with _queued_lock:
+        if (resume_id, file_name) in _queued:
+            return
+        _queued.add((resume_id, file_name))
+    _executor.submit(_run_queued, resume_id, file_name, content_hash, text, file_type)
+
+
+def _run_queued(resume_id, file_name, *args):
+    try:
+        run_analysis(resume_id, file_name, *args)
+    finally:
+        with _queued_lock:
+            _queued.discard((resume_id, file_name))
+        close_old_connections()
+
+
+def _finish(resume_id, file_name, **fields):
+    # Results of a file that has since been replaced are dropped
+    updated = Resume.objects.filter(pk=resume_id, file=file_name).update(updated_at=timezone.now(), **fields)
+    if updated:
+        # update() sends no post_save, so the cached resume detail is retired here
+        student_id = Resume.objects.filter(pk=resume_id).values_list('student_id', flat=True).first()
+        caching.bump_on_commit(caching.user_scope(student_id))
+    return updated
+
+
+def run_analysis(resume_id, file_name, content_hash=None, text=None, file_type=None):
+    """Extract and analyze one uploaded resume file, recording each status transition"""
+    if not _finish(resume_id, file_name, analysis_status='PROCESSING'):
+        return
+    try:
+        resume = Resume.objects.get(pk=resume_id)
+        if content_hash is None:
+            content_hash = resume_cache.hash_stored(resume.file)
+        if text is None:
+            text = resume_cache.get_text(content_hash)
+        if text is None:
+            with resume.file.open('rb') as f:
+                text = extract_text(f, resume.file.name, file_type=file_type)
+        if not text:
+            _finish(resume_id, file_name, analysis_status='FAILED')
+            return
+
+        score, skills, suggestions = analyze_resume(text)
+        resume_cache.store_analysis(content_hash, text, score, skills, suggestions)
+        _finish(resume_id, file_name, analysis_status='COMPLETED', score=score, skills_extracted=skills,
+                suggestions=suggestions, ai_analysis=parse_ai_evaluation_response(suggestions)['suggestions'])
+    except Exception as e:
+        print(f"Error analyzing resume {resume_id}: {e}")
+        _finish(resume_id, file_name, analysis_status='FAILED')
+
+
+def requeue_if_stale(resume):
+    """Queue a resume again when its job was lost; returns True if it was requeued"""
+    if resume.analysis_status not in RUNNING_STATES:
+        return False
+    if resume.updated_at > timezone.now() - timedelta(seconds=Config.RESUME_ANALYSIS_STALE):
+        return False
+    enqueue(resume)
+    return True
+
+
+def resume_analysis_for(user):
+    """
+    Resume analysis used to tailor interview questions; {} when there is no completed
+    one. A queued or running analysis is not waited for, so no request thread blocks on it;
+    start_interview_with_name sends the student to the resume page until it has finished.
+    """
+    resume = Resume.objects.filter(student=user).only('analysis_status', 'skills_extracted', 'score').first()
+    if resume is None or resume.analysis_status != 'COMPLETED':
+        return {}
+    return {'skills': resume.skills_extracted or {}, 'score': resume.score}
@@ -0,0 +1,271 @@
+"""
+Compact interview sessions
+The interview flow keeps its questions, every scored response with its
+detailed analysis, the resume analysis and the physical-analysis history in
+request.session, and its views mark the session modified on every AJAX call.
+Django's database backend then re-serializes, signs and base64-encodes all of
+it and rewrites the row each time.
+
+This backend (SESSION_ENGINE = 'core.sessions') stores sessions in a binary
+column (InterviewSession) as one entry per key: compact JSON, compressed on
+its own with zstd when the zstandard package is installed and zlib otherwise,
+the whole payload signed with an HMAC. Because entries are independent, a
+save re-encodes only the keys the request wrote or read a mutable value
+from, reuses the stored bytes of every other key, and skips the write when
+no value actually changed; the expiry is then pushed forward on its own once
+it falls EXPIRY_REFRESH_SECONDS behind.
+
+stats() reports loads, writes, skipped writes and raw against stored bytes
+for this process.
+"""
+import json
+import logging
+import struct
+import threading
+import zlib
+from datetime import timedelta
+
+from django.contrib.sessions.backends.base import CreateError, UpdateError
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.db import DatabaseError, IntegrityError, router, transaction
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+try:
+    import zstandard
+    ZSTD_SUPPORT = True
+except ImportError:
+    ZSTD_SUPPORT = False
+
+FORMAT_VERSION = b'\x01'
+MAC_BYTES = 32
+ENTRY_HEADER = struct.Struct('>HIc')  # key length, value length, codec
+
+RAW, ZLIB, ZSTD = b'r', b'z', b's'
+COMPRESS_MIN_BYTES = 128
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+EXPIRY_REFRESH_SECONDS = 300
+
+_stats = {'loads': 0, 'writes': 0, 'skipped_writes': 0, 'expiry_refreshes': 0,
+          'raw_bytes': 0, 'stored_bytes': 0}
+_largest_values = {}
+_stats_lock = threading.Lock()
+
+
+def stats():
+    """Session I/O of this process; sizes are of the writes made"""
+    with _stats_lock:
+        saves = _stats['writes'] + _stats['skipped_writes']
+        largest = sorted(_largest_values.items(), key=lambda item: -item[1])[:10]
+        return dict(
+            _stats,
+            codec='zstd' if ZSTD_SUPPORT else 'zlib',
+            compression_ratio=round(_stats['stored_bytes'] / _stats['raw_bytes'], 3) if _stats['raw_bytes'] else None,
+            skip_rate=round(_stats['skipped_writes'] / saves, 3) if saves else 0.0,
+            largest_values=dict(largest)
+        )
+
+
+def reset_stats():
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
+        _largest_values.clear()
+
+
+def _record(**counts):
+    with _stats_lock:
+        for name, value in counts.items():
+            _stats[name] += value
+
+
+def encode_value(value):
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def compress(raw):
+    """(codec, bytes) for one encoded value; small values are stored as they are"""
+    if len(raw) < COMPRESS_MIN_BYTES:
+        return RAW, raw
+    if ZSTD_SUPPORT:
+        packed = ZSTD, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    else:
+        packed = ZLIB, zlib.compress(raw, ZLIB_LEVEL)
+    return packed if len(packed[1]) < len(raw) else (RAW, raw)
+
+
+def decompress(codec, data):
+    if codec == RAW:
+        return data
+    if codec == ZLIB:
+        return zlib.decompress(data)
+    if codec == ZSTD and ZSTD_SUPPORT:
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unsupported session codec {codec!r}")
+
+
+def pack_entries(entries):
+    """Frame {key: (codec, bytes)} into one payload, without the version and MAC"""
+    parts = []
+    for key, (codec, data) in entries.items():
+        name = key.encode()
+        parts.append(ENTRY_HEADER.pack(len(name), len(data), codec))
+        parts.append(name)
+        parts.append(data)
+    return b''.join(parts)
+
+
+def unpack_entries(body):
+    entries = {}
+    view = memoryview(body)
+    offset = 0
+    while offset < len(view):
+        key_length, value_length, codec = ENTRY_HEADER.unpack_from(view, offset)
+        offset += ENTRY_HEADER.size
+        key = bytes(view[offset:offset + key_length]).decode()
+        offset += key_length
+        entries[key] = (codec, bytes(view[offset:offset + value_length]))
+        offset += value_length
+    if offset != len(view):
+        raise ValueError("Truncated session payload")
+    return entries
+
+
+class SessionStore(DBStore):
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # key -> (raw JSON, (codec, stored bytes)) as last loaded or written
+        self._stored = {}
+        # Keys whose value may differ from _stored: written, or read while mutable
+        self._touched = set()
+        self._stored_expiry = None
+
+    @classmethod
+    def get_model_class(cls):
+        from .models import InterviewSession
+        return InterviewSession
+
+    def _touch(self, key, value):
+        if isinstance(value, (dict, list)):
+            self._touched.add(key)
+        return value
+
+    def __getitem__(self, key):
+        return self._touch(key, super().__getitem__(key))
+
+    def __setitem__(self, key, value):
+        self._touched.add(key)
+        super().__setitem__(key, value)
+
+    def get(self, key, default=None):
+        return self._touch(key, super().get(key, default))
+
+    def setdefault(self, key, value):
+        return self._touch(key, super().setdefault(key, value))
+
+    def update(self, dict_):
+        self._touched.update(dict_)
+        super().update(dict_)
+
+    def values(self):
+        self._touched.update(self._session)
+        return super().values()
+
+    def items(self):
+        self._touched.update(self._session)
+        return super().items()
+
+    def _sign(self, body):
+        return salted_hmac(self.key_salt, body, algorithm='sha256').digest()
+
+    def encode(self, session_dict):
+        entries = {key: compress(encode_value(value)) for key, value in session_dict.items()}
+        return self._seal(entries)
+
+    def _seal(self, entries):
+        body = FORMAT_VERSION + pack_entries(entries)
+        return body[:1] + self._sign(body) + body[1:]
+
+    def _open(self, session_data):
+        """{key: (raw JSON, (codec, bytes))}, or None for a payload that fails its check"""
+        session_data = bytes(session_data)
+        version, mac = session_data[:1], session_data[1:1 + MAC_BYTES]
+        body = version + session_data[1 + MAC_BYTES:]
+        if version != FORMAT_VERSION or not constant_time_compare(mac, self._sign(body)):
+            logging.getLogger('django.security.SuspiciousSession').warning("Session data corrupted")
+            return None
+        try:
+            return {key: (decompress(*packed), packed) for key, packed in unpack_entries(body[1:]).items()}
+        except Exception as e:
+            print(f"Error decoding session: {e}")
+            return None
+
+    def decode(self, session_data):
+        stored = self._open(session_data) or {}
+        return {key: json.loads(raw) for key, (raw, packed) in stored.items()}
+
+    def load(self):
+        s = self._get_session_from_db()
+        if not s:
+            return {}
+        stored = self._open(s.session_data)
+        if stored is None:
+            return {}
+        _record(loads=1)
+        self._stored = stored
+        self._stored_expiry = s.expire_date
+        return {key: json.loads(raw) for key, (raw, packed) in stored.items()}
+
+    def _current_entries(self, data):
+        """(entries to store, whether they differ from what was loaded), re-encoding touched keys only"""
+        entries = {}
+        changed = data.keys() != self._stored.keys()
+        for key, value in data.items():
+            if key in self._stored and key not in self._touched:
+                entries[key] = self._stored[key]
+                continue
+            raw = encode_value(value)
+            if key in self._stored and self._stored[key][0] == raw:
+                entries[key] = self._stored[key]
+            else:
+                entries[key] = (raw, compress(raw))
+                changed = True
+        return entries, changed
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        entries, changed = self._current_entries(data)
+        expire_date = self.get_expiry_date()
+        if not must_create and not changed and self._stored_expiry is not None:
+            _record(skipped_writes=1)
+            if expire_date - self._stored_expiry > timedelta(seconds=EXPIRY_REFRESH_SECONDS):
+                self.model.objects.filter(session_key=self.session_key).update(expire_date=expire_date)
+                self._stored_expiry = expire_date
+                _record(expiry_refreshes=1)
+            self._touched.clear()
+            return
+
+        payload = self._seal({key: packed for key, (raw, packed) in entries.items()})
+        obj = self.model(session_key=self._get_or_create_session_key(), session_data=payload,
+                         expire_date=expire_date)
+        using = router.db_for_write(self.model, instance=obj)
+        try:
+            with transaction.atomic(using=using):
+                obj.save(force_insert=must_create, force_update=not must_create, using=using)
+        except IntegrityError:
+            if must_create:
+                raise CreateError
+            raise
+        except DatabaseError:
+            if not must_create:
+                raise UpdateError
+            raise
+
+        self._stored, self._stored_expiry = entries, expire_date
+        self._touched.clear()
+        _record(writes=1, raw_bytes=sum(len(raw) for raw, packed in entries.values()), stored_bytes=len(payload))
+        with _stats_lock:
+            for key, (raw, packed) in entries.items():
+                _largest_values[key] = max(_largest_values.get(key, 0), len(raw))
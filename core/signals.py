@@ -1,7 +1,10 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import Profile
+from .models import (Profile, Assignment, AssignmentStats, Submission, ProctoringResponse, ProctoringSession,
+                     Interview, CandidateRanking, Resume)
+from . import analytics, caching, proctoring, rankings
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -12,3 +15,116 @@ def create_user_profile(sender, instance, created, **kwargs):
 def save_user_profile(sender, instance, **kwargs):
     if hasattr(instance, 'profile'):
         instance.profile.save()
+
+@receiver(post_save, sender=Assignment)
+def create_assignment_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        AssignmentStats.objects.get_or_create(
+            assignment=instance, defaults={'score_histogram': [0] * analytics.SCORE_BUCKETS}
+        )
+
+@receiver(pre_save, sender=Submission)
+def remember_submission_state(sender, instance, raw=False, **kwargs):
+    # What the rollup counted for this row, so grading can move it between buckets
+    instance._stats_previous = None
+    if instance.pk and not raw:
+        instance._stats_previous = Submission.objects.filter(pk=instance.pk).values(
+            'score', 'student_id', 'assignment_id'
+        ).first()
+
+@receiver(post_save, sender=Submission)
+def update_assignment_stats(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        analytics.record_submission(instance, created, getattr(instance, '_stats_previous', None))
+
+@receiver(post_delete, sender=Submission)
+def remove_from_assignment_stats(sender, instance, **kwargs):
+    # After commit, so an assignment deleted in the same cascade is not given a new rollup row
+    assignment_id = instance.assignment_id
+    transaction.on_commit(lambda: analytics.refresh([assignment_id]))
+
+@receiver(pre_save, sender=ProctoringResponse)
+def remember_response_score(sender, instance, raw=False, **kwargs):
+    instance._previous_score = None
+    if instance.pk and not raw:
+        instance._previous_score = ProctoringResponse.objects.filter(pk=instance.pk).values_list(
+            'score', flat=True
+        ).first()
+
+@receiver(post_save, sender=ProctoringResponse)
+def update_session_rollups(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        proctoring.record_response(instance, created, getattr(instance, '_previous_score', None))
+
+@receiver(post_delete, sender=ProctoringResponse)
+def remove_from_session_rollups(sender, instance, **kwargs):
+    session_id = instance.question.session_id
+    transaction.on_commit(lambda: proctoring.rebuild(session_id))
+
+@receiver(pre_save, sender=Interview)
+@receiver(pre_save, sender=ProctoringSession)
+def remember_candidate(sender, instance, raw=False, **kwargs):
+    # The ranking row this one counted towards, in case the student or role changes
+    instance._ranked_as = None
+    if instance.pk and not raw:
+        instance._ranked_as = sender.objects.filter(pk=instance.pk).values_list('student_id', 'role_type').first()
+
+@receiver(post_save, sender=Interview)
+@receiver(post_save, sender=ProctoringSession)
+def update_candidate_ranking(sender, instance, raw=False, **kwargs):
+    if not raw:
+        previous = getattr(instance, '_ranked_as', None)
+        rankings.refresh({(instance.student_id, instance.role_type)} | ({previous} if previous else set()))
+
+@receiver(post_delete, sender=Interview)
+@receiver(post_delete, sender=ProctoringSession)
+def remove_from_candidate_ranking(sender, instance, **kwargs):
+    pair = (instance.student_id, instance.role_type)
+    transaction.on_commit(lambda: rankings.refresh([pair]))
+
+@receiver(post_delete, sender=CandidateRanking)
+def remove_from_role_distribution(sender, instance, **kwargs):
+    rankings.remove(instance)
+
+# Cached fragments; connected after the rollup receivers so their on-commit
+# refreshes land before the scopes are bumped
+
+@receiver([post_save, post_delete], sender=Submission)
+def invalidate_submission_fragments(sender, instance, raw=False, **kwargs):
+    if not raw:
+        caching.bump_on_commit(caching.user_scope(instance.student_id),
+                               caching.user_scope(instance.assignment.teacher_id))
+
+@receiver([post_save, post_delete], sender=Assignment)
+def invalidate_assignment_fragments(sender, instance, raw=False, **kwargs):
+    if not raw:
+        caching.bump_on_commit(caching.user_scope(instance.teacher_id), 'assignments')
+
+@receiver([post_save, post_delete], sender=Interview)
+@receiver([post_save, post_delete], sender=ProctoringSession)
+def invalidate_student_fragments(sender, instance, raw=False, **kwargs):
+    if not raw:
+        caching.bump_on_commit(caching.user_scope(instance.student_id))
+
+@receiver([post_save, post_delete], sender=Resume)
+def invalidate_resume_fragments(sender, instance, raw=False, **kwargs):
+    # The analysis worker and ingest_resumes write with update() and bulk_create(), which send no signal,
+    # and bump the scope themselves
+    if not raw:
+        caching.bump_on_commit(caching.user_scope(instance.student_id))
+
+@receiver(pre_save, sender=Profile)
+def remember_profile_role(sender, instance, raw=False, **kwargs):
+    # Profiles are saved on every login; only role changes alter the student count
+    instance._previous_role = None
+    if instance.pk and not raw:
+        instance._previous_role = Profile.objects.filter(pk=instance.pk).values_list('role', flat=True).first()
+
+@receiver(post_save, sender=Profile)
+def invalidate_profile_fragments(sender, instance, created, raw=False, **kwargs):
+    if not raw and (created or getattr(instance, '_previous_role', None) != instance.role):
+        caching.bump_on_commit(caching.user_scope(instance.user_id), 'students')
+
+@receiver(post_delete, sender=Profile)
+def invalidate_deleted_profile_fragments(sender, instance, **kwargs):
+    caching.bump_on_commit('students')
@@ -0,0 +1,116 @@
+"""
+Content-addressed file storage
+Identical uploads (a starter template handed in by a whole class, a résumé
+uploaded again) are stored once. Each file's bytes live in a blob named by
+their SHA-256 under MEDIA_ROOT/blobs/ab/cd/<hash>, and the name a FileField
+stores (still under its upload_to directory, so URLs and .path keep working)
+is a hard link to that blob: a duplicate costs a directory entry, not a copy.
+
+The filesystem keeps the reference counts: a blob's is its link count less
+one, deleting a name is a plain unlink, and `manage.py gc_storage` removes
+names no FileField references any more and then blobs nothing links to.
+The hash is written to the blob as a 'user.sha256' extended attribute, which
+every link shares, so content_hash() answers without reading the file; the
+upload itself was usually hashed by StreamingUploadHandler while it arrived.
+Nothing here touches the database, so files can be saved from worker
+threads (ingest_resumes does).
+
+Where hard links are unavailable (another filesystem, some network shares)
+the blob is copied instead, and where extended attributes are not,
+content_hash() hashes the file.
+"""
+import hashlib
+import os
+import shutil
+
+from django.core.files.storage import FileSystemStorage
+
+XATTR_SUPPORT = hasattr(os, 'setxattr')
+
+BLOB_DIR = 'blobs'
+HASH_ATTRIBUTE = 'user.sha256'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_content(content):
+    """SHA-256 of a File, reusing the hash StreamingUploadHandler computed while receiving it"""
+    if getattr(content, 'content_hash', None):
+        return content.content_hash
+    digest = hashlib.sha256()
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def blob_name(self, content_hash):
+        return f"{BLOB_DIR}/{content_hash[:2]}/{content_hash[2:4]}/{content_hash}"
+
+    def _save(self, name, content):
+        content_hash = hash_content(content)
+        blob = self.blob_name(content_hash)
+        if not self.exists(blob):
+            stored = super()._save(blob, content)
+            if stored != blob:
+                # Another process stored the same bytes first; keep theirs
+                super().delete(stored)
+            elif XATTR_SUPPORT:
+                try:
+                    os.setxattr(self.path(blob), HASH_ATTRIBUTE, content_hash.encode())
+                except OSError as e:
+                    print(f"Error tagging blob {content_hash}: {e}")
+        content.content_hash = content_hash
+        return self._link(blob, name)
+
+    def _link(self, blob, name):
+        """Create `name` as a hard link to the blob, or a copy where links are not supported"""
+        source = self.path(blob)
+        while True:
+            target = self.path(name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            try:
+                os.link(source, target)
+            except FileExistsError:
+                # Taken between get_available_name() and now, as FileSystemStorage._save handles it
+                name = self.get_available_name(name)
+                continue
+            except OSError as e:
+                print(f"Error linking {name} to its blob, copying instead: {e}")
+                shutil.copyfile(source, target)
+            return name.replace('\\', '/')
+
+    def content_hash(self, name):
+        """SHA-256 of a stored file, read from its blob's attribute when it has one"""
+        if XATTR_SUPPORT:
+            try:
+                return os.getxattr(self.path(name), HASH_ATTRIBUTE).decode()
+            except OSError:
+                pass
+        with self.open(name, 'rb') as f:
+            return hash_content(f)
+
+    def refcount(self, content_hash):
+        """Names linked to a blob; 0 once only the blob itself is left"""
+        try:
+            return os.stat(self.path(self.blob_name(content_hash))).st_nlink - 1
+        except FileNotFoundError:
+            return 0
+
+    def blobs(self):
+        """(path, stat) of every blob"""
+        for directory, _, files in os.walk(self.path(BLOB_DIR)):
+            for file_name in files:
+                path = os.path.join(directory, file_name)
+                yield path, os.stat(path)
+
+    def linked_names(self):
+        """(name, path, stat) of every stored name that shares its bytes with a blob"""
+        for directory, subdirectories, files in os.walk(self.location):
+            if directory == self.location and BLOB_DIR in subdirectories:
+                subdirectories.remove(BLOB_DIR)
+            for file_name in files:
+                path = os.path.join(directory, file_name)
+                stat = os.stat(path)
+                if stat.st_nlink > 1:
+                    yield os.path.relpath(path, self.location).replace(os.sep, '/'), path, stat
@@ -0,0 +1,250 @@
+"""
+Interview media stream
+Long-lived WebSocket channel used by the interview room to stream frames and
+audio segments. Session and user are resolved once when the socket connects;
+analysis summaries and violation alerts are pushed back on the same socket.
+The HTTP endpoint update_physical_analysis stays available as a fallback.
+
+Binary messages carry one byte for the kind (0x01 video frame as JPEG,
+0x02 audio segment as webm) followed by the raw payload. Text messages are
+JSON control messages: {"type": "sync"} and {"type": "ping"}.
+"""
+import asyncio
+import base64
+import json
+import time
+from http.cookies import SimpleCookie, CookieError
+from importlib import import_module
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+
+from .ai_models.config import Config
+from .ai_models.frame_batcher import FrameQueueFull
+from .interview_analysis import get_question_analysis, get_prosody_state, record_frame_analysis, record_audio_analysis, summarize
+from .views import physical_analyzer, frame_batcher, capture_rate
+
+FRAME_MESSAGE = 0x01
+AUDIO_MESSAGE = 0x02
+MAX_IN_FLIGHT = 2  # Frames analyzed concurrently per connection; extra frames are dropped
+MAX_AUDIO_PENDING = 3  # Audio segments queued per connection; they are analyzed one at a time
+
+
+def _header(scope, name):
+    for key, value in scope.get('headers', []):
+        if key == name:
+            return value.decode('latin-1')
+    return ''
+
+
+def _origin_allowed(scope):
+    """Reject cross-site sockets; browsers always send Origin on WebSocket handshakes."""
+    origin = _header(scope, b'origin')
+    if not origin:
+        return True
+    return urlparse(origin).netloc == _header(scope, b'host')
+
+
+def _session_key(scope):
+    try:
+        cookies = SimpleCookie(_header(scope, b'cookie'))
+    except CookieError:
+        return None
+    morsel = cookies.get(settings.SESSION_COOKIE_NAME)
+    return morsel.value if morsel else None
+
+
+def _session_store(session_key):
+    engine = import_module(settings.SESSION_ENGINE)
+    return engine.SessionStore(session_key)
+
+
+def _authenticate(session_key):
+    """Load the session and user once for the lifetime of the connection."""
+    session = _session_store(session_key)
+    user = get_user(SimpleNamespace(session=session))
+    if not user.is_authenticated or 'interview_id' not in session:
+        return None, None
+    if user.profile.role != 'STUDENT':
+        return None, None
+    return session, user
+
+
+class InterviewStream:
+    def __init__(self, session_key, session, send):
+        self.session_key = session_key
+        self.send = send
+        self.current_q = session.get('current_question', 0)
+        self.physical_analysis = session.get('physical_analysis', {})
+        self.dirty_questions = set()
+        self.capture_state = session.get('capture_state', {})
+        self.next_interval_ms = self.capture_state.get('interval_ms', Config.ANALYSIS_FRAME_INTERVAL * 1000)
+        self.last_flush = time.monotonic()
+        self.dropped = 0
+        # Each segment continues the question's prosody state, so segments must not overlap
+        self.audio_lock = asyncio.Lock()
+
+    async def push(self, message):
+        try:
+            await self.send({'type': 'websocket.send', 'text': json.dumps(message)})
+        except Exception:
+            # Client went away while analysis was running
+            pass
+
+    async def handle_bytes(self, data):
+        try:
+            await self._handle_bytes(data)
+        except Exception as e:
+            print(f"Error in interview stream analysis: {e}")
+            await self.push({'type': 'error', 'error': 'Analysis failed'})
+
+    async def _handle_bytes(self, data):
+        kind, payload = data[0], data[1:]
+        if not payload:
+            return
+
+        if kind == FRAME_MESSAGE:
+            encoded = base64.b64encode(payload).decode('ascii')
+            try:
+                if Config.ENABLE_FRAME_BATCHING:
+                    analysis = await asyncio.wait_for(
+                        asyncio.wrap_future(frame_batcher.submit(encoded)),
+                        Config.FRAME_BATCH_RESULT_TIMEOUT
+                    )
+                else:
+                    analysis = await asyncio.to_thread(physical_analyzer.analyze_video_frame, encoded)
+            except FrameQueueFull:
+                await self.push({'type': 'busy', 'retry_after': Config.CAPTURE_INTERVAL_MAX_MS // 1000})
+                return
+            except asyncio.TimeoutError:
+                return
+            current_data = get_question_analysis(self.physical_analysis, self.current_q)
+            previous_violations = list(current_data.get('violations', []))
+            record_frame_analysis(current_data, analysis)
+            self.next_interval_ms = capture_rate.next_interval_ms(
+                self.capture_state, frame_batcher.queue_depth(), analysis, encoded, key=self.session_key
+            )
+            if current_data['violations'] and current_data['violations'] != previous_violations:
+                await self.push({'type': 'violation', 'violations': current_data['violations']})
+        elif kind == AUDIO_MESSAGE:
+            async with self.audio_lock:
+                current_data = get_question_analysis(self.physical_analysis, self.current_q)
+                analysis = await asyncio.to_thread(
+                    physical_analyzer.analyze_audio, payload, get_prosody_state(current_data)
+                )
+                record_audio_analysis(current_data, analysis)
+        else:
+            await self.push({'type': 'error', 'error': f'Unknown message kind {kind}'})
+            return
+
+        self.dirty_questions.add(f'question_{self.current_q}')
+        await self.push({
+            'type': 'analysis',
+            'current_analysis': current_data,
+            'summary': summarize(current_data),
+            'next_interval_ms': self.next_interval_ms
+        })
+        if time.monotonic() - self.last_flush >= Config.MEDIA_STREAM_FLUSH_INTERVAL:
+            await self.flush()
+
+    async def handle_text(self, text):
+        try:
+            message = json.loads(text)
+        except ValueError:
+            await self.push({'type': 'error', 'error': 'Invalid JSON'})
+            return
+        message_type = message.get('type') if isinstance(message, dict) else None
+        if message_type == 'sync':
+            await self.flush()
+            await self.push({'type': 'synced', 'question': self.current_q})
+        elif message_type == 'ping':
+            await self.push({'type': 'pong'})
+
+    async def flush(self):
+        """
+        Write this connection's analysis back to the session. Only the question
+        entries touched here are merged into a freshly loaded session so answers
+        saved by submit_answer in the meantime are not overwritten.
+        """
+        self.last_flush = time.monotonic()
+        dirty = {key: self.physical_analysis[key] for key in self.dirty_questions}
+        self.dirty_questions = set()
+        capture_state = dict(self.capture_state)
+
+        def _save():
+            session = _session_store(self.session_key)
+            if 'interview_id' not in session:
+                return None
+            if dirty:
+                physical_analysis = session.get('physical_analysis', {})
+                physical_analysis.update(dirty)
+                session['physical_analysis'] = physical_analysis
+                session['capture_state'] = capture_state
+                session.save()
+            return session.get('current_question', 0)
+
+        try:
+            current_q = await sync_to_async(_save)()
+        except Exception as e:
+            print(f"Error flushing interview stream session: {e}")
+            return
+        if current_q is not None:
+            self.current_q = current_q
+
+
+async def interview_stream_application(scope, receive, send):
+    """ASGI application for WebSocket connections."""
+    event = await receive()
+    if event['type'] != 'websocket.connect':
+        return
+
+    if (not Config.ENABLE_MEDIA_STREAM or scope.get('path') != Config.MEDIA_STREAM_PATH
+            or not _origin_allowed(scope)):
+        await send({'type': 'websocket.close', 'code': 4403})
+        return
+
+    session_key = _session_key(scope)
+    session = None
+    if session_key:
+        session, _ = await sync_to_async(_authenticate)(session_key)
+    if session is None:
+        await send({'type': 'websocket.close', 'code': 4401})
+        return
+
+    await send({'type': 'websocket.accept'})
+    stream = InterviewStream(session_key, session, send)
+    tasks = set()
+    audio_tasks = set()
+    try:
+        while True:
+            event = await receive()
+            if event['type'] == 'websocket.disconnect':
+                break
+            if event['type'] != 'websocket.receive':
+                continue
+
+            data = event.get('bytes')
+            if data:
+                if len(data) > Config.MEDIA_STREAM_MAX_MESSAGE_BYTES:
+                    await send({'type': 'websocket.close', 'code': 1009})
+                    break
+                # Frames are dropped when analysis falls behind; audio waits its turn
+                if data[0] == AUDIO_MESSAGE:
+                    pending, limit = audio_tasks, MAX_AUDIO_PENDING
+                else:
+                    pending, limit = tasks, MAX_IN_FLIGHT
+                if len(pending) >= limit:
+                    stream.dropped += 1
+                    continue
+                task = asyncio.create_task(stream.handle_bytes(data))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            elif event.get('text'):
+                await stream.handle_text(event['text'])
+    finally:
+        if tasks or audio_tasks:
+            await asyncio.gather(*tasks, *audio_tasks, return_exceptions=True)
+        await stream.flush()
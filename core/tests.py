@@ -1,7 +1,80 @@
-from django.test import TestCase, Client
+from django.test import TestCase, TransactionTestCase, Client, AsyncClient
+from django.http import QueryDict
+from django.core.management import call_command
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from django.test import override_settings
+from django.core.cache import caches
 from django.contrib.auth.models import User
-from .models import Profile, Assignment, Submission
+from .models import (Profile, Assignment, Submission, Resume, ResumeFingerprint, Interview, ProctoringSession,
+                     ProctoringQuestion, ProctoringResponse, AssignmentStats, CandidateRanking, RoleRankingStats)
 from django.urls import reverse
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from .ai_models.frame_batcher import FrameBatcher, FrameQueueFull
+from .ai_models.physical_analyzer import PhysicalAnalyzer
+from .ai_models.capture_rate import CaptureRateController
+from .ai_models.resume_analyzer import ResumeAnalyzer
+from .ai_models.resume_parser import ResumeParser
+from .ai_models.skill_taxonomy import get_taxonomy
+from .ai_models import resume_bitsets, resume_index
+from .ai_models.config import Config
+from . import analytics, caching, exports, proctoring, rankings, resume_cache, resume_worker, sessions, views
+from .storage import ContentAddressedStorage
+from .db_profiles import database_settings
+from .extraction import extract_document
+from .pagination import KeysetPaginator
+from .uploads import StreamingUploadHandler, upload_text
+from PIL import Image
+from asgiref.sync import async_to_sync
+import numpy as np
+import asyncio
+import base64
+import csv
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import zipfile
+import time
+import wave
+from pathlib import Path
+from unittest import mock
+
+def make_pdf(page_texts):
+    """Minimal PDF with one line of Helvetica text per page"""
+    objects = ['<< /Type /Catalog /Pages 2 0 R >>', None, '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for text in page_texts:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    out = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += ''.join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def offline_resume_analysis(analyzer, text):
+    """ResumeAnalyzer.analyze_resume_text with fixed scores in place of the remote stages"""
+    mentions = analyzer.taxonomy.extract(text)
+    return {'skills': analyzer.taxonomy.group(mentions), 'scores': {'overall_score': 7.0},
+            'recommendations': ['Quantify the impact of each project']}
+
 
 class AdvancedFeaturesTest(TestCase):
     def setUp(self):
@@ -54,3 +127,1061 @@ class AdvancedFeaturesTest(TestCase):
         response = self.client.get(reverse('profile'))
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'core/profile.html')
+
+
+
+class FrameBatcherTest(TestCase):
+    def test_frames_are_batched_and_results_routed(self):
+        calls = []
+
+        def batch_fn(frames):
+            calls.append(len(frames))
+            return [f"result-{f}" for f in frames]
+
+        batcher = FrameBatcher(batch_fn, max_batch=4, max_latency_ms=200, workers=1)
+        futures = [batcher.submit(i) for i in range(4)]
+        self.assertEqual([f.result(timeout=5) for f in futures], [f"result-{i}" for i in range(4)])
+        self.assertEqual(calls, [4])
+
+    def test_backpressure_when_queue_is_full(self):
+        release = threading.Event()
+
+        def batch_fn(frames):
+            release.wait(5)
+            return frames
+
+        batcher = FrameBatcher(batch_fn, max_batch=1, max_latency_ms=0, max_queue=2, workers=1)
+        batcher.submit('a')
+        deadline = time.monotonic() + 5
+        while batcher.queue_depth() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        batcher.submit('b')
+        batcher.submit('c')
+        with self.assertRaises(FrameQueueFull):
+            batcher.submit('d')
+        release.set()
+
+
+class InterviewStreamTest(TestCase):
+    def setUp(self):
+        self.student = User.objects.create_user(username='streamer', password='password123')
+
+    def _connect(self, cookie=''):
+        from asgiref.testing import ApplicationCommunicator
+        from .streaming import interview_stream_application
+        scope = {
+            'type': 'websocket',
+            'path': '/ws/interview/analysis/',
+            'headers': [(b'host', b'testserver'), (b'origin', b'http://testserver'), (b'cookie', cookie.encode())],
+        }
+        return ApplicationCommunicator(interview_stream_application, scope)
+
+    def test_rejects_connection_without_interview_session(self):
+        async def run():
+            communicator = self._connect()
+            await communicator.send_input({'type': 'websocket.connect'})
+            return await communicator.receive_output(timeout=5)
+
+        message = async_to_sync(run)()
+        self.assertEqual(message, {'type': 'websocket.close', 'code': 4401})
+
+    def test_accepts_student_with_active_interview(self):
+        self.client.login(username='streamer', password='password123')
+        session = self.client.session
+        session['interview_id'] = 1
+        session.save()
+        cookie = f'sessionid={session.session_key}'
+
+        async def run():
+            communicator = self._connect(cookie)
+            await communicator.send_input({'type': 'websocket.connect'})
+            accepted = await communicator.receive_output(timeout=5)
+            await communicator.send_input({'type': 'websocket.receive', 'text': '{"type": "ping"}'})
+            reply = await communicator.receive_output(timeout=5)
+            await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await communicator.wait(timeout=5)
+            return accepted, reply
+
+        accepted, reply = async_to_sync(run)()
+        self.assertEqual(accepted['type'], 'websocket.accept')
+        self.assertEqual(json.loads(reply['text']), {'type': 'pong'})
+
+    def test_audio_segments_continue_prosody_state_in_order(self):
+        from .streaming import AUDIO_MESSAGE, InterviewStream
+
+        def analyze_audio(payload, state=None):
+            # Slow enough that overlapping segments would both read the same state
+            time.sleep(0.05)
+            segments = (state or {}).get('segments', 0) + 1
+            return {'voice_score': 5.0, 'prosody': {'segments': segments}, 'prosody_state': {'segments': segments}}
+
+        async def send(message):
+            pass
+
+        stream = InterviewStream('unused', {}, send)
+        segment = bytes([AUDIO_MESSAGE]) + b'audio'
+
+        async def run():
+            await asyncio.gather(stream.handle_bytes(segment), stream.handle_bytes(segment))
+
+        with mock.patch('core.streaming.physical_analyzer.analyze_audio', side_effect=analyze_audio), \
+                mock.patch.object(Config, 'MEDIA_STREAM_FLUSH_INTERVAL', 3600):
+            async_to_sync(run)()
+        details = stream.physical_analysis['question_0']['details']
+        self.assertEqual(details['audio_segment_count'], 2)
+        self.assertEqual(details['prosody_state'], {'segments': 2})
+
+
+class ProsodyAnalysisTest(TestCase):
+    def _wav(self, seconds=2.0, pitch=150.0, signal=None):
+        sample_rate = 16000
+        t = np.arange(int(sample_rate * seconds)) / sample_rate
+        if signal is None:
+            phase = 2 * np.pi * pitch * t
+            signal = sum(np.sin(k * phase) / k for k in range(1, 4)) * 0.3
+            signal *= 0.5 + 0.5 * np.maximum(0, np.sin(2 * np.pi * 4 * t))
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            wav.writeframes((signal * 32767).astype('<i2').tobytes())
+        return buffer.getvalue()
+
+    def test_local_prosody_accumulates_per_question_state(self):
+        analyzer = PhysicalAnalyzer()
+        first = analyzer.analyze_audio(base64.b64encode(self._wav()).decode())
+        self.assertAlmostEqual(first['prosody']['pitch_hz'], 150.0, delta=10)
+        self.assertGreater(first['prosody']['speaking_rate'], 2.0)
+
+        second = analyzer.analyze_audio(self._wav(), first['prosody_state'])
+        self.assertAlmostEqual(second['prosody']['seconds'], 4.0, places=1)
+        self.assertTrue(0.0 <= second['voice_score'] <= 10.0)
+
+    def test_vad_skips_silence_and_hiss(self):
+        analyzer = PhysicalAnalyzer()
+        hiss = np.random.default_rng(0).uniform(-0.03, 0.03, 32000)
+        for signal in (np.zeros(32000), hiss):
+            result = analyzer.analyze_audio(self._wav(signal=signal))
+            self.assertTrue(result['skipped'])
+            self.assertEqual(result['prosody']['pause_ratio'], 1.0)
+
+        speech = analyzer.analyze_audio(self._wav())
+        self.assertFalse(speech['skipped'])
+        stats = analyzer.get_audio_stats()
+        self.assertEqual((stats['segments'], stats['vad_skipped']), (3, 2))
+
+    def test_analysis_stats_are_staff_only(self):
+        User.objects.create_user(username='viewer', password='password123')
+        User.objects.create_user(username='operator', password='password123', is_staff=True)
+        self.client.login(username='viewer', password='password123')
+        self.assertEqual(self.client.get(reverse('analysis_stats')).status_code, 302)
+
+        self.client.login(username='operator', password='password123')
+        stats = self.client.get(reverse('analysis_stats')).json()
+        self.assertIn('vad_skipped', stats['audio'])
+        self.assertIn('skip_rate', stats['audio'])
+        self.assertIn('avg_batch_size', stats['frames'])
+
+
+class CaptureRateTest(TestCase):
+    def _frame(self, shade):
+        buffer = io.BytesIO()
+        Image.new('RGB', (320, 240), (shade, shade, shade)).save(buffer, 'JPEG')
+        return base64.b64encode(buffer.getvalue()).decode()
+
+    def test_interval_follows_scene_queue_and_violations(self):
+        controller = CaptureRateController()
+        state = {}
+        clean = {'person_count': 1, 'phone_detected': False}
+        controller.next_interval_ms(state, 0, clean, self._frame(120), key='session')
+        stable = controller.next_interval_ms(state, 0, clean, self._frame(120), key='session')
+        self.assertGreater(stable, Config.ANALYSIS_FRAME_INTERVAL * 1000)
+
+        deep_queue = Config.FRAME_BATCH_MAX_QUEUE
+        self.assertEqual(controller.next_interval_ms(state, deep_queue, clean, self._frame(120), key='session'),
+                         Config.CAPTURE_INTERVAL_MAX_MS)
+        # The thumbnail stays in process memory, not in the state written to the session
+        self.assertNotIn('thumbnail', state)
+        self.assertLess(len(json.dumps(state)), 100)
+
+        phone = {'person_count': 1, 'phone_detected': True}
+        self.assertEqual(controller.next_interval_ms(state, deep_queue, phone, self._frame(120)),
+                         Config.CAPTURE_INTERVAL_MIN_MS)
+        self.assertEqual(controller.next_interval_ms(state, deep_queue, clean, self._frame(120)),
+                         Config.CAPTURE_INTERVAL_MIN_MS)
+
+
+class ResumeFingerprintTest(TestCase):
+    RESUME = ("Senior Python developer with 6 years of experience. Bachelor of Science in Computer Science. "
+              "Built a Django analytics platform on AWS with PostgreSQL and Docker. "
+              "Led a team that developed a React dashboard for customer reporting.")
+
+    def setUp(self):
+        index_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(index_dir.cleanup)
+        overrides = self.settings(RESUME_INDEX_DIR=index_dir.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_exact_duplicate_rejected_via_hash(self):
+        analyzer = ResumeAnalyzer()
+        self.assertEqual(analyzer.check_and_validate_resume(self.RESUME), (True, None))
+        self.assertEqual(ResumeFingerprint.objects.count(), 1)
+
+        is_valid, error = analyzer.check_and_validate_resume(self.RESUME)
+        self.assertFalse(is_valid)
+        self.assertIn('100.0%', error)
+        self.assertEqual(ResumeFingerprint.objects.count(), 1)
+
+    def test_stored_features_compare_against_new_uploads(self):
+        analyzer = ResumeAnalyzer()
+        analyzer.check_and_validate_resume(self.RESUME)
+        features = analyzer._extract_key_features(self.RESUME + " Also knows Redis.")
+        is_unique, similarity, _ = analyzer._check_resume_uniqueness(features)
+        self.assertFalse(is_unique)
+        self.assertGreater(similarity, 0.75)
+
+    def test_lsh_shortlist_ranks_near_duplicate_first(self):
+        analyzer = ResumeAnalyzer()
+        analyzer.check_and_validate_resume("Junior data analyst. Master degree. Pandas, NumPy and Matplotlib "
+                                           "reports. Created a churn model for a telecom client.")
+        analyzer.check_and_validate_resume(self.RESUME)
+        original = ResumeFingerprint.objects.latest('id')
+
+        features = analyzer._extract_key_features(self.RESUME.replace("Docker", "Kubernetes"))
+        self.assertEqual(resume_index.shortlist(features)[0], original.id)
+        self.assertEqual(original.lsh_buckets.count(), Config.RESUME_LSH_BANDS)
+
+    def test_bitset_bounds_cover_exact_similarity(self):
+        analyzer = ResumeAnalyzer()
+        analyzer.check_and_validate_resume(self.RESUME)
+        analyzer.check_and_validate_resume("Junior data analyst. Master degree. Pandas, NumPy and Matplotlib "
+                                           "reports. Created a churn model for a telecom client.")
+        with tempfile.TemporaryDirectory() as directory:
+            groups = [
+                ('skills', ['python', 'django', 'aws', 'pandas', 'numpy'], 0.4, analyzer._flatten_skills),
+                ('education', analyzer.degree_keywords, 0.15, lambda f: f.get('education', [])),
+                ('roles', analyzer.role_keywords, 0.1, lambda f: f.get('roles', []))
+            ]
+            index = resume_bitsets.ResumeBitsetIndex(directory, groups, 0.35)
+            self.assertEqual(index.sync(), 2)
+
+            query = analyzer._extract_key_features(self.RESUME.replace("Docker", "Kubernetes"))
+            ids, bounds = index.upper_bounds(query)
+            words = np.array([0, 1, 2 ** 63 + 5, 2 ** 64 - 1], dtype=np.uint64)
+            self.assertEqual(resume_bitsets.unpacked_popcount(words).tolist(), [0, 1, 3, 64])
+            for fingerprint_id, bound in zip(ids, bounds):
+                stored = ResumeFingerprint.objects.get(id=fingerprint_id).features
+                self.assertGreaterEqual(bound + 1e-5, analyzer._calculate_similarity(query, stored))
+
+            ResumeFingerprint.objects.create(fingerprint_hash='f' * 64, features={'skills': ['Python']})
+            self.assertEqual(index.sync(), 3)
+            ResumeFingerprint.objects.filter(fingerprint_hash='f' * 64).delete()
+            self.assertEqual(index.sync(), 2)
+
+
+class ResumePipelineTest(TestCase):
+    def test_stages_run_concurrently_and_late_stages_are_reported(self):
+        analyzer = ResumeAnalyzer()
+
+        def fail():
+            raise ValueError("provider down")
+
+        started = time.perf_counter()
+        results, timings = analyzer._run_stages({
+            'fast': (lambda value: value, {'score': 7}),
+            'also_fast': (time.sleep, 0.1),
+            'slow': (time.sleep, 2),
+            'broken': (fail,)
+        }, deadline=0.5)
+        self.assertLess(time.perf_counter() - started, 1.5)
+
+        self.assertEqual(results, {'fast': {'score': 7}, 'also_fast': None})
+        self.assertEqual(timings['fast']['status'], 'ok')
+        self.assertEqual(timings['also_fast']['status'], 'no_result')
+        self.assertEqual(timings['slow']['status'], 'timeout')
+        self.assertEqual(timings['broken']['status'], 'failed')
+
+    def test_merge_uses_sources_that_answered(self):
+        merged = ResumeAnalyzer()._merge_plagiarism_results(None, {'percentage': 80, 'authenticity_score': 20})
+        self.assertEqual(merged['sources_checked'], ['router_ai'])
+        self.assertEqual(merged['risk_level'], 'high')
+
+class ResumeAnalysisCacheTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='cached', password='password123')
+        self.user.profile.role = 'STUDENT'
+        self.user.profile.save()
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+
+    def test_identical_upload_returns_stored_analysis(self):
+        content = b"Python developer with Django experience"
+        content_hash = hashlib.sha256(content).hexdigest()
+        resume_cache.store_analysis(content_hash, content.decode(), 8.5, ['Python', 'Django'], 'Add metrics')
+
+        self.client.login(username='cached', password='password123')
+        with self.settings(MEDIA_ROOT=self.media.name):
+            response = self.client.post(reverse('upload_resume'),
+                                        {'file': SimpleUploadedFile('resume.txt', content)})
+        self.assertRedirects(response, reverse('resume_detail'), fetch_redirect_response=False)
+
+        resume = Resume.objects.get(student=self.user)
+        self.assertEqual(resume.analysis_status, 'COMPLETED')
+        self.assertEqual(resume.score, 8.5)
+        self.assertEqual(resume.skills_extracted, ['Python', 'Django'])
+        self.assertEqual(resume_cache.hit_rate(), (1, 1, 0.5))
+
+    def test_text_survives_analyzer_upgrade(self):
+        resume_cache.store_analysis('a' * 64, 'old text', 6.0, [], 'Suggestions')
+        resume_cache.store_analysis('b' * 64, 'text', 5.0, [], 'Resume analysis failed. timeout')
+        version = Config.RESUME_ANALYZER_VERSION
+        Config.RESUME_ANALYZER_VERSION = 'next'
+        try:
+            self.assertIsNone(resume_cache.get_analysis('a' * 64))
+            self.assertEqual(resume_cache.get_text('a' * 64), 'old text')
+        finally:
+            Config.RESUME_ANALYZER_VERSION = version
+        self.assertIsNone(resume_cache.get_text('b' * 64))
+
+
+class ExtractionTest(TestCase):
+    def test_pages_are_joined_in_order_up_to_the_cap(self):
+        pdf = make_pdf([f"Page {i}" for i in range(12)])
+        result = extract_document(pdf, 'resume.pdf', max_pages=10)
+        self.assertEqual(result['text'], ''.join(f"Page {i}" for i in range(10)))
+        self.assertEqual(result['pages'], 10)
+        self.assertTrue(result['truncated'])
+
+    def test_bad_files_fail_without_breaking_later_extractions(self):
+        self.assertIsNone(extract_document(b'%PDF-1.4 not really', 'resume.pdf')['text'])
+        self.assertEqual(extract_document(make_pdf(['Slow']), 'resume.pdf', timeout=1e-6)['error'], 'timed out')
+        oversized = extract_document(b'x' * (Config.EXTRACTION_MAX_BYTES + 1), 'notes.txt')
+        self.assertIsNone(oversized['text'])
+
+        self.assertEqual(extract_document(make_pdf(['Fine']), 'resume.pdf')['text'], 'Fine')
+
+    def test_a_hung_document_does_not_break_one_extracted_alongside(self):
+        slow = make_pdf([f"Page {i}" for i in range(3000)])
+        started = threading.Barrier(2)
+        results = {}
+
+        def extract(name, pdf, **kwargs):
+            started.wait()
+            results[name] = extract_document(pdf, 'resume.pdf', max_pages=3000, **kwargs)
+
+        threads = [
+            threading.Thread(target=extract, args=('slow', slow), kwargs={'timeout': 0.5}),
+            threading.Thread(target=extract, args=('fine', make_pdf(['Fine'] * 1500))),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertIn('timed out', results['slow']['error'])
+        self.assertIsNone(results['fine']['error'])
+        self.assertEqual(results['fine']['text'], 'Fine' * 1500)
+
+
+class StreamingUploadTest(TestCase):
+    def _stream(self, content, chunk_size=10):
+        handler = StreamingUploadHandler()
+        handler.new_file('file', 'upload.bin', 'application/octet-stream', len(content))
+        for start in range(0, len(content), chunk_size):
+            handler.receive_data_chunk(content[start:start + chunk_size], start)
+        uploaded = handler.file_complete(len(content))
+        self.addCleanup(uploaded.close)
+        return uploaded
+
+    def test_one_pass_hashes_sniffs_and_decodes(self):
+        content = "Résumé: Python, Django and SQL. ".encode() * 20
+        uploaded = self._stream(content)
+        self.assertEqual(uploaded.content_hash, hashlib.sha256(content).hexdigest())
+        self.assertEqual(uploaded.detected_type, 'text')
+        self.assertEqual(upload_text(uploaded), content.decode())
+        self.assertEqual(uploaded.read(), content)
+
+        pdf = self._stream(make_pdf(['Streamed']), chunk_size=100)
+        self.assertEqual(pdf.detected_type, 'pdf')
+        self.assertEqual(upload_text(pdf), 'Streamed')
+
+    def test_docx_is_found_wherever_its_content_types_are_stored(self):
+        from docx import Document
+        word = Document()
+        word.add_paragraph('Reordered')
+        document = io.BytesIO()
+        word.save(document)
+        with zipfile.ZipFile(document) as original:
+            members = [(name, original.read(name)) for name in original.namelist()]
+        # LibreOffice and Google Docs write the package relationships before [Content_Types].xml
+        members.sort(key=lambda member: member[0] != '_rels/.rels')
+        reordered = io.BytesIO()
+        with zipfile.ZipFile(reordered, 'w') as archive:
+            for name, data in members:
+                archive.writestr(name, data)
+        content = reordered.getvalue()
+        self.assertNotEqual(content[30:49], b'[Content_Types].xml')
+
+        uploaded = self._stream(content, chunk_size=1000)
+        self.assertEqual(uploaded.detected_type, 'docx')
+        self.assertEqual(upload_text(uploaded).strip(), 'Reordered')
+
+        plain_zip = io.BytesIO()
+        with zipfile.ZipFile(plain_zip, 'w') as archive:
+            archive.writestr('notes.txt', 'not a document')
+        self.assertEqual(self._stream(plain_zip.getvalue()).detected_type, 'zip')
+
+    def test_latin_text_is_decoded_and_doc_is_refused(self):
+        # ASCII for the whole sniffed head, cp1252 only further in
+        content = ("Curriculum vitae of a Python developer. " * 3 + "Résumé – café, naïve “quotes”.").encode('cp1252')
+        uploaded = self._stream(content)
+        self.assertEqual(uploaded.detected_type, 'text')
+        self.assertEqual(upload_text(uploaded), content.decode('cp1252'))
+        self.assertEqual(self._stream("Résumé: Django".encode('cp1252')).detected_type, 'text')
+        self.assertEqual(extract_document(content, 'resume.txt')['text'], content.decode('cp1252'))
+
+        ole = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1' + bytes(range(256)) * 2
+        self.assertEqual(self._stream(ole).detected_type, 'doc')
+        result = extract_document(ole, 'resume.doc')
+        self.assertIsNone(result['text'])
+        self.assertIn('.doc', result['error'])
+
+        user = User.objects.create_user(username='legacy', password='password123')
+        user.profile.role = 'STUDENT'
+        user.profile.save()
+        self.client.login(username='legacy', password='password123')
+        response = self.client.post(reverse('upload_resume'), {'file': SimpleUploadedFile('resume.doc', ole)})
+        self.assertContains(response, 'Save the resume as DOCX or PDF')
+
+    def test_resume_with_mismatched_content_is_rejected(self):
+        user = User.objects.create_user(username='sniffed', password='password123')
+        user.profile.role = 'STUDENT'
+        user.profile.save()
+        self.client.login(username='sniffed', password='password123')
+        png = io.BytesIO()
+        Image.new('RGB', (8, 8)).save(png, format='PNG')
+        response = self.client.post(reverse('upload_resume'),
+                                    {'file': SimpleUploadedFile('resume.pdf', png.getvalue())})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Resume.objects.filter(student=user, analysis_status='COMPLETED').exists())
+
+
+class SkillTaxonomyTest(TestCase):
+    def test_whole_words_synonyms_and_counts(self):
+        text = "JavaScript and TypeScript at R&D; later Java, ReactJS and react. Problem solving, k8s."
+        mentions = get_taxonomy().extract(text)
+        self.assertEqual(list(mentions), ['JavaScript', 'TypeScript', 'Java', 'React', 'Problem-Solving', 'Kubernetes'])
+        self.assertEqual(mentions['React']['count'], 2)
+        self.assertEqual(mentions['Java']['positions'], [text.index('Java,')])
+
+        self.assertEqual(ResumeParser().extract_skills(text), list(mentions))
+        self.assertEqual(ResumeAnalyzer()._extract_skills(text)['cloud'], ['Kubernetes'])
+
+
+class ResumeWorkerTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='queued', password='password123')
+        self.user.profile.role = 'STUDENT'
+        self.user.profile.save()
+        self.client.login(username='queued', password='password123')
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        patcher = mock.patch.object(ResumeAnalyzer, 'analyze_resume_text', offline_resume_analysis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _upload(self, execute):
+        with self.settings(MEDIA_ROOT=self.media.name), self.captureOnCommitCallbacks(execute=execute) as callbacks:
+            response = self.client.post(reverse('upload_resume'), {
+                'file': SimpleUploadedFile('resume.txt', b"Python and Django developer, 3 years experience")
+            })
+        self.assertRedirects(response, reverse('resume_detail'), fetch_redirect_response=False)
+        return callbacks
+
+    def test_upload_returns_before_analysis(self):
+        callbacks = self._upload(execute=False)
+        # The others retire the cached resume detail
+        self.assertEqual(len([callback for callback in callbacks if callback.__qualname__.startswith('enqueue.')]), 1)
+        status = self.client.get(reverse('resume_status')).json()
+        self.assertEqual(status['status'], 'PENDING')
+        self.assertFalse(status['done'])
+        # Interview questions do not wait for the pending analysis
+        started = time.monotonic()
+        self.assertEqual(resume_worker.resume_analysis_for(self.user), {})
+        self.assertLess(time.monotonic() - started, 1)
+        # The interview starts once the analysis has finished; until then the resume page shows its progress
+        response = self.client.post(reverse('start_interview_with_name'), {'candidate_name': 'Queued'})
+        self.assertRedirects(response, reverse('resume_detail'), fetch_redirect_response=False)
+        response = self.client.post(reverse('start_interview_with_name'), {'candidate_name': 'Queued'},
+                                    HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.json(), {'success': False, 'pending': True, 'redirect': reverse('resume_detail')})
+        self.assertFalse(Interview.objects.filter(student=self.user).exists())
+
+    def test_worker_drives_status_to_completed(self):
+        Config.RESUME_ANALYSIS_ASYNC = False
+        self.addCleanup(setattr, Config, 'RESUME_ANALYSIS_ASYNC', True)
+        with self.settings(MEDIA_ROOT=self.media.name):
+            self._upload(execute=True)
+
+        status = self.client.get(reverse('resume_status')).json()
+        self.assertEqual(status['status'], 'COMPLETED')
+        self.assertTrue(status['done'])
+        analysis = resume_worker.resume_analysis_for(self.user)
+        self.assertEqual(analysis['skills']['programming'], ['Python'])
+
+        questions = [{'question': 'How have you used Django?', 'type': 'technical', 'difficulty': 'easy'}]
+        with mock.patch.object(views.question_generator, 'generate_questions_raw', return_value=questions) as generate:
+            response = self.client.post(reverse('start_interview_with_name'), {'candidate_name': 'Queued'})
+        self.assertRedirects(response, reverse('interview_room'), fetch_redirect_response=False)
+        self.assertEqual(generate.call_args.args[1], analysis)
+
+
+class IngestResumesTest(TransactionTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(ResumeAnalyzer, 'analyze_resume_text', offline_resume_analysis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_ingest_reports_and_resumes_from_checkpoint(self):
+        User.objects.create_user(username='ana')
+        User.objects.create_user(username='ben')
+        with tempfile.TemporaryDirectory() as root, \
+                self.settings(MEDIA_ROOT=root, RESUME_INDEX_DIR=os.path.join(root, 'index')):
+            drive = os.path.join(root, 'drive')
+            os.makedirs(drive)
+            for name, text in (('ana.txt', "Python and SQL analyst. Built a reporting dashboard."),
+                               ('ben.txt', "Java developer with Spring. Designed a booking service."),
+                               ('nobody.txt', "No account for this one")):
+                with open(os.path.join(drive, name), 'w') as f:
+                    f.write(text)
+            report = os.path.join(root, 'report.jsonl')
+
+            call_command('ingest_resumes', drive, report=report, batch_size=2, stdout=io.StringIO())
+            with open(report) as f:
+                rows = {row['file']: row for row in map(json.loads, f)}
+            self.assertEqual(rows['ana.txt']['status'], 'ok')
+            self.assertEqual(rows['ana.txt']['skills'], ['Python', 'SQL'])
+            self.assertEqual(rows['nobody.txt']['status'], 'no_user')
+            self.assertEqual(Resume.objects.get(student__username='ben').analysis_status, 'COMPLETED')
+            self.assertEqual(ResumeFingerprint.objects.count(), 2)
+
+            out = io.StringIO()
+            call_command('ingest_resumes', drive, report=report, stdout=out)
+            self.assertIn('3 already ingested', out.getvalue())
+
+            # The same resume under another name is refused like a duplicate upload
+            User.objects.create_user(username='cara')
+            with open(os.path.join(drive, 'cara.txt'), 'w') as f:
+                f.write("Python and SQL analyst. Built a reporting dashboard.")
+            call_command('ingest_resumes', drive, report=report, stdout=io.StringIO())
+            with open(report) as f:
+                rows = {row['file']: row for row in map(json.loads, f)}
+            self.assertEqual(rows['cara.txt']['status'], 'duplicate')
+            self.assertFalse(rows['cara.txt']['unique'])
+            self.assertFalse(Resume.objects.filter(student__username='cara').exists())
+            self.assertEqual(ResumeFingerprint.objects.count(), 2)
+
+            # A student's own edited resume is no duplicate, also when everything is ingested again
+            ana = User.objects.get(username='ana')
+            stored_file = lambda: Resume.objects.get(student=ana).file.name
+            ingested_file = caching.cached('resume_detail', stored_file, user=ana)
+            with open(os.path.join(drive, 'ana.txt'), 'w') as f:
+                f.write("Python and SQL analyst. Built a reporting dashboard and a forecasting model.")
+            call_command('ingest_resumes', drive, report=report, restart=True, stdout=io.StringIO())
+            with open(report) as f:
+                rows = {row['file']: row for row in map(json.loads, f)}
+            self.assertEqual(rows['ana.txt']['status'], 'ok')
+            self.assertEqual(rows['ben.txt']['status'], 'cached')
+            self.assertTrue(rows['ben.txt']['unique'])
+            self.assertEqual(rows['cara.txt']['status'], 'duplicate')
+            self.assertEqual(ResumeFingerprint.objects.filter(student__username='ana').count(), 2)
+            with Resume.objects.get(student__username='ana').file.open() as f:
+                self.assertIn(b'forecasting', f.read())
+            # The cached resume detail is retired although bulk_create sends no post_save
+            self.assertNotEqual(stored_file(), ingested_file)
+            self.assertEqual(caching.cached('resume_detail', stored_file, user=ana), stored_file())
+
+
+@override_settings(CACHE_FRAGMENTS=False)
+class QueryBudgetTest(TestCase):
+    """Dashboards and list views run a fixed number of queries however many rows they show"""
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='teacher', password='password123')
+        self.teacher.profile.role = 'TEACHER'
+        self.teacher.profile.save()
+        self.student = User.objects.create_user(username='student', password='password123')
+        self.assignment = Assignment.objects.create(teacher=self.teacher, title='Essay', description='Write')
+        self.session = ProctoringSession.objects.create(student=self.student, role_type='Backend', status='COMPLETED',
+                                                        score=8, integrity_score=9, ended_at=timezone.now())
+        self.rows = 0
+
+    def _add_rows(self, count):
+        for _ in range(count):
+            n = self.rows = self.rows + 1
+            other = User.objects.create_user(username=f'student{n}')
+            assignment = Assignment.objects.create(teacher=self.teacher, title=f'Task {n}', description='Do it')
+            Submission.objects.create(assignment=assignment, student=self.student, file=f'submissions/{n}.txt')
+            Submission.objects.create(assignment=self.assignment, student=other, file=f'submissions/o{n}.txt', score=7)
+            Assignment.objects.create(teacher=other, title=f'Open {n}', description='Do it')
+            Interview.objects.create(student=self.student, role_type='Backend')
+            ProctoringSession.objects.create(student=self.student, role_type=f'Role {n}')
+            question = ProctoringQuestion.objects.create(session=self.session, question_text=f'Question {n}', order=n)
+            ProctoringResponse.objects.create(question=question, response_text='Answer', score=6)
+
+    def _queries(self, user, url):
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assertQueryBudget(self, user, url, budget):
+        self._add_rows(1)
+        few = self._queries(user, url)
+        self._add_rows(20)
+        many = self._queries(user, url)
+        self.assertEqual(few, many, f"{url} queries grow with rows")
+        self.assertLessEqual(many, budget)
+
+    def test_teacher_dashboard(self):
+        self.assertQueryBudget(self.teacher, reverse('dashboard'), 5)
+
+    def test_student_dashboard(self):
+        self.assertQueryBudget(self.student, reverse('dashboard'), 6)
+
+    def test_profile(self):
+        self.assertQueryBudget(self.student, reverse('profile'), 5)
+
+    def test_proctoring_pages(self):
+        self.assertQueryBudget(self.student, reverse('proctoring_history'), 5)
+        self.assertQueryBudget(self.student, reverse('proctoring_completed', args=[self.session.id]), 6)
+
+    def test_assignment_submissions(self):
+        self.assertQueryBudget(self.teacher, reverse('assignment_submissions', args=[self.assignment.id]), 7)
+
+
+class AssignmentAnalyticsTest(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='grader')
+        self.teacher.profile.role = 'TEACHER'
+        self.teacher.profile.save()
+        self.students = [User.objects.create_user(username=f'learner{i}') for i in range(5)]
+        self.assignment = Assignment.objects.create(teacher=self.teacher, title='Essay', description='Write')
+
+    def _rollup(self):
+        stats = AssignmentStats.objects.get(assignment=self.assignment)
+        return (stats.submission_count, stats.student_count, stats.graded_count, round(stats.score_sum, 6),
+                stats.score_histogram, stats.last_submission_at)
+
+    def test_grading_keeps_rollup_equal_to_aggregate(self):
+        submissions = [Submission.objects.create(assignment=self.assignment, student=student, file='s.txt')
+                       for student in self.students[:3]]
+        Submission.objects.create(assignment=self.assignment, student=self.students[0], file='again.txt')
+        for submission, score in zip(submissions, (4.5, 8.0, 9.5)):
+            submission.score = score
+            submission.save()
+        submissions[0].score = 6.0
+        submissions[0].save()
+
+        incremental = self._rollup()
+        self.assertEqual(incremental[:4], (4, 3, 3, 23.5))
+        analytics.refresh([self.assignment.pk])
+        self.assertEqual(self._rollup(), incremental)
+
+        summary = analytics.with_stats(Assignment.objects.filter(pk=self.assignment.pk))[0].summary
+        self.assertEqual(summary['pending'], 2)
+        self.assertAlmostEqual(summary['mean'], 23.5 / 3)
+        self.assertTrue(8 <= summary['median'] < 9)
+        self.assertEqual([b['count'] for b in summary['distribution']], [0, 0, 0, 0, 0, 0, 1, 0, 1, 1, 0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            submissions[1].delete()
+        self.assertEqual(self._rollup()[:4], (3, 2, 2, 15.5))
+
+    def test_missing_rollups_are_built_from_one_aggregate_query(self):
+        Submission.objects.create(assignment=self.assignment, student=self.students[0], file='s.txt', score=7)
+        AssignmentStats.objects.all().delete()
+        row = analytics.stats_queryset(Assignment.objects.filter(pk=self.assignment.pk)).get()
+        self.assertEqual((row.submission_count, row.mean_score, row.bucket_7), (1, 7.0, 1))
+
+        # Assignments with their rollups, the aggregate, the upsert and the student count
+        with self.assertNumQueries(4):
+            summary = analytics.with_stats(Assignment.objects.filter(teacher=self.teacher))[0].summary
+        self.assertEqual((summary['submissions'], summary['median']), (1, 7.5))
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.student = User.objects.create_user(username='pager', password='password123')
+        started = timezone.now()
+        # Pairs of sessions share a start time, so pages split ties on the primary key
+        for n in range(11):
+            session = ProctoringSession.objects.create(student=self.student, role_type=f'Role {n}')
+            ProctoringSession.objects.filter(pk=session.pk).update(started_at=started - timezone.timedelta(minutes=n // 2))
+        self.expected = list(ProctoringSession.objects.order_by('-started_at', '-pk').values_list('pk', flat=True))
+
+    def test_pages_walk_forward_and_back_without_counting(self):
+        paginator = KeysetPaginator(ProctoringSession.objects.all(), ordering=('-started_at', '-pk'), per_page=4)
+        pages = []
+        cursor = None
+        while True:
+            with CaptureQueriesContext(connection) as queries:
+                page = paginator.page(cursor)
+            self.assertEqual(len(queries), 1)
+            self.assertNotIn('COUNT(', queries[0]['sql'])
+            pages.append(page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual([s.pk for page in pages for s in page], self.expected)
+        self.assertEqual([len(page) for page in pages], [4, 4, 3])
+        self.assertFalse(pages[0].has_previous)
+
+        back = paginator.page(pages[2].previous_cursor)
+        self.assertEqual([s.pk for s in back], [s.pk for s in pages[1]])
+        self.assertTrue(back.has_previous and back.has_next)
+        self.assertEqual([s.pk for s in paginator.page(back.previous_cursor)], [s.pk for s in pages[0]])
+
+        self.assertEqual([s.pk for s in paginator.page(pages[1].next_cursor[:-2] + 'xx')], self.expected[:4])
+
+    def test_json_api_and_page_links(self):
+        self.client.force_login(self.student)
+        body = self.client.get(reverse('proctoring_history_api')).json()
+        self.assertEqual([r['id'] for r in body['results']], self.expected)
+        self.assertIsNone(body['next'])
+        self.assertIsNone(body['previous'])
+
+        page = KeysetPaginator(ProctoringSession.objects.all(), ordering=('-started_at', '-pk'), per_page=4).page(
+            query=QueryDict('tab=all'), param='sessions'
+        )
+        self.assertTrue(page.next_url.startswith('?tab=all&sessions='))
+
+
+class ProctoringRollupTest(TestCase):
+    def setUp(self):
+        self.student = User.objects.create_user(username='examinee', password='password123')
+        self.session = ProctoringSession.objects.create(student=self.student, role_type='Backend')
+        self.questions = [ProctoringQuestion.objects.create(session=self.session, question_text=f'Question {n}',
+                                                            order=n) for n in (1, 2)]
+
+    def _answer(self, question, text, score):
+        # Saved once before evaluation and again with the score, as proctoring_room does
+        response = ProctoringResponse.objects.create(question=question, response_text=text)
+        response.score = score
+        response.save()
+        return response
+
+    def test_responses_update_session_as_they_are_saved(self):
+        first = self._answer(self.questions[0], 'I would add an index on the lookup column', 6)
+        self._answer(self.questions[1], 'Cache it', 9)
+        first.score = 8
+        first.save()
+
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.transcript, 'Q: Question 1\nA: I would add an index on the lookup column\n\n'
+                                                  'Q: Question 2\nA: Cache it\n\n')
+        self.assertEqual((self.session.response_count, self.session.scored_count, self.session.score_total),
+                         (2, 2, 17))
+        summary = proctoring.summarize_session(self.session, 12)
+        self.assertEqual((summary['average_score'], summary['short_answers'], summary['total_words']), (8.5, 2, 11))
+        self.assertEqual([a['score'] for a in summary['answers']], [8, 9])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.response_count, self.session.score_total), (1, 9))
+        self.assertEqual(self.session.transcript, 'Q: Question 2\nA: Cache it\n\n')
+
+    def test_completion_summary_reads_only_the_session(self):
+        for question in self.questions:
+            self._answer(question, 'An answer', 7)
+        session = ProctoringSession.objects.defer('transcript').get(pk=self.session.pk)
+        with self.assertNumQueries(0):
+            summary = proctoring.summarize_session(session, 5)
+        self.assertEqual((summary['responses'], summary['average_score']), (2, 7))
+
+
+class DatabaseProfileTest(TestCase):
+    def test_profiles_come_from_the_environment(self):
+        sqlite = database_settings(Path('/srv'), {})['default']
+        self.assertEqual(sqlite['NAME'], Path('/srv/db.sqlite3'))
+        self.assertEqual(sqlite['PRAGMAS']['journal_mode'], 'WAL')
+
+        postgres = database_settings(Path('/srv'), {'DB_PROFILE': 'postgres', 'POSTGRES_DB': 'hiring',
+                                                   'DB_CONN_MAX_AGE': '300'})['default']
+        self.assertEqual((postgres['NAME'], postgres['CONN_MAX_AGE'], postgres['CONN_HEALTH_CHECKS']),
+                         ('hiring', 300, True))
+        with self.assertRaises(ImproperlyConfigured):
+            database_settings(Path('/srv'), {'DB_PROFILE': 'oracle'})
+
+    def test_pragmas_are_applied_to_new_connections(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], connection.settings_dict['PRAGMAS']['busy_timeout'])
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+
+class FragmentCacheTest(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        caching.reset_stats()
+        self.student = User.objects.create_user(username='cachee', password='password123')
+        self.teacher = User.objects.create_user(username='setter')
+        self.assignment = Assignment.objects.create(teacher=self.teacher, title='Essay', description='Write')
+
+    def _submit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Submission.objects.create(assignment=self.assignment, student=self.student, file='s.txt')
+
+    def test_writes_retire_the_fragments_of_affected_users(self):
+        count = lambda: Submission.objects.filter(student=self.student).count()
+        self.assertEqual(caching.cached('submissions', count, user=self.student), 0)
+        self._submit()
+        self.assertEqual(caching.cached('submissions', count, user=self.student), 1)
+        self.assertEqual(caching.cached('submissions', count, user=self.student), 1)
+
+        caches['default'].clear()
+        self.assertEqual(caching.cached('submissions', count, user=self.student), 1)
+        self.assertEqual(caching.stats()['submissions'],
+                         {'local_hits': 1, 'shared_hits': 1, 'misses': 2, 'hit_rate': 0.5})
+
+    def test_profile_page_is_served_from_cache_until_a_write(self):
+        self.client.force_login(self.student)
+        self.client.get(reverse('profile'))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('profile'))
+        self.assertFalse(any('core_submission' in q['sql'] for q in queries))
+        # Generations come from the local tier too, so a local hit never reaches the cache table
+        self.assertFalse(any('core_cache' in q['sql'] for q in queries))
+        with self.settings(CACHE_FRAGMENTS=False), CaptureQueriesContext(connection) as uncached:
+            self.client.get(reverse('profile'))
+        self.assertLess(len(queries), len(uncached))
+
+        self._submit()
+        response = self.client.get(reverse('profile'))
+        self.assertEqual(response.context['submission_count'], 1)
+        self.assertEqual(caching.stats()['profile_counts']['misses'], 2)
+
+
+    def test_resume_writes_retire_the_resume_detail(self):
+        load = lambda: Resume.objects.filter(student=self.student).first()
+        self.assertIsNone(caching.cached('resume_detail', load, user=self.student))
+        with self.captureOnCommitCallbacks(execute=True):
+            resume = Resume.objects.create(student=self.student, file='resumes/cachee.txt')
+        self.assertEqual(caching.cached('resume_detail', load, user=self.student).analysis_status, 'PENDING')
+
+        # The worker records statuses with update(), which sends no signal
+        with self.captureOnCommitCallbacks(execute=True):
+            resume_worker._finish(resume.pk, resume.file.name, analysis_status='COMPLETED', score=7.5)
+        self.assertEqual(caching.cached('resume_detail', load, user=self.student).score, 7.5)
+
+
+class CompactSessionTest(TestCase):
+    def setUp(self):
+        sessions.reset_stats()
+        self.store = sessions.SessionStore()
+        self.store.update({
+            'questions': [{'question': f'Question {n} about Django', 'type': 'technical'} for n in range(20)],
+            'physical_analysis': {'question_0': {'confidence': 7.5, 'details': {'frame_count': 3}}},
+            'current_question': 0,
+        })
+        self.store.save()
+
+    def _reload(self):
+        return sessions.SessionStore(self.store.session_key)
+
+    def test_round_trip_is_compressed_and_signed(self):
+        row = sessions.SessionStore.get_model_class().objects.get(pk=self.store.session_key)
+        self.assertLess(len(bytes(row.session_data)), len(json.dumps(dict(self.store.items()))))
+        self.assertEqual(self._reload()['questions'][19]['question'], 'Question 19 about Django')
+
+        tampered = bytearray(row.session_data)
+        tampered[-1] ^= 1
+        self.assertEqual(self.store.decode(bytes(tampered)), {})
+
+    def test_write_is_skipped_unless_a_value_changed(self):
+        store = self._reload()
+        store['questions']
+        store['current_question'] = 0
+        store.modified = True
+        with CaptureQueriesContext(connection) as queries:
+            store.save()
+        self.assertEqual(len(queries), 0)
+
+        store = self._reload()
+        store['physical_analysis']['question_0']['details']['frame_count'] += 1
+        store.save()
+        self.assertEqual(self._reload()['physical_analysis']['question_0']['details']['frame_count'], 4)
+        self.assertEqual(sessions.stats()['skipped_writes'], 1)
+        self.assertEqual(sessions.stats()['writes'], 2)
+
+
+class ContentAddressedStorageTest(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = self.settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        teacher = User.objects.create_user(username='template-author')
+        self.student = User.objects.create_user(username='template-user')
+        self.assignment = Assignment.objects.create(teacher=teacher, title='Starter', description='Fill in')
+        self.content_hash = hashlib.sha256(b'def solve():\n    pass\n').hexdigest()
+
+    def _submit(self, name):
+        return Submission.objects.create(assignment=self.assignment, student=self.student,
+                                         file=ContentFile(b'def solve():\n    pass\n', name=name))
+
+    def test_duplicates_share_one_blob_until_collected(self):
+        self.assertIsInstance(default_storage, ContentAddressedStorage)
+        first, second = self._submit('starter.py'), self._submit('starter.py')
+        self.assertNotEqual(first.file.name, second.file.name)
+        self.assertTrue(os.path.samefile(first.file.path, second.file.path))
+        self.assertEqual(default_storage.refcount(self.content_hash), 2)
+        self.assertEqual(resume_cache.hash_stored(second.file), self.content_hash)
+
+        second.delete()
+        call_command('gc_storage', grace_seconds=0, stdout=io.StringIO())
+        self.assertFalse(default_storage.exists(second.file.name))
+        self.assertEqual(default_storage.refcount(self.content_hash), 1)
+        with first.file.open('rb') as f:
+            self.assertEqual(f.read(), b'def solve():\n    pass\n')
+
+        first.delete()
+        call_command('gc_storage', grace_seconds=0, stdout=io.StringIO())
+        self.assertFalse(default_storage.exists(default_storage.blob_name(self.content_hash)))
+
+
+class StreamingExportTest(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='exporter', password='password123')
+        self.teacher.profile.role = 'TEACHER'
+        self.teacher.profile.save()
+        self.student = User.objects.create_user(username='graded', password='password123')
+        self.assignment = Assignment.objects.create(teacher=self.teacher, title='Essay', description='Write')
+        Submission.objects.create(assignment=self.assignment, student=self.student, file='submissions/a.txt',
+                                  score=8.5, ai_feedback='=HYPERLINK("http://example.com") and more')
+
+    def _export(self, fmt):
+        response = self.client.get(reverse('export_submissions', args=[self.assignment.pk]), {'format': fmt})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_submission_exports_in_each_format(self):
+        self.client.login(username='exporter', password='password123')
+        rows = list(csv.DictReader(io.StringIO(self._export('csv'))))
+        self.assertEqual(rows[0]['student'], 'graded')
+        self.assertEqual(rows[0]['score'], '8.5')
+        self.assertTrue(rows[0]['feedback'].startswith('=HYPERLINK'))
+
+        excel = self._export('excel')
+        self.assertTrue(excel.startswith('\ufeffsubmission_id,'))
+        self.assertIn('"\'=HYPERLINK(""http://example.com"") and more"', excel)
+
+        record = json.loads(self._export('jsonl').splitlines()[0])
+        self.assertEqual((record['student'], record['score']), ('graded', 8.5))
+
+    def _exported_students(self, name):
+        response = self.client.get(reverse(name), {'format': 'jsonl'})
+        return [json.loads(line)['student'] for line in b''.join(response.streaming_content).decode().splitlines()]
+
+    def test_exports_are_limited_to_what_the_user_may_see(self):
+        Interview.objects.create(student=self.teacher, role_type='software_engineer', score=6)
+        Interview.objects.create(student=self.student, role_type='software_engineer', score=7)
+        ProctoringSession.objects.create(student=self.student, role_type='software_engineer')
+        self.client.login(username='graded', password='password123')
+        response = self.client.get(reverse('export_submissions', args=[self.assignment.pk]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self._exported_students('export_interviews'), ['graded'])
+
+        # Anyone may sign up as a teacher, so teachers only get their own rows too
+        self.client.login(username='exporter', password='password123')
+        self.assertEqual(self._exported_students('export_interviews'), ['exporter'])
+        self.assertEqual(self._exported_students('export_proctoring'), [])
+        User.objects.create_user(username='auditor', password='password123', is_staff=True)
+        self.client.login(username='auditor', password='password123')
+        self.assertEqual(sorted(self._exported_students('export_interviews')), ['exporter', 'graded'])
+        self.assertEqual(self._exported_students('export_proctoring'), ['graded'])
+
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'interviews.csv')
+            call_command('export_data', 'interviews', output=path, stderr=io.StringIO())
+            with open(path, newline='') as f:
+                self.assertEqual(len(list(csv.DictReader(f))), 2)
+
+
+    def test_asgi_requests_stream_through_an_async_iterator(self):
+        self.client.login(username='exporter', password='password123')
+        async_client = AsyncClient()
+        async_client.cookies = self.client.cookies
+
+        async def run():
+            response = await async_client.get(reverse('export_submissions', args=[self.assignment.pk]),
+                                              {'format': 'csv'})
+            return response, b''.join([chunk async for chunk in response.streaming_content])
+
+        response, content = async_to_sync(run)()
+        self.assertTrue(response.is_async)
+        rows = list(csv.DictReader(io.StringIO(content.decode())))
+        self.assertEqual(rows[0]['student'], 'graded')
+
+
+class CandidateRankingTest(TestCase):
+    def setUp(self):
+        self.students = [User.objects.create_user(username=f'candidate{n}') for n in range(4)]
+        for student, score in zip(self.students, (6.0, 9.0, 7.5, 3.0)):
+            Interview.objects.create(student=student, role_type='backend', score=score)
+        Interview.objects.create(student=self.students[0], role_type='frontend', score=8.0)
+
+    def _top(self, role='backend', **window):
+        return [(r.student.username, r.rank_score) for r in rankings.top_candidates(role, 3, **window)]
+
+    def test_rankings_follow_saves_and_match_a_rebuild(self):
+        self.assertEqual(self._top(), [('candidate1', 9.0), ('candidate2', 7.5), ('candidate0', 6.0)])
+        top = rankings.top_candidates('backend', 1)[0]
+        self.assertEqual(top.percentile, 87.5)
+
+        # A proctoring session with a weak integrity score pulls candidate1 below candidate2
+        ProctoringSession.objects.create(student=self.students[1], role_type='backend', score=6.0,
+                                         integrity_score=2.0)
+        self.assertEqual(self._top()[:2], [('candidate2', 7.5), ('candidate1', 7.2)])
+        interview = Interview.objects.get(student=self.students[3])
+        interview.score = 9.5
+        interview.save()
+        self.assertEqual(self._top()[0], ('candidate3', 9.5))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Interview.objects.filter(role_type='frontend').delete()
+        self.assertEqual(rankings.roles(), ['backend'])
+
+        incremental = RoleRankingStats.objects.get(role_type='backend').score_histogram
+        self.assertEqual(rankings.rebuild(), 4)
+        self.assertEqual(RoleRankingStats.objects.get(role_type='backend').score_histogram, incremental)
+
+    def test_window_and_view(self):
+        CandidateRanking.objects.filter(student=self.students[1]).update(
+            last_activity_at=timezone.now() - timezone.timedelta(days=60))
+        self.assertEqual(self._top(since=timezone.now() - timezone.timedelta(days=30))[0][0], 'candidate2')
+
+        # Anyone can sign up as a teacher, so the teacher role alone does not show the rankings
+        teacher = User.objects.create_user(username='recruiter', password='password123')
+        teacher.profile.role = 'TEACHER'
+        teacher.profile.save()
+        self.client.login(username='recruiter', password='password123')
+        self.assertEqual(self.client.get(reverse('candidate_rankings_api'), {'role': 'backend'}).status_code, 403)
+        self.assertRedirects(self.client.get(reverse('candidate_rankings')), reverse('dashboard'),
+                             fetch_redirect_response=False)
+        self.assertNotContains(self.client.get(reverse('dashboard')), reverse('candidate_rankings'))
+
+        teacher.is_staff = True
+        teacher.save()
+        response = self.client.get(reverse('candidate_rankings_api'), {'role': 'backend', 'days': '30', 'k': '2'})
+        self.assertEqual([r['student'] for r in response.json()['results']], ['candidate2', 'candidate0'])
+        response = self.client.get(reverse('candidate_rankings'), {'role': 'backend'})
+        self.assertContains(response, 'candidate1')
+        self.assertContains(self.client.get(reverse('dashboard')), reverse('candidate_rankings'))
@@ -0,0 +1,166 @@
+"""
+Streaming uploads
+Upload handler that processes each uploaded file in one pass over the request
+body. Every chunk is hashed, written to a temporary file and, for plain text,
+fed to an incremental decoder; the real file type is sniffed from the magic
+bytes of the first chunk. Text that is not valid UTF-8 is read as cp1252.
+A ZIP archive is only known to be a DOCX once its member list, stored at the
+end of the file, has been read from the completed temporary file.
+Memory stays bounded by the chunk size and the text
+cap, and FileSystemStorage moves the temporary file into place instead of
+copying it.
+
+The uploaded file carries the results for downstream code:
+  content_hash   SHA-256 of the bytes, used by the resume analysis cache
+  detected_type  'pdf', 'docx', 'doc', 'zip', 'png', 'jpeg', 'gif', 'webp', 'wav', 'webm', 'text' or 'binary'
+PDF and DOCX text needs the whole file, so upload_text() extracts it from the
+temporary file on first use, which a cached analysis never needs.
+"""
+import codecs
+import hashlib
+import zipfile
+
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+from .ai_models.config import Config
+from .extraction import TEXT_FALLBACK_ENCODING, extract_text
+
+SNIFF_BYTES = 64
+DOCUMENT_TYPES = ('pdf', 'docx', 'text')
+DOCX_MEMBERS = {'[Content_Types].xml', 'word/document.xml'}
+# Control characters other than tab, newline, form feed and carriage return mark binary data
+CONTROL_BYTES = bytes(set(range(32)) - {9, 10, 12, 13})
+
+
+def _is_text(head):
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(head)
+        return True
+    except UnicodeDecodeError:
+        pass
+    try:
+        head.decode(TEXT_FALLBACK_ENCODING)
+    except UnicodeDecodeError:
+        return False
+    return not any(byte in CONTROL_BYTES for byte in head)
+
+
+def sniff_type(head):
+    """File type from the leading bytes of a file"""
+    if head.startswith(b'%PDF-'):
+        return 'pdf'
+    if head.startswith(b'PK\x03\x04'):
+        # Possibly a DOCX; the member order varies between writers, so zip_type() decides from the whole file
+        return 'zip'
+    if head.startswith(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'):
+        return 'doc'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if head.startswith((b'GIF87a', b'GIF89a')):
+        return 'gif'
+    if head.startswith(b'RIFF') and head[8:12] in (b'WEBP', b'WAVE'):
+        return 'webp' if head[8:12] == b'WEBP' else 'wav'
+    if head.startswith(b'\x1aE\xdf\xa3'):
+        return 'webm'
+    if b'\x00' in head:
+        return 'binary'
+    return 'text' if _is_text(head) else 'binary'
+
+
+def zip_type(file):
+    """'docx' for a ZIP archive holding a Word document, 'zip' otherwise"""
+    try:
+        with zipfile.ZipFile(file) as archive:
+            names = set(archive.namelist())
+    except (zipfile.BadZipFile, OSError):
+        return 'zip'
+    finally:
+        file.seek(0)
+    return 'docx' if DOCX_MEMBERS <= names else 'zip'
+
+
+class TextDecoder:
+    """Incremental UTF-8 decoder that reads the rest as cp1252 from the first byte that is not UTF-8"""
+
+    def __init__(self):
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.fallback = None
+
+    def decode(self, data, final=False):
+        if self.fallback is not None:
+            return self.fallback.decode(data, final)
+        try:
+            return self.decoder.decode(data, final)
+        except UnicodeDecodeError as e:
+            # e.object is the decoder's buffered bytes followed by data
+            self.fallback = codecs.getincrementaldecoder(TEXT_FALLBACK_ENCODING)(errors='replace')
+            return e.object[:e.start].decode('utf-8') + self.fallback.decode(e.object[e.start:], final)
+
+
+class StreamingUploadHandler(TemporaryFileUploadHandler):
+    """Hashes, sniffs and decodes each chunk while it is written to a temporary file"""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+        self.detected_type = None
+        self.pending = []  # Chunks received before enough bytes arrived to sniff the type
+        self.decoder = TextDecoder()
+        self.text_parts = []
+        self.text_bytes = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+        if self.detected_type is None:
+            self.pending.append(raw_data)
+            if start + len(raw_data) >= SNIFF_BYTES:
+                self._detect()
+        elif self.detected_type == 'text':
+            self._decode(raw_data)
+
+    def _detect(self):
+        data = b''.join(self.pending)
+        self.pending = []
+        self.detected_type = sniff_type(data[:SNIFF_BYTES])
+        if self.detected_type == 'text':
+            self._decode(data)
+
+    def _decode(self, raw_data):
+        room = Config.EXTRACTION_MAX_BYTES - self.text_bytes
+        if room > 0:
+            self.text_parts.append(self.decoder.decode(raw_data[:room]))
+            self.text_bytes += min(len(raw_data), room)
+
+    def file_complete(self, file_size):
+        if self.detected_type is None:
+            self._detect()
+        uploaded = super().file_complete(file_size)
+        uploaded.content_hash = self.digest.hexdigest()
+        uploaded.detected_type = self.detected_type
+        if self.detected_type == 'zip':
+            uploaded.detected_type = zip_type(uploaded.file)
+        if self.detected_type == 'text':
+            self.text_parts.append(self.decoder.decode(b'', final=True))
+            uploaded.extracted_text = ''.join(self.text_parts)
+        return uploaded
+
+
+def upload_text(uploaded_file):
+    """
+    Text of an uploaded document: streamed plain text as is, PDF and DOCX extracted
+    once and kept on the file object; None for other detected types
+    """
+    text = getattr(uploaded_file, 'extracted_text', None)
+    if text is not None:
+        return text
+    detected_type = getattr(uploaded_file, 'detected_type', None)
+    if detected_type in ('pdf', 'docx'):
+        text = extract_text(uploaded_file, uploaded_file.name, file_type=detected_type)
+    elif detected_type is None:
+        # Received by another upload handler; fall back to the file name
+        text = extract_text(uploaded_file, uploaded_file.name)
+    uploaded_file.extracted_text = text
+    return text
@@ -12,6 +12,12 @@ urlpatterns = [
     path('assignment/<int:pk>/', views.view_assignment, name='view_assignment'),
     path('assignment/<int:pk>/submit/', views.submit_assignment, name='submit_assignment'),
     path('assignment/<int:pk>/submissions/', views.assignment_submissions, name='assignment_submissions'),
+    path('api/assignment/<int:pk>/submissions/', views.assignment_submissions_api, name='assignment_submissions_api'),
+    path('assignment/<int:pk>/submissions/export/', views.export_submissions, name='export_submissions'),
+    path('export/interviews/', views.export_interviews, name='export_interviews'),
+    path('export/proctoring/', views.export_proctoring, name='export_proctoring'),
+    path('rankings/', views.candidate_rankings, name='candidate_rankings'),
+    path('api/rankings/', views.candidate_rankings_api, name='candidate_rankings_api'),
     path('interview/setup/', views.interview_setup, name='interview_setup'),
     path('interview/start/', views.interview_setup, name='start_interview'),
     path('interview/start_with_name/', views.start_interview_with_name, name='start_interview_with_name'),
@@ -24,9 +30,14 @@ urlpatterns = [
     # Resume routes
     path('resume/upload/', views.upload_resume, name='upload_resume'),
     path('resume/', views.resume_detail, name='resume_detail'),
+    path('api/resume/status/', views.resume_status, name='resume_status'),
     # Proctoring routes
     path('proctoring/start/', views.start_proctoring, name='start_proctoring'),
     path('proctoring/<int:session_id>/room/', views.proctoring_room, name='proctoring_room'),
     path('proctoring/<int:session_id>/completed/', views.proctoring_completed, name='proctoring_completed'),
     path('proctoring/history/', views.proctoring_history, name='proctoring_history'),
+    path('api/proctoring/history/', views.proctoring_history_api, name='proctoring_history_api'),
+    path('api/cache/stats/', views.cache_stats, name='cache_stats'),
+    path('api/session/stats/', views.session_stats, name='session_stats'),
+    path('api/analysis/stats/', views.analysis_stats, name='analysis_stats'),
 ]
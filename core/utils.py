@@ -1,43 +1,18 @@
 import json
 from datetime import datetime
+from .extraction import extract_text
 
 def extract_text_from_pdf(pdf_file):
     """Extract text from PDF file."""
-    try:
-        import PyPDF2
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        return text
-    except Exception as e:
-        print(f"Error extracting PDF text: {e}")
-        return None
+    return extract_text(pdf_file, 'document.pdf')
 
 def extract_text_from_docx(docx_file):
     """Extract text from DOCX file."""
-    try:
-        from docx import Document
-        doc = Document(docx_file)
-        text = ""
-        for para in doc.paragraphs:
-            text += para.text + "\n"
-        return text
-    except Exception as e:
-        print(f"Error extracting DOCX text: {e}")
-        return None
+    return extract_text(docx_file, 'document.docx')
 
 def extract_resume_text(file_obj, file_name):
     """Extract text from resume file (PDF or DOCX)."""
-    if file_name.lower().endswith('.pdf'):
-        return extract_text_from_pdf(file_obj)
-    elif file_name.lower().endswith('.docx'):
-        return extract_text_from_docx(file_obj)
-    else:
-        try:
-            return file_obj.read().decode('utf-8', errors='ignore')
-        except:
-            return None
+    return extract_text(file_obj, file_name)
 
 def parse_ai_evaluation_response(response_text):
     """Parse AI evaluation response to extract structured data."""
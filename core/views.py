@@ -1,26 +1,48 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.models import User
 from django.views.generic import TemplateView, CreateView
-from django.urls import reverse_lazy
-from django.http import JsonResponse
+from django.urls import reverse, reverse_lazy
+from django.http import JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
+from django.db.models import Count, Exists, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
 import json
 from .forms import SignUpForm, AssignmentForm, SubmissionForm, ResumeUploadForm, ProctoringSessionForm, ProctoringResponseForm
 from .models import Profile, Assignment, Submission, Interview, Resume, ProctoringSession, ProctoringQuestion, ProctoringResponse
 from django.contrib.auth.mixins import LoginRequiredMixin
-from .ai_engine import evaluate_assignment, generate_interview_recommendation, analyze_resume, evaluate_proctoring_response, analyze_proctoring_session
-from .utils import extract_resume_text, parse_ai_evaluation_response
+from .ai_engine import evaluate_assignment, generate_interview_recommendation, evaluate_proctoring_response, analyze_proctoring_session
+from .uploads import upload_text
 from datetime import datetime
 from .ai_models.question_generator import QuestionGenerator
 from .ai_models.ai_interviewer import AIInterviewer
 from .ai_models.physical_analyzer import PhysicalAnalyzer
+from .ai_models.frame_batcher import FrameBatcher, FrameQueueFull
+from .ai_models.capture_rate import CaptureRateController
 from .ai_models.config import Config
+from . import analytics, caching, exports, proctoring, rankings, resume_cache, resume_worker, sessions
+from .pagination import KeysetPaginator
+from .interview_analysis import get_question_analysis, get_prosody_state, record_frame_analysis, record_audio_analysis, summarize
 
 question_generator = QuestionGenerator()
 ai_interviewer = AIInterviewer()
 physical_analyzer = PhysicalAnalyzer()
+frame_batcher = FrameBatcher(physical_analyzer.analyze_video_frames)
+capture_rate = CaptureRateController()
+
+def _cached_page(request, name, paginate, param='cursor', scopes=()):
+    """A keyset page cached per user and cursor; links keep this request's other parameters"""
+    page = caching.cached(name, paginate, user=request.user, scopes=scopes, vary=(request.GET.get(param),))
+    page.query = request.GET
+    return page
+
+def _count_of(model, field):
+    """Subquery counting the model's rows whose `field` points at the outer row"""
+    rows = model.objects.filter(**{field: OuterRef('pk')}).order_by().values(field)
+    return Coalesce(Subquery(rows.annotate(total=Count('pk')).values('total')), 0)
 
 class HomeView(TemplateView):
     template_name = 'core/home.html'
@@ -39,12 +61,25 @@ def dashboard(request):
         profile = Profile.objects.create(user=request.user)
     
     if profile.role == 'TEACHER':
-        assignments = Assignment.objects.filter(teacher=request.user)
+        def assignment_page():
+            page = KeysetPaginator(
+                Assignment.objects.filter(teacher=request.user).select_related('stats')
+            ).paginate(request)
+            analytics.with_stats(page.object_list)
+            return page
+        assignments = _cached_page(request, 'teacher_assignments', assignment_page, scopes=('students',))
         return render(request, 'core/teacher_dashboard.html', {'assignments': assignments})
     else:
         # Student logic
-        submissions = Submission.objects.filter(student=request.user)
-        available_assignments = Assignment.objects.exclude(submissions__student=request.user)
+        submissions = _cached_page(request, 'student_submissions', lambda: KeysetPaginator(
+            Submission.objects.filter(student=request.user).select_related('assignment'),
+            ordering=('-submitted_at', '-pk')
+        ).paginate(request, 'submissions'), param='submissions')
+        available_assignments = _cached_page(request, 'available_assignments', lambda: KeysetPaginator(
+            Assignment.objects.exclude(
+                Exists(Submission.objects.filter(assignment=OuterRef('pk'), student=request.user))
+            ).select_related('teacher')
+        ).paginate(request, 'assignments'), param='assignments', scopes=('assignments',))
         return render(request, 'core/student_dashboard.html', {
             'submissions': submissions,
             'available_assignments': available_assignments
@@ -85,15 +120,12 @@ def submit_assignment(request, pk):
             submission = form.save(commit=False)
             submission.assignment = assignment
             submission.student = request.user
-            submission.save() # Save first to get the file path
+            submission.save()
             
-            # Read file content for AI Evaluation
+            # Text was decoded or extracted from the upload itself; the stored copy is not reopened
             content = "No readable content."
             try:
-                with submission.file.open('r') as f:
-                    content = f.read(5000) # Read first 5k characters
-                if isinstance(content, bytes):
-                    content = content.decode('utf-8', errors='ignore')
+                content = (upload_text(request.FILES['file']) or content)[:5000] # First 5k characters
             except Exception as e:
                 print(f"Error reading submission file: {e}")
             
@@ -137,6 +169,17 @@ def start_interview_with_name(request):
     if not candidate_name:
         return JsonResponse({'error': 'Candidate name is required'}, status=400)
 
+    xreq = request.headers.get('X-Requested-With', '')
+    accept_header = request.headers.get('Accept', '')
+    wants_json = xreq == 'XMLHttpRequest' or 'application/json' in accept_header
+
+    # Questions are tailored to the resume analysis; while it is queued or running the student waits
+    # on the resume page, which polls its status, rather than this request waiting for the worker
+    if Resume.objects.filter(student=request.user, analysis_status__in=resume_worker.RUNNING_STATES).exists():
+        if wants_json:
+            return JsonResponse({'success': False, 'pending': True, 'redirect': reverse('resume_detail')})
+        return redirect('resume_detail')
+
     # Clear previous interview specific session vars
     for key in ['candidate_name', 'job_role', 'interview_id', 'current_question', 'score', 'responses', 'start_time', 'enable_voice', 'questions', 'total_questions_target']:
         if key in request.session:
@@ -162,7 +205,9 @@ def start_interview_with_name(request):
     target_total = max(Config.MIN_QUESTIONS, min(Config.MAX_QUESTIONS, Config.DEFAULT_QUESTIONS))
     request.session['total_questions_target'] = target_total
 
-    resume_analysis = request.session.get('resume_analysis', {})
+    # Generic questions when there is no resume or its analysis failed
+    resume_analysis = resume_worker.resume_analysis_for(request.user)
+    request.session['resume_analysis'] = resume_analysis
     print(f"DEBUG: Generating questions for {candidate_name}...")
     questions = question_generator.generate_questions_raw('software_engineer', resume_analysis, target_total)
     print(f"DEBUG: Generated {len(questions) if questions else 0} questions.")
@@ -176,14 +221,11 @@ def start_interview_with_name(request):
 
     request.session['questions'] = questions
     
-    xreq = request.headers.get('X-Requested-With', '')
-    accept_header = request.headers.get('Accept', '')
-    if xreq != 'XMLHttpRequest' and 'application/json' not in accept_header:
+    if not wants_json:
         request.session.modified = True 
         return redirect('interview_room')
 
     request.session.modified = True
-    from django.urls import reverse
     return JsonResponse({
         'success': True,
         'redirect': reverse('interview_room')
@@ -234,7 +276,10 @@ def interview_room(request):
         'question': question,
         'question_num': current_q + 1,
         'total_questions': target_total,
-        'enable_voice': request.session.get('enable_voice', True)
+        'enable_voice': request.session.get('enable_voice', True),
+        'analysis_interval_ms': request.session.get('capture_state', {}).get(
+            'interval_ms', Config.ANALYSIS_FRAME_INTERVAL * 1000
+        )
     })
 
 @login_required
@@ -379,73 +424,45 @@ def update_physical_analysis(request):
         if 'physical_analysis' not in request.session:
             request.session['physical_analysis'] = {}
         
-        if f'question_{current_q}' not in request.session['physical_analysis']:
-            request.session['physical_analysis'][f'question_{current_q}'] = {
-                'confidence': 0.0,
-                'voice_quality': 0.0,
-                'body_language': 0.0,
-                'overall_physical_score': 0.0,
-                'details': {
-                    'confidence_scores': [],
-                    'voice_scores': [],
-                    'posture_scores': [],
-                    'frame_count': 0,
-                    'audio_segment_count': 0
-                }
-            }
-        
-        current_data = request.session['physical_analysis'][f'question_{current_q}']
-        details = current_data['details']
+        current_data = get_question_analysis(request.session['physical_analysis'], current_q)
         
         # Analyze video frame if provided
         if video_frame:
-            frame_analysis = physical_analyzer.analyze_video_frame(video_frame)
-            if frame_analysis:
-                details['confidence_scores'].append(frame_analysis.get('confidence', 5.0))
-                details['posture_scores'].append(frame_analysis.get('posture_score', 5.0))
-                details['frame_count'] += 1
-                
-                # Recalculate averages
-                if details['confidence_scores']:
-                    current_data['confidence'] = round(
-                        sum(details['confidence_scores']) / len(details['confidence_scores']), 2
-                    )
-                if details['posture_scores']:
-                    current_data['body_language'] = round(
-                        sum(details['posture_scores']) / len(details['posture_scores']), 2
-                    )
+            if Config.ENABLE_FRAME_BATCHING:
+                try:
+                    frame_analysis = frame_batcher.analyze(video_frame)
+                except FrameQueueFull:
+                    response = JsonResponse({
+                        'success': False,
+                        'error': 'Analysis queue is full, retry later'
+                    }, status=503)
+                    response['Retry-After'] = str(Config.CAPTURE_INTERVAL_MAX_MS // 1000)
+                    return response
+                except TimeoutError:
+                    frame_analysis = None
+            else:
+                frame_analysis = physical_analyzer.analyze_video_frame(video_frame)
+            record_frame_analysis(current_data, frame_analysis)
+            
+            capture_state = request.session.get('capture_state', {})
+            capture_rate.next_interval_ms(capture_state, frame_batcher.queue_depth(), frame_analysis, video_frame,
+                                          key=request.session.session_key)
+            request.session['capture_state'] = capture_state
         
         # Analyze audio segment if provided
         if audio_segment:
-            audio_analysis = physical_analyzer.analyze_audio(audio_segment)
-            if audio_analysis:
-                details['voice_scores'].append(audio_analysis.get('voice_score', 5.0))
-                details['audio_segment_count'] += 1
-                
-                # Recalculate average
-                if details['voice_scores']:
-                    current_data['voice_quality'] = round(
-                        sum(details['voice_scores']) / len(details['voice_scores']), 2
-                    )
-        
-        # Recalculate overall physical score
-        current_data['overall_physical_score'] = round(
-            (current_data['confidence'] * Config.CONFIDENCE_WEIGHT +
-             current_data['voice_quality'] * Config.VOICE_WEIGHT +
-             current_data['body_language'] * Config.BODY_LANGUAGE_WEIGHT), 2
-        )
+            audio_analysis = physical_analyzer.analyze_audio(audio_segment, get_prosody_state(current_data))
+            record_audio_analysis(current_data, audio_analysis)
         
         request.session.modified = True
         
         return JsonResponse({
             'success': True,
             'current_analysis': current_data,
-            'summary': {
-                'confidence': current_data['confidence'],
-                'voice_quality': current_data['voice_quality'],
-                'body_language': current_data['body_language'],
-                'overall_physical_score': current_data['overall_physical_score']
-            }
+            'summary': summarize(current_data),
+            'next_interval_ms': request.session.get('capture_state', {}).get(
+                'interval_ms', Config.ANALYSIS_FRAME_INTERVAL * 1000
+            )
         })
         
     except Exception as e:
@@ -489,19 +506,18 @@ def profile_view(request):
     else:
         form = ProfileForm(instance=request.user.profile)
     
-    # Explicit context for template counts
-    sub_count = request.user.submissions.count()
-    int_count = request.user.interviews.count()
+    # All template counts in one query, cached until the user's rows change
+    counts = caching.cached('profile_counts', lambda: User.objects.filter(pk=request.user.pk).annotate(
+        submission_count=_count_of(Submission, 'student'),
+        interview_count=_count_of(Interview, 'student'),
+        assignment_count=_count_of(Assignment, 'teacher')
+    ).values('submission_count', 'interview_count', 'assignment_count').get(), user=request.user)
     
-    return render(request, 'core/profile.html', {
-        'form': form,
-        'submission_count': sub_count,
-        'interview_count': int_count
-    })
+    return render(request, 'core/profile.html', {'form': form, **counts})
 
 @login_required
 def upload_resume(request):
-    """Upload and analyze student resume."""
+    """Upload a student resume and queue its analysis."""
     if request.user.profile.role != 'STUDENT':
         return redirect('dashboard')
     
@@ -512,25 +528,19 @@ def upload_resume(request):
         if form.is_valid():
             resume = form.save(commit=False)
             resume.student = request.user
-            resume.analysis_status = 'PROCESSING'
+            resume.analysis_status = 'PENDING'
             resume.save()
             
-            # Extract text from resume
-            resume_text = extract_resume_text(request.FILES['file'], request.FILES['file'].name)
-            
-            if resume_text:
-                # Analyze resume with AI
-                score, skills, suggestions = analyze_resume(resume_text)
-                
-                resume.score = score
-                resume.skills_extracted = skills
-                resume.suggestions = suggestions
-                resume.ai_analysis = parse_ai_evaluation_response(suggestions)['suggestions']
-                resume.analysis_status = 'COMPLETED'
-                resume.save()
+            uploaded = request.FILES['file']
+            content_hash = resume_cache.hash_upload(uploaded)
+            cached = resume_cache.get_analysis(content_hash)
+            if cached:
+                resume_worker.complete_from_cache(resume, cached)
             else:
-                resume.analysis_status = 'FAILED'
-                resume.save()
+                # Extraction and analysis run in the background; resume_detail polls for the result
+                resume_worker.enqueue(resume, content_hash=content_hash,
+                                      text=getattr(uploaded, 'extracted_text', None),
+                                      file_type=getattr(uploaded, 'detected_type', None))
             
             return redirect('resume_detail')
     else:
@@ -544,12 +554,30 @@ def resume_detail(request):
     if request.user.profile.role != 'STUDENT':
         return redirect('dashboard')
     
-    try:
-        resume = request.user.resume
-    except Resume.DoesNotExist:
+    # Cached until the resume is saved or the analysis worker records a new status
+    resume = caching.cached('resume_detail', lambda: Resume.objects.filter(student=request.user).first(),
+                            user=request.user)
+    if resume is None:
         return render(request, 'core/no_resume.html')
     
-    return render(request, 'core/resume_detail.html', {'resume': resume})
+    return render(request, 'core/resume_detail.html', {
+        'resume': resume,
+        'status_poll_ms': Config.RESUME_STATUS_POLL_MS
+    })
+
+@login_required
+def resume_status(request):
+    """Lightweight analysis status polled by resume_detail."""
+    resume = Resume.objects.filter(student=request.user).only('analysis_status', 'score', 'updated_at', 'file').first()
+    if resume is None:
+        return JsonResponse({'status': None}, status=404)
+    resume_worker.requeue_if_stale(resume)
+    return JsonResponse({
+        'status': resume.analysis_status,
+        'done': resume.analysis_status not in resume_worker.RUNNING_STATES,
+        'score': resume.score,
+        'updated_at': resume.updated_at.isoformat()
+    })
 
 @login_required
 def start_proctoring(request):
@@ -633,7 +661,7 @@ def proctoring_room(request, session_id):
         form = ProctoringResponseForm()
     
     progress = {
-        'answered': answered_questions.count(),
+        'answered': session.response_count,
         'total': session.questions.count(),
         'current': current_question.order
     }
@@ -652,46 +680,33 @@ def proctoring_completed(request, session_id):
         return redirect('dashboard')
     
     try:
-        session = ProctoringSession.objects.get(id=session_id, student=request.user)
+        # The transcript was built up as responses were saved and is not needed here
+        session = ProctoringSession.objects.defer('transcript').get(id=session_id, student=request.user)
     except ProctoringSession.DoesNotExist:
         return redirect('dashboard')
     
     if session.status == 'IN_PROGRESS':
-        # Get all responses
-        responses = ProctoringResponse.objects.filter(question__session=session)
-        
-        # Build session transcript
-        transcript = ""
-        responses_data = []
-        for resp in responses:
-            transcript += f"Q: {resp.question.question_text}\nA: {resp.response_text}\n\n"
-            responses_data.append({
-                'question': resp.question.question_text,
-                'score': resp.score or 0,
-                'evaluation': resp.ai_evaluation
-            })
-        
-        # Analyze overall session
-        duration = (session.started_at and (
-            (request.user.proctoring_sessions.filter(id=session_id).first().ended_at or 
-             timezone.now()) - session.started_at
-        ).total_seconds() / 60) or 0
+        session.ended_at = session.ended_at or timezone.now()
+        duration = int((session.ended_at - session.started_at).total_seconds() / 60)
         
+        # Analyze overall session from the rollups kept on the session
         integrity_score, quality_score, issues, recommendations = analyze_proctoring_session(
-            transcript,
-            responses_data,
-            int(duration)
+            proctoring.summarize_session(session, duration),
+            duration
         )
         
-        session.transcript = transcript
         session.score = quality_score
         session.integrity_score = integrity_score
         session.flagged_issues = issues
         session.ai_analysis = recommendations
         session.status = 'COMPLETED'
-        session.save()
+        session.save(update_fields=['ended_at', 'score', 'integrity_score', 'flagged_issues', 'ai_analysis',
+                                    'status'])
     
-    return render(request, 'core/proctoring_completed.html', {'session': session})
+    questions = session.questions.prefetch_related(
+        Prefetch('responses', queryset=ProctoringResponse.objects.order_by('created_at'))
+    )
+    return render(request, 'core/proctoring_completed.html', {'session': session, 'questions': questions})
 
 @login_required
 def proctoring_history(request):
@@ -699,13 +714,45 @@ def proctoring_history(request):
     if request.user.profile.role != 'STUDENT':
         return redirect('dashboard')
     
-    sessions = ProctoringSession.objects.filter(student=request.user).order_by('-started_at')
+    sessions = _cached_page(request, 'proctoring_history', lambda: KeysetPaginator(
+        ProctoringSession.objects.filter(student=request.user), ordering=('-started_at', '-pk')
+    ).paginate(request))
     
     return render(request, 'core/proctoring_history.html', {'sessions': sessions})
 
+@staff_member_required
+def cache_stats(request):
+    """Fragment cache hits and misses in this process, per fragment."""
+    return JsonResponse({'fragments': caching.stats()})
+
+@staff_member_required
+def session_stats(request):
+    """Session loads, writes skipped and bytes stored in this process"""
+    return JsonResponse(sessions.stats())
+
+@staff_member_required
+def analysis_stats(request):
+    """Audio segments the VAD skipped and frame batching in this process"""
+    return JsonResponse({'audio': physical_analyzer.get_audio_stats(), 'frames': frame_batcher.get_stats()})
+
+@login_required
+def proctoring_history_api(request):
+    """Proctoring sessions as JSON, one keyset page per request."""
+    sessions = KeysetPaginator(
+        ProctoringSession.objects.filter(student=request.user), ordering=('-started_at', '-pk')
+    ).paginate(request)
+    return JsonResponse(sessions.as_json(lambda session: {
+        'id': session.id,
+        'role_type': session.role_type,
+        'status': session.status,
+        'score': session.score,
+        'integrity_score': session.integrity_score,
+        'started_at': session.started_at.isoformat()
+    }))
+
 @login_required
 def assignment_submissions(request, pk):
-    assignment = Assignment.objects.get(pk=pk)
+    assignment = Assignment.objects.select_related('stats').get(pk=pk)
     # Security check: only the teacher who created the assignment can see submissions
     if assignment.teacher != request.user:
         return redirect('dashboard')
@@ -714,13 +761,128 @@ def assignment_submissions(request, pk):
     # In a real app, this would be filtered by a specific class or enrollment
     students = User.objects.filter(profile__role='STUDENT')
     
-    submitted_submissions = assignment.submissions.all().select_related('student')
-    submitted_student_ids = submitted_submissions.values_list('student_id', flat=True)
+    submitted_submissions = _submissions_paginator(assignment).paginate(request)
     
-    pending_students = students.exclude(id__in=submitted_student_ids)
+    # Counts come from the rollup; both lists are paged
+    summary = analytics.with_stats([assignment])[0].summary
+    pending_students = KeysetPaginator(students.exclude(
+        Exists(Submission.objects.filter(assignment=assignment, student=OuterRef('pk')))
+    ).only('username'), ordering=('pk',)).paginate(request, 'pending')
     
     return render(request, 'core/view_submissions.html', {
         'assignment': assignment,
         'submissions': submitted_submissions,
-        'pending_students': pending_students
+        'pending_students': pending_students,
+        'summary': summary
+    })
+
+def _export_response(request, export):
+    """Stream an export in the ?format= requested (csv, jsonl or excel) as a download"""
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in exports.FORMATS:
+        return JsonResponse({'error': f"Unknown format '{fmt}'"}, status=400)
+    # An ASGI response needs an async iterator, or Django reads the whole export into a list first
+    content = exports.astream(export, fmt) if isinstance(request, ASGIRequest) else exports.stream(export, fmt)
+    response = StreamingHttpResponse(content, content_type=exports.FORMATS[fmt][0])
+    response['Content-Disposition'] = f'attachment; filename="{exports.filename(export, fmt)}"'
+    return response
+
+@login_required
+def export_submissions(request, pk):
+    """An assignment's submissions with scores and feedback; teacher only."""
+    assignment = Assignment.objects.filter(pk=pk, teacher=request.user).first()
+    if assignment is None:
+        return JsonResponse({'error': 'Assignment not found'}, status=404)
+    return _export_response(request, exports.submissions_export(assignment))
+
+@login_required
+def export_interviews(request):
+    """Interview results: every student's for staff, a user's own for everyone else."""
+    interviews = Interview.objects.all()
+    if not request.user.is_staff:
+        interviews = interviews.filter(student=request.user)
+    return _export_response(request, exports.interviews_export(interviews))
+
+@login_required
+def export_proctoring(request):
+    """Proctoring sessions: every student's for staff, a user's own for everyone else."""
+    proctoring_sessions = ProctoringSession.objects.all()
+    if not request.user.is_staff:
+        proctoring_sessions = proctoring_sessions.filter(student=request.user)
+    return _export_response(request, exports.proctoring_export(proctoring_sessions))
+
+RANKING_WINDOWS = (('7', 'Last 7 days'), ('30', 'Last 30 days'), ('90', 'Last 90 days'), ('', 'All time'))
+
+def _ranking_request(request):
+    """Role, K and activity window of a rankings request: ?role=, ?k= and ?days= (or ?since=/?until= dates)"""
+    roles = rankings.roles()
+    role = request.GET.get('role') or (roles[0] if roles else '')
+    try:
+        k = int(request.GET.get('k', rankings.DEFAULT_TOP_K))
+    except ValueError:
+        k = rankings.DEFAULT_TOP_K
+    since = until = None
+    days = request.GET.get('days', '')
+    if days.isdigit():
+        since = timezone.now() - timezone.timedelta(days=int(days))
+    for name in ('since', 'until'):
+        value = request.GET.get(name)
+        if value:
+            try:
+                parsed = timezone.make_aware(datetime.strptime(value, '%Y-%m-%d'))
+            except ValueError:
+                continue
+            since, until = (parsed, until) if name == 'since' else (since, parsed)
+    return roles, role, k, since, until
+
+@login_required
+def candidate_rankings(request):
+    """Top candidates per interview role with percentile ranks; staff only, as anyone can sign up as a teacher."""
+    if not request.user.is_staff:
+        return redirect('dashboard')
+    roles, role, k, since, until = _ranking_request(request)
+    return render(request, 'core/candidate_rankings.html', {
+        'roles': roles,
+        'role': role,
+        'k': k,
+        'days': request.GET.get('days', ''),
+        'windows': RANKING_WINDOWS,
+        'candidates': rankings.top_candidates(role, k, since, until) if role else []
     })
+
+@login_required
+def candidate_rankings_api(request):
+    """The same ranking as JSON; staff only."""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Staff only'}, status=403)
+    roles, role, k, since, until = _ranking_request(request)
+    candidates = rankings.top_candidates(role, k, since, until) if role else []
+    return JsonResponse({'role': role, 'roles': roles, 'results': [{
+        'rank': position,
+        'student': ranking.student.username,
+        'rank_score': ranking.rank_score,
+        'percentile': ranking.percentile,
+        'interview_score': ranking.interview_score,
+        'proctoring_score': ranking.proctoring_score,
+        'integrity_score': ranking.integrity_score,
+        'interviews': ranking.interview_count,
+        'sessions': ranking.session_count,
+        'last_activity_at': ranking.last_activity_at.isoformat()
+    } for position, ranking in enumerate(candidates, 1)]})
+
+def _submissions_paginator(assignment):
+    return KeysetPaginator(assignment.submissions.select_related('student'), ordering=('-submitted_at', '-pk'))
+
+@login_required
+def assignment_submissions_api(request, pk):
+    """An assignment's submissions as JSON, one keyset page per request; teacher only."""
+    assignment = Assignment.objects.filter(pk=pk, teacher=request.user).first()
+    if assignment is None:
+        return JsonResponse({'error': 'Assignment not found'}, status=404)
+    submissions = _submissions_paginator(assignment).paginate(request)
+    return JsonResponse(submissions.as_json(lambda submission: {
+        'id': submission.id,
+        'student': submission.student.username,
+        'submitted_at': submission.submitted_at.isoformat(),
+        'score': submission.score
+    }))